@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import time
+
+import shapely
+from shapely.geometry import mapping, shape
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE = os.path.join(BASE_DIR, "gadm41_JPN_1.json")
+STORE_DIR = os.path.join(BASE_DIR, "gadm_store")
+# 許容誤差（度）：0 は元の解像度、0.002 ≒ 200 m、0.01 ≒ 1 km
+TOLERANCES = (0.0, 0.002, 0.005, 0.01)
+DEFAULT_TOLERANCE = 0.002
+kanto_pref_names = ["Tokyo", "Kanagawa", "Saitama", "Chiba", "Ibaraki", "Tochigi", "Gunma"]
+
+
+def _key(tolerance):
+    return f"{tolerance:g}"
+
+
+def _source_stamp(source):
+    stat = os.stat(source)
+    return [os.path.abspath(source), stat.st_size, stat.st_mtime]
+
+
+def simplify_coverage(geoms, tolerance):
+    """Simplify polygons that share borders so neighbours keep a common edge."""
+    if not tolerance:
+        return list(geoms)
+    if hasattr(shapely, "coverage_simplify"):  # GEOS >= 3.12
+        return list(shapely.coverage_simplify(geoms, tolerance))
+    return [g.simplify(tolerance, preserve_topology=True) for g in geoms]
+
+
+# === GeoJSON を一度だけ読み、許容誤差ごとの WKB と索引を書き出す ===
+def build(source=SOURCE, store_dir=STORE_DIR, tolerances=TOLERANCES):
+    with open(source, "r", encoding="utf-8") as f:
+        gj = json.load(f)
+    names = [feat['properties']['NAME_1'] for feat in gj['features']]
+    geoms = [shape(feat['geometry']) for feat in gj['features']]
+
+    os.makedirs(store_dir, exist_ok=True)
+    features = {
+        name: {
+            "properties": feat['properties'],
+            "bbox": list(geom.bounds),
+            "centroid": [geom.centroid.x, geom.centroid.y],
+            "offsets": {},
+        }
+        for name, feat, geom in zip(names, gj['features'], geoms)
+    }
+    for tolerance in tolerances:
+        offset = 0
+        with open(os.path.join(store_dir, f"geoms_{_key(tolerance)}.wkb"), "wb") as f:
+            for name, geom in zip(names, simplify_coverage(geoms, tolerance)):
+                blob = shapely.to_wkb(geom)
+                f.write(blob)
+                features[name]["offsets"][_key(tolerance)] = [offset, len(blob)]
+                offset += len(blob)
+
+    index = {"source": _source_stamp(source), "tolerances": list(tolerances), "features": features}
+    with open(os.path.join(store_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    return index
+
+
+_index_cache = {}
+
+
+def load_index(source=SOURCE, store_dir=STORE_DIR):
+    """The store index, (re)built when missing or older than the source file."""
+    path = os.path.join(store_dir, "index.json")
+    stamp = _source_stamp(source)
+    cached = _index_cache.get(path)
+    if cached is not None and cached["source"] == stamp:
+        return cached
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except FileNotFoundError:
+        index = None
+    if index is None or index["source"] != stamp:
+        index = build(source, store_dir)
+    _index_cache[path] = index
+    return index
+
+
+def load(names, tolerance=DEFAULT_TOLERANCE, source=SOURCE, store_dir=STORE_DIR):
+    """{NAME_1: shapely geometry}, reading only the requested records."""
+    index = load_index(source, store_dir)
+    geoms = {}
+    with open(os.path.join(store_dir, f"geoms_{_key(tolerance)}.wkb"), "rb") as f:
+        for name in names:
+            offset, length = index["features"][name]["offsets"][_key(tolerance)]
+            f.seek(offset)
+            geoms[name] = shapely.from_wkb(f.read(length))
+    return geoms
+
+
+def features(names, tolerance=DEFAULT_TOLERANCE, source=SOURCE, store_dir=STORE_DIR):
+    """GeoJSON Feature dicts (properties + simplified geometry), as json.load would give them."""
+    index = load_index(source, store_dir)
+    return [
+        {"type": "Feature", "properties": index["features"][name]["properties"], "geometry": mapping(geom)}
+        for name, geom in load(names, tolerance, source, store_dir).items()
+    ]
+
+
+def bbox(name, source=SOURCE, store_dir=STORE_DIR):
+    return load_index(source, store_dir)["features"][name]["bbox"]
+
+
+def centroid(name, source=SOURCE, store_dir=STORE_DIR):
+    return load_index(source, store_dir)["features"][name]["centroid"]
+
+
+def benchmark(names=kanto_pref_names, source=SOURCE, store_dir=STORE_DIR, repeat=5):
+    """Load time and GeoJSON request payload for `names`: full json.load vs the store per tolerance."""
+    rows = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        with open(source, "r", encoding="utf-8") as f:
+            gj = json.load(f)
+        full = [feat for feat in gj['features'] if feat['properties']['NAME_1'] in names]
+    rows.append(("json.load (full file)", (time.perf_counter() - start) / repeat, len(json.dumps(full))))
+
+    load_index(source, store_dir)
+    for tolerance in TOLERANCES:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            _index_cache.clear()
+            feats = features(names, tolerance, source, store_dir)
+        rows.append((f"store tolerance={_key(tolerance)}", (time.perf_counter() - start) / repeat, len(json.dumps(feats))))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simplified, indexed GADM level-1 geometries")
+    parser.add_argument("command", choices=["build", "bench"])
+    parser.add_argument("--source", default=SOURCE)
+    parser.add_argument("--store-dir", default=STORE_DIR)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        index = build(args.source, args.store_dir)
+        print(f"Stored {len(index['features'])} regions at tolerances {index['tolerances']} -> {args.store_dir}")
+    else:
+        for label, seconds, payload in benchmark(source=args.source, store_dir=args.store_dir):
+            print(f"{label:26s} {seconds * 1000:7.1f} ms  {payload / 1024:8.1f} KiB payload")
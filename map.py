@@ -1,36 +1,129 @@
-import pandas as pd
-import os
-prefectures = ["Tokyo","Kanagawa","Saitama","Chiba","Ibaraki","Tochigi","Gunma"]
-dfs = []
-
-for pref in prefectures:
-    file_path = os.path.join("kanto",f"{pref}_2024_ndvi_temp.csv")
-    df=pd.read_csv(file_path)
-    df['prefecture'] = pref  # 県名列を追加
-    dfs.append(df)
-
-all_data = pd.concat(dfs, ignore_index=True)
-all_data['date'] = pd.to_datetime(all_data['date'])
-
-import geopandas as gpd
-
-gdf = gpd.read_file("gadm41_JPN_1.json")
-kanto_pref_names = ["Tokyo","Kanagawa","Saitama","Chiba","Ibaraki","Tochigi","Gunma"]
-gdf = gdf[gdf['NAME_1'].isin(kanto_pref_names)]
-
-gdf_merged = gdf.merge(all_data, left_on='NAME_1', right_on='prefecture')
-
-import matplotlib.pyplot as plt
-
-# 表示したい日付
-dates = pd.date_range("2024-03-01", "2024-03-31")
-
-for date in dates:
-    day_data = gdf_merged[gdf_merged['date'] == date]
-    
-    fig, ax = plt.subplots(figsize=(8,8))
-    day_data.plot(column='NDVI', cmap='YlGn', legend=True, ax=ax, edgecolor='black')
-    ax.set_title(f"NDVI Map on {date.date()}")
-    plt.axis('off')
-    plt.savefig(f"NDVI_{date.date()}.png", dpi=300)
-    plt.close()
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import geometry_store
+
+kanto_pref_names = ["Tokyo","Kanagawa","Saitama","Chiba","Ibaraki","Tochigi","Gunma"]
+
+
+# === 県ごとの NDVI を (日付 x 県) の配列にまとめる ===
+def load_values(prefectures, year, data_dir="kanto"):
+    dfs = []
+    for pref in prefectures:
+        file_path = os.path.join(data_dir, f"{pref}_{year}_ndvi_temp.csv")
+        df = pd.read_csv(file_path)
+        df['prefecture'] = pref  # 県名列を追加
+        dfs.append(df)
+
+    all_data = pd.concat(dfs, ignore_index=True)
+    all_data['date'] = pd.to_datetime(all_data['date'])
+    return all_data.pivot_table(index='date', columns='prefecture', values='NDVI')[prefectures]
+
+
+# === ポリゴンは一度だけ読み込み（簡略化済みストア）・投影する ===
+def load_geometry(prefectures, crs="EPSG:6691", tolerance=geometry_store.DEFAULT_TOLERANCE):
+    import geopandas as gpd
+
+    geoms = geometry_store.load(prefectures, tolerance)
+    gdf = gpd.GeoDataFrame(geometry=[geoms[p] for p in prefectures], index=prefectures, crs="EPSG:4326")
+    return gdf.to_crs(crs)
+
+
+# === ワーカー：図は一度だけ描き、日ごとに色とタイトルだけ更新する ===
+_worker = {}
+
+
+def _init_worker(gdf, vmin, vmax, dpi, out_dir):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import Normalize
+
+    norm = Normalize(vmin=vmin, vmax=vmax)
+    fig, ax = plt.subplots(figsize=(8,8))
+    gdf.plot(ax=ax, color='white', edgecolor='black')
+    fig.colorbar(plt.cm.ScalarMappable(norm=norm, cmap='YlGn'), ax=ax, shrink=0.7)
+    ax.axis('off')
+    _worker.update(fig=fig, ax=ax, collection=ax.collections[0], cmap=plt.cm.YlGn, norm=norm, dpi=dpi, out_dir=out_dir)
+
+
+def _render(task):
+    date, values = task
+    w = _worker
+    w['collection'].set_facecolor(w['cmap'](w['norm'](values)))
+    w['ax'].set_title(f"NDVI Map on {date}")
+    path = os.path.join(w['out_dir'], f"NDVI_{date}.png")
+    w['fig'].savefig(path, dpi=w['dpi'])
+    return path
+
+
+def render_pngs(gdf, values, out_dir=".", dpi=300, workers=None):
+    """One PNG per date, dates split across a process pool (rendered in this process when workers=1).
+
+    Every frame shares one colour scale, the min / max over all dates. Returns the written paths.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    vmin, vmax = np.nanmin(values.to_numpy()), np.nanmax(values.to_numpy())
+    tasks = [(str(d.date()), row) for d, row in zip(values.index, values.to_numpy())]
+    if workers == 1:
+        import matplotlib.pyplot as plt
+
+        _init_worker(gdf, vmin, vmax, dpi, out_dir)
+        try:
+            return [_render(task) for task in tasks]
+        finally:
+            plt.close(_worker.pop('fig'))
+            _worker.clear()
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(gdf, vmin, vmax, dpi, out_dir)) as pool:
+        return list(pool.map(_render, tasks, chunksize=max(1, len(tasks) // (4 * (workers or os.cpu_count())))))
+
+
+def write_vector(gdf, values, out_dir="."):
+    """Simplified polygons as one GeoJSON plus a per-day value array, for colouring in the browser."""
+    os.makedirs(out_dir, exist_ok=True)
+    shapes_path = os.path.join(out_dir, "kanto_shapes.geojson")
+    gdf.to_crs("EPSG:4326").rename_axis('NAME_1').reset_index().to_file(shapes_path, driver="GeoJSON")
+    values_path = os.path.join(out_dir, "ndvi_days.json")
+    with open(values_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "regions": list(values.columns),
+            "dates": [str(d.date()) for d in values.index],
+            "NDVI": np.round(values.to_numpy(), 1).tolist(),
+        }, f)
+    return shapes_path, values_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Daily NDVI maps for the Kanto prefectures")
+    parser.add_argument("--year", type=int, default=2024)
+    parser.add_argument("--start", default="03-01", help="first day (MM-DD)")
+    parser.add_argument("--end", default="03-31", help="last day (MM-DD)")
+    parser.add_argument("--prefectures", nargs="+", default=kanto_pref_names)
+    parser.add_argument("--data-dir", default="kanto")
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--tolerance", type=float, default=geometry_store.DEFAULT_TOLERANCE,
+                        choices=geometry_store.TOLERANCES, help="stored simplification level in degrees")
+    parser.add_argument("--vector", action="store_true", help="write GeoJSON + per-day values instead of PNGs")
+    args = parser.parse_args()
+
+    values = load_values(args.prefectures, args.year, args.data_dir)
+    # 表示したい日付
+    values = values.loc[f"{args.year}-{args.start}":f"{args.year}-{args.end}"]
+    gdf = load_geometry(args.prefectures, tolerance=args.tolerance)
+
+    start = time.perf_counter()
+    if args.vector:
+        for path in write_vector(gdf, values, args.out_dir):
+            print(f"Saved {path}")
+    else:
+        paths = render_pngs(gdf, values, args.out_dir, args.dpi, args.workers)
+        elapsed = time.perf_counter() - start
+        print(f"Rendered {len(paths)} maps in {elapsed:.1f}s ({len(paths) / elapsed:.1f} frames/s)")
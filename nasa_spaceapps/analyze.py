@@ -1,127 +1,77 @@
-import ee
-import requests
-import pandas as pd
-import matplotlib.pyplot as plt
-from scipy.signal import find_peaks
-import pycountry
-import os
-import time
-
-# === 初期設定 ===
-ee.Initialize(project='pollenproject-474105')
-year = 2024  # ← 対象年
-output_dir = "world"
-os.makedirs(output_dir, exist_ok=True)
-T_base = 5.0  # GDD計算用
-
-# MODISコレクション
-modis_collection = "MODIS/006/MOD13Q1" if year <= 2023 else "MODIS/061/MOD13Q1"
-modis = ee.ImageCollection(modis_collection).select('NDVI').filterDate(f'{year}-01-01', f'{year}-12-31')
-print(f"🛰️ Using MODIS collection: {modis_collection}")
-
-# 全ての国ループ
-all_countries = [c.name for c in pycountry.countries]
-
-for country_name in all_countries:
-    try:
-        print(f"\n🌍 Processing {country_name}")
-        # 国コード
-        country = pycountry.countries.lookup(country_name)
-        country_iso3 = country.alpha_3
-
-        # GADMレベル1ポリゴン取得
-        url_gadm = f"https://geodata.ucdavis.edu/gadm/gadm4.1/json/gadm41_{country_iso3}_1.json"
-        response = requests.get(url_gadm, timeout=30)
-        if response.status_code != 200:
-            print(f"⚠️ GADM not found for {country_name}, skipping")
-            continue
-        gj = response.json()
-        features = gj.get("features")
-        if not features:
-            print(f"⚠️ No level-1 regions for {country_name}, skipping")
-            continue
-
-        # レベル1の最初の行政区だけ使う
-        feature = features[0]
-        region_name = feature['properties']['NAME_1']
-        safe_name = f"{country_name}_{region_name}".replace("/", "_").replace(" ", "_")
-
-        out_csv = os.path.join(output_dir, f"{safe_name}_{year}_ndvi_temp.csv")
-        out_png = os.path.join(output_dir, f"{safe_name}_{year}_ndvi_curve.png")
-        if os.path.exists(out_csv):
-            print(f"⏩ Skipping {safe_name} (already processed)")
-            continue
-
-        # centroid取得
-        ee_feature = ee.Feature(feature)
-        centroid = ee.Geometry(feature['geometry']).centroid().coordinates().getInfo()
-        lon, lat = centroid
-        print(f"   📍 Lat: {lat:.2f}, Lon: {lon:.2f}")
-
-        # === NDVI取得 ===
-        def extract_ndvi(image):
-            mean_dict = image.reduceRegion(
-                reducer=ee.Reducer.mean(),
-                geometry=ee_feature.geometry(),
-                scale=250,
-                maxPixels=1e13
-            )
-            date = image.date().format('YYYY-MM-dd')
-            ndvi_value = ee.Algorithms.If(mean_dict.get('NDVI'), mean_dict.get('NDVI'), -9999)
-            return ee.Feature(None, {'date': date, 'NDVI': ndvi_value})
-
-        ndvi_fc = modis.map(extract_ndvi)
-        ndvi_list = ndvi_fc.getInfo()['features']
-        ndvi_df = pd.DataFrame([{'date': f['properties']['date'], 'NDVI': f['properties']['NDVI']} for f in ndvi_list])
-        ndvi_df['date'] = pd.to_datetime(ndvi_df['date'])
-        ndvi_daily = ndvi_df.set_index('date').resample('D').interpolate().reset_index()
-
-        # === NASA POWER T2M ===
-        url_power = "https://power.larc.nasa.gov/api/temporal/daily/point"
-        params = {
-            "start": f"{year}0101",
-            "end": f"{year}1231",
-            "latitude": lat,
-            "longitude": lon,
-            "parameters": "T2M",
-            "format": "JSON",
-            "community": "AG"
-        }
-        power_json = requests.get(url_power, params=params, timeout=30).json()
-        t2m_data = power_json["properties"]["parameter"]["T2M"]
-        t2m_df = pd.DataFrame(list(t2m_data.items()), columns=["date", "T2M"])
-        t2m_df["date"] = pd.to_datetime(t2m_df["date"])
-        t2m_df["T2M"] = t2m_df["T2M"].astype(float)
-
-        # === NDVI + T2M統合 ===
-        merged = pd.merge(t2m_df, ndvi_daily, on='date', how='inner')
-        merged['GDD_daily'] = (merged['T2M'] - T_base).clip(lower=0)
-        merged['GDD_cumsum'] = merged['GDD_daily'].cumsum()
-
-        # === NDVIピーク検出 ===
-        peaks, _ = find_peaks(merged['NDVI'].values, height=0.5)
-        merged['peak'] = 0
-        merged.loc[peaks, 'peak'] = 1
-
-        # === 保存 ===
-        merged.to_csv(out_csv, index=False)
-        plt.figure(figsize=(12,5))
-        plt.plot(merged['date'], merged['NDVI'], label='NDVI')
-        if len(peaks) > 0:
-            plt.plot(merged['date'].iloc[peaks], merged['NDVI'].iloc[peaks], 'ro', label='peak')
-        plt.xlabel("Date")
-        plt.ylabel("NDVI")
-        plt.title(f"{country_name} - {region_name} NDVI ({year})")
-        plt.legend()
-        plt.tight_layout()
-        plt.savefig(out_png, dpi=300)
-        plt.close()
-
-        print(f"✅ Saved {safe_name}")
-        time.sleep(1)  # サーバ負荷軽減
-
-    except Exception as e:
-        print(f"❌ Error processing {country_name}: {e}")
-        continue
-
-print("🌎 All countries processed (1 region each). Data saved in /world")
+import argparse
+
+import pycountry
+
+import ee_export
+from http_client import CACHE_DIR, CachedClient
+from ingest import Ingestor
+
+# === 初期設定 ===
+parser = argparse.ArgumentParser(description="Build world/ NDVI + GDD CSVs for every country")
+parser.add_argument("--year", type=int, default=2024)  # ← 対象年
+parser.add_argument("--backfill-from", type=int, help="この年から --year までまとめて処理する（POWERは地点ごとに1リクエスト）")
+parser.add_argument("--output-dir", default="world")
+parser.add_argument("--workers", type=int, default=8, help="同時に処理する国の数")
+parser.add_argument("--all-regions", action="store_true", help="全てのレベル1行政区を処理する (1国1リクエスト)")
+parser.add_argument("--gadm-rate", type=float, default=2.0, help="GADM requests per second")
+parser.add_argument("--ee-rate", type=float, default=4.0, help="Earth Engine requests per second")
+parser.add_argument("--power-rate", type=float, default=1.0, help="NASA POWER requests per second")
+parser.add_argument("--max-attempts", type=int, default=4, help="ステージごとの最大試行回数")
+parser.add_argument("--backoff", type=float, default=1.0, help="初回リトライまでの秒数（以降は倍々）")
+parser.add_argument("--http-cache", default=CACHE_DIR, help="GADM / NASA POWER レスポンスのキャッシュ先")
+parser.add_argument("--ndvi-backend", choices=["getinfo", "export", "pages", "raster"], default="getinfo",
+                    help="export: Export.table タスク / pages: computeFeatures のページング（どちらも全行政区）"
+                         " / raster: ローカルの MOD13Q1 タイル（Earth Engine 不要）")
+parser.add_argument("--tiles-dir", help="raster 用の MOD13Q1 GeoTIFF/HDF タイルのディレクトリ")
+parser.add_argument("--export-bucket", help="Export.table の出力先 Cloud Storage バケット")
+parser.add_argument("--batch-size", type=int, default=5, help="1つのNDVIジョブにまとめる国の数")
+parser.add_argument("--minmax", action="store_true",
+                    help="日最低・最高気温 (T2M_MIN / T2M_MAX) も取得して保存する（gdd.py の triangle / minmax 法用）")
+parser.add_argument("--refresh", action="store_true",
+                    help="保存済みの行政区に新しい合成値とPOWERの日だけ追記する（年全体は作り直さない）")
+args = parser.parse_args()
+if args.ndvi_backend == "export" and not args.export_bucket:
+    parser.error("--ndvi-backend export needs --export-bucket")
+if args.ndvi_backend == "raster" and not args.tiles_dir:
+    parser.error("--ndvi-backend raster needs --tiles-dir")
+
+if args.ndvi_backend == "raster":
+    from raster_ndvi import RasterNDVI
+    ee, raster = None, RasterNDVI(args.tiles_dir)
+else:
+    import ee
+    ee.Initialize(project='pollenproject-474105')
+    raster = None
+
+first_year = args.backfill_from or args.year
+http = CachedClient(args.http_cache)
+all_countries = [(c.name, c.alpha_3) for c in pycountry.countries]
+ee_client = ee_export.EarthEngineClient(ee, args.export_bucket)
+
+for year in range(first_year, args.year + 1):
+    ingestor = Ingestor(
+        ee, year, args.output_dir,
+        rates={"gadm": args.gadm_rate, "ee": args.ee_rate, "power": args.power_rate},
+        all_regions=args.all_regions or args.ndvi_backend in ("export", "pages"),
+        max_attempts=args.max_attempts,
+        backoff=args.backoff,
+        http=http,
+        t2m_years=(first_year, args.year),
+        ndvi_backend=raster,
+        minmax=args.minmax,
+    )
+    source = f"local tiles in {args.tiles_dir}" if raster else f"MODIS collection: {ingestor.modis_collection}"
+    print(f"🛰️ {year}: Using {source}")
+
+    # 全ての国ループ
+    if args.refresh:
+        ingestor.refresh(all_countries, workers=args.workers)
+    elif args.ndvi_backend in ("getinfo", "raster"):
+        ingestor.run(all_countries, workers=args.workers)
+    else:
+        scheduler = (ee_export.ExportScheduler(ee_client) if args.ndvi_backend == "export"
+                     else ee_export.PagedScheduler(ee_client))
+        ee_export.run_exports(ingestor, all_countries, scheduler, args.batch_size, args.workers)
+
+scope = "all regions" if ingestor.all_regions else "1 region each"
+print(f"🌎 All countries processed ({scope}, {first_year}-{args.year}). Data saved in /{args.output_dir}")
@@ -0,0 +1,146 @@
+import argparse
+import io
+import time
+import tracemalloc
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import Normalize
+from matplotlib.figure import Figure
+from PIL import GifImagePlugin, Image
+
+# metric column -> (colormap, title)
+METRICS = {
+    "NDVI": ("RdYlGn", "NDVI on {date} ({region})"),
+    "GDD_cumsum": ("YlOrRd", "Cumulative GDD on {date} ({region})"),
+}
+
+
+def region_country(world, region):
+    """Basemap ADMIN name for a region key like "Japan_Tokyo", or None.
+
+    Matched on the region's ISO3 (catalog.region_iso3), so keys spelled the
+    pycountry way ("Korea,_Republic_of_Seoul") find their country; the
+    longest "_"-joined prefix equal to an ADMIN name is the fallback.
+    """
+    from globe import iso3
+
+    matches = world.loc[world["ISO_A3"] == iso3(region), "ADMIN"]
+    if len(matches):
+        return matches.iloc[0]
+    parts = region.split("_")
+    names = set(world["ADMIN"])
+    for n in range(len(parts), 0, -1):
+        name = " ".join(parts[:n])
+        if name in names:
+            return name
+    return None
+
+
+def _frame_data(rgba, box, duration):
+    patch = Image.fromarray(rgba[box[1]:box[3], box[0]:box[2], :3]).quantize(colors=256)
+    # Every frame carries its own colour table, so patches need no shared palette
+    return GifImagePlugin.getdata(patch, offset=box[:2], duration=duration, disposal=1, include_color_table=True)
+
+
+def render_gif(world, country, dates, values, metric="NDVI", region=None, fps=10, figsize=(10, 6), dpi=72):
+    """Animated GIF (bytes) of `country` coloured by `values`, one frame per date.
+
+    Returns None when `values` has no finite value to colour by (an empty
+    selection, e.g. a start date after the data, or all NaN).
+
+    The basemap is rasterised once; each frame restores it, redraws only the
+    highlighted polygon and the title, and writes the pixels that changed
+    since the previous frame. Memory stays at two frame buffers however long
+    the series is.
+    """
+    cmap_name, title_fmt = METRICS[metric]
+    cmap = colormaps[cmap_name]
+    values = np.asarray(values, dtype=float)
+    if not np.isfinite(values).any():
+        return None
+    norm = Normalize(vmin=np.nanmin(values), vmax=np.nanmax(values))
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    world.plot(ax=ax, color='lightgrey', edgecolor='black')
+    ax.axis('off')
+    target = None
+    if country is not None:
+        world[world['ADMIN'] == country].plot(ax=ax, color='lightgrey', edgecolor='black')
+        target = ax.collections[-1]
+        target.set_animated(True)
+    title = ax.set_title("", fontsize=16)
+    title.set_animated(True)
+    canvas.draw()
+    background = canvas.copy_from_bbox(fig.bbox)
+
+    out = io.BytesIO()
+    duration = int(1000 / fps)
+    previous = None
+    for date, value in zip(dates, values):
+        canvas.restore_region(background)
+        if target is not None:
+            target.set_facecolor(cmap(norm(value)))
+            fig.draw_artist(target)
+        title.set_text(title_fmt.format(date=date.date(), region=region or country))
+        fig.draw_artist(title)
+        current = np.asarray(canvas.buffer_rgba()).copy()
+
+        if previous is None:
+            first = Image.fromarray(current[..., :3]).quantize(colors=256)
+            header, _ = GifImagePlugin.getheader(first, info={"loop": 0, "duration": duration})
+            out.write(b"".join(header))
+            box = (0, 0, current.shape[1], current.shape[0])
+        else:
+            # One uint32 compare per pixel instead of one per channel
+            changed = current.view(np.uint32)[..., 0] != previous.view(np.uint32)[..., 0]
+            rows, cols = np.flatnonzero(changed.any(axis=1)), np.flatnonzero(changed.any(axis=0))
+            if len(rows):
+                box = (cols[0], rows[0], cols[-1] + 1, rows[-1] + 1)
+            else:
+                box = (0, 0, 1, 1)
+        out.write(b"".join(_frame_data(current, box, duration)))
+        previous = current
+
+    out.write(b";")
+    return out.getvalue()
+
+
+def synthetic_world():
+    import geopandas as gpd
+    from shapely.geometry import box
+
+    cells = [box(x, y, x + 9, y + 9) for x in range(-180, 180, 10) for y in range(-90, 90, 10)]
+    names = [f"Cell {i}" for i in range(len(cells) - 1)] + ["Japan"]
+    return gpd.GeoDataFrame({"ADMIN": names}, geometry=cells, crs="EPSG:4326")
+
+
+def benchmark(frames=(90, 365)):
+    """Render time and peak traced memory for increasing frame counts on a synthetic basemap."""
+    import pandas as pd
+
+    world = synthetic_world()
+    rows = []
+    for n in frames:
+        dates = pd.date_range("2024-01-01", periods=n)
+        values = np.linspace(0, 1500, n)
+        start = time.perf_counter()
+        gif = render_gif(world, "Japan", dates, values, metric="GDD_cumsum")
+        elapsed = time.perf_counter() - start
+        # Separate traced run: tracemalloc slows rendering down several times
+        tracemalloc.start()
+        render_gif(world, "Japan", dates, values, metric="GDD_cumsum")
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rows.append({"frames": n, "seconds": elapsed, "peak_mib": peak / 2**20, "gif_kib": len(gif) / 1024})
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Map animation renderer")
+    parser.add_argument("--frames", type=int, nargs="+", default=[90, 365])
+    args = parser.parse_args()
+    print(benchmark(args.frames).to_string(index=False, float_format="%.2f"))
@@ -0,0 +1,220 @@
+import os
+
+import pandas as pd
+import streamlit as st
+
+import basemap
+import forecast
+from bloom_index import INDEX_PATH, BloomIndex, scan_bloom_date
+from gdd import T_base, GDDEngine
+from store import list_region_years, read_region_year, source_path
+
+
+def data_version(region, year):
+    """mtime of the file backing a region-year, or None when it does not exist."""
+    try:
+        return os.path.getmtime(source_path(region, year))
+    except FileNotFoundError:
+        return None
+
+
+@st.cache_data(max_entries=512)
+def _load_region_year(region, year, mtime):
+    df = read_region_year(region, year)
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+
+def load_region_year(region, year):
+    # The mtime is part of the cache key, so regenerated files are picked up
+    mtime = data_version(region, year)
+    if mtime is None:
+        raise FileNotFoundError(f"No data for {region} {year}")
+    return _load_region_year(region, year, mtime).copy()
+
+
+def load_training_frame(region, years):
+    dfs = [load_region_year(region, y) for y in years if data_version(region, y) is not None]
+    if not dfs:
+        raise FileNotFoundError(f"No data for {region} in {list(years)}")
+    return forecast.prepare_training(pd.concat(dfs, ignore_index=True))
+
+
+@st.cache_resource(max_entries=32)
+def _model(region, years, kind, params, signature):
+    params = dict(params)
+    if kind != "forest":
+        # Closed-form forecasters fit in milliseconds, so they skip the registry and disk cache
+        return forecast.make_forecaster(kind, **params).fit(load_training_frame(region, years))
+
+    # joblib and the registry are only needed on the forest path
+    import model_cache
+    import model_registry
+
+    # Pre-fit model from the offline registry, when it was trained on the current data
+    model = model_registry.load(region, years, params)
+    if model is not None:
+        return model
+
+    key = model_cache.model_key(region, years, {"kind": kind, **params}, signature)
+    return model_cache.get_or_fit(key, lambda: forecast.fit_forest(load_training_frame(region, years), **params))
+
+
+def forecast_model(region, years, kind="forest", **params):
+    """Fitted forecaster for a region, cached in memory (and on disk for the forest)."""
+    years = tuple(years)
+    signature = tuple(data_version(region, y) for y in years)
+    return _model(region, years, kind, tuple(sorted(params.items())), signature)
+
+
+@st.cache_data(max_entries=128)
+def _model_forecast(region, years, year, kind, params, signature):
+    train_df = load_training_frame(region, years)
+    model = _model(region, years, kind, params, signature)
+    return forecast.forecast(train_df, model, year)
+
+
+def model_forecast(region, years, year, kind="forest", **params):
+    """Daily NDVI forecast for `year`; plant type and start date only filter this frame."""
+    years = tuple(years)
+    signature = tuple(data_version(region, y) for y in years)
+    return _model_forecast(region, years, year, kind, tuple(sorted(params.items())), signature).copy()
+
+
+@st.cache_resource(max_entries=2)
+def _bloom_index(index_mtime, signature):
+    # The prebuilt index is used only while no stored series is newer than it and none was added;
+    # otherwise the index is rebuilt once per process from the stored series
+    if index_mtime is not None:
+        index = BloomIndex.load(INDEX_PATH)
+        current = all(mtime is not None and mtime <= index_mtime for _, mtime in signature)
+        if current and set(index.keys) == {key for key, _ in signature}:
+            return index
+    return BloomIndex.build({key: _load_region_year(*key, mtime) for key, mtime in signature})
+
+
+def bloom_index():
+    """BloomIndex over the current store; the key holds every region-year's data_version, as gdd_engine's does."""
+    signature = tuple((key, data_version(*key)) for key in list_region_years())
+    try:
+        index_mtime = os.path.getmtime(INDEX_PATH)
+    except FileNotFoundError:
+        index_mtime = None
+    return _bloom_index(index_mtime, signature)
+
+
+@st.cache_resource(max_entries=4)
+def _gdd_engine(year, signature):
+    return GDDEngine({(region, year): _load_region_year(region, year, mtime) for region, mtime in signature})
+
+
+def gdd_engine(year):
+    """GDDEngine over every stored region of `year`; planes for new base temperatures are added as queried."""
+    signature = tuple((region, data_version(region, y)) for region, y in list_region_years() if y == year)
+    return _gdd_engine(year, signature)
+
+
+def gdd_cumsum(region, year, base=T_base, method="mean"):
+    """Cumulative GDD of a region-year counted from `base` deg C by `method` (gdd.METHODS).
+
+    The stored column when base is 5 and the method is the daily mean.
+    """
+    if base == T_base and method == "mean":
+        return load_region_year(region, year).set_index('date')['GDD_cumsum']
+    return gdd_engine(year).series(region, year, base, method)
+
+
+def with_base(df, region, year, base, method="mean"):
+    """The region-year frame with GDD_cumsum replaced by the one counted from `base` by `method`."""
+    if base == T_base and method == "mean":
+        return df
+    df = df.copy()
+    df['GDD_cumsum'] = df['date'].map(gdd_cumsum(region, year, base, method))
+    return df
+
+
+def threshold_bloom_date(region, year, start_date, gdd_threshold, slope_threshold, base=T_base, method="mean"):
+    """First date from start_date where GDD_cumsum and the NDVI slope both reach their thresholds."""
+    if base != T_base or method != "mean":
+        # The bloom index holds the stored 5 deg C series; other bases and methods scan the recomputed one
+        df = with_base(load_region_year(region, year), region, year, base, method)
+        return scan_bloom_date(df, start_date, gdd_threshold, slope_threshold)
+    index = bloom_index()
+    if (region, year) in index:
+        return index.query(region, year, start_date, gdd_threshold, slope_threshold)
+    # Added after the index was built
+    return scan_bloom_date(load_region_year(region, year), start_date, gdd_threshold, slope_threshold)
+
+
+def bloom_league_table(year, start_date, gdd_threshold, slope_threshold, base=T_base, method="mean"):
+    if base != T_base or method != "mean":
+        from batch_predict import predict_all
+
+        engine = gdd_engine(year)
+        frames = {key: load_region_year(*key) for key in engine.keys}
+        table = predict_all(frames, {"plant": {"gdd": gdd_threshold, "ndvi": slope_threshold, "t_base": base}},
+                            start=pd.Timestamp(start_date).strftime("%m-%d"), engine=engine, method=method)
+        table = table[['region', 'bloom_date']].sort_values(["bloom_date", "region"], na_position="last",
+                                                            ignore_index=True)
+    else:
+        table = bloom_index().query_all(year, start_date, gdd_threshold, slope_threshold)
+    table['bloom_date'] = table['bloom_date'].dt.date
+    return table
+
+
+@st.cache_resource(max_entries=1)
+def _world_basemap(mtime):
+    return basemap.load()
+
+
+def world_basemap():
+    """Natural Earth countries from the local asset, parsed once per process and shared by all sessions."""
+    return _world_basemap(os.path.getmtime(basemap.ensure()))
+
+
+@st.cache_data(max_entries=32, show_spinner="Rendering animation...")
+def _map_animation(region, year, metric, start_date, until_peak, stride, mtime, basemap_mtime):
+    from animation import region_country, render_gif
+    from phenology import peak_flags
+
+    df = _load_region_year(region, year, mtime)
+    # 古い規則で保存された peak 列に頼らず、今の規則で判定し直す
+    df = df.assign(peak=peak_flags(df['NDVI'].values))
+    if start_date is not None:
+        df = df[df['date'] >= pd.to_datetime(start_date)]
+    if until_peak and (df['peak'] == 1).any():
+        df = df.loc[:df[df['peak'] == 1].index[0]]
+    df = df.iloc[::stride]
+    world = world_basemap()
+    return render_gif(world, region_country(world, region), df['date'], df[metric], metric, region=region)
+
+
+def map_animation(region, year, metric, start_date=None, until_peak=False, stride=1):
+    """GIF bytes animating `metric` over a region-year on the world map, rendered once per input version.
+
+    None when nothing is left to animate after the start date.
+    """
+    mtime = data_version(region, year)
+    if mtime is None:
+        raise FileNotFoundError(f"No data for {region} {year}")
+    world_basemap()  # downloads the basemap when the asset is missing, raises when that fails
+    basemap_mtime = os.path.getmtime(basemap.BASEMAP_PATH)
+    return _map_animation(region, year, metric, start_date, until_peak, stride, mtime, basemap_mtime)
+
+
+@st.cache_data(max_entries=8, show_spinner="Building globe...")
+def _globe_json(year, metric, stride, signature):
+    from globe import globe_json
+
+    frames = {region: _load_region_year(region, year, mtime) for region, mtime in signature}
+    return globe_json(frames, metric, title=f"🌸 {metric} Animation {year}", stride=stride)
+
+
+def globe_figure_json(year, metric="NDVI", stride=1):
+    """Serialized plotly globe over every stored region of `year`, rebuilt only when a file changes."""
+    signature = tuple(
+        (region, data_version(region, y)) for region, y in list_region_years() if y == year
+    )
+    if not signature:
+        raise FileNotFoundError(f"No data for {year}")
+    return _globe_json(year, metric, stride, signature)
@@ -0,0 +1,120 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+from store import BASE_DIR
+
+NATURAL_EARTH_URL = "https://raw.githubusercontent.com/nvkelso/natural-earth-vector/master/geojson/ne_110m_admin_0_countries.geojson"
+BASEMAP_DIR = os.path.join(BASE_DIR, "basemap")
+BASEMAP_PATH = os.path.join(BASEMAP_DIR, "ne_110m_admin_0_countries.parquet")
+MANIFEST_PATH = os.path.join(BASEMAP_DIR, "manifest.json")
+# Natural Earth spells these ADMIN / ISO_A3; older releases use admin / iso_a3
+COLUMNS = {"admin": "ADMIN", "iso_a3": "ISO_A3"}
+# Natural Earth leaves ISO_A3 as -99 for these; ADM0_A3 has the code when the source carries it
+ISO3_FIXES = {"France": "FRA", "Norway": "NOR"}
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def build(source=NATURAL_EARTH_URL, path=BASEMAP_PATH):
+    """Read the country polygons once (URL or local file) and store them as GeoParquet."""
+    import geopandas as gpd
+
+    world = gpd.read_file(source)
+    renamed = {}
+    for col in world.columns:
+        target = COLUMNS.get(col.lower())
+        if target and target not in renamed.values():
+            renamed[col] = target
+    world = world.rename(columns=renamed)
+    unknown = world["ISO_A3"] == "-99"
+    fallback = world["ADM0_A3"] if "ADM0_A3" in world.columns else world["ADMIN"].map(ISO3_FIXES)
+    world.loc[unknown, "ISO_A3"] = fallback[unknown].fillna("-99")
+    world = world[["ADMIN", "ISO_A3", "geometry"]]
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    world.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+    manifest_path = os.path.join(os.path.dirname(path), "manifest.json")
+    previous = load_manifest(manifest_path)
+    manifest = {
+        "version": previous.get("version", 0) + 1,
+        "source": source,
+        "sha256": file_hash(path),
+        "rows": len(world),
+        "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def ensure(path=BASEMAP_PATH, source=NATURAL_EARTH_URL):
+    """Path of the local asset, downloading it from `source` first when it is missing."""
+    if not os.path.exists(path):
+        try:
+            build(source, path)
+        except Exception as e:
+            raise FileNotFoundError(f"No basemap at {path} and the download failed ({e}); "
+                                    "run `python basemap.py build` where the network is available") from e
+    return path
+
+
+def load(path=BASEMAP_PATH):
+    """Country polygons (ADMIN, ISO_A3, geometry) from the local asset, downloaded on first use."""
+    import geopandas as gpd
+
+    return gpd.read_parquet(ensure(path))
+
+
+def memory_footprint(world):
+    """Approximate in-memory bytes: attribute columns plus 16 bytes per coordinate pair."""
+    import shapely
+
+    coords = int(shapely.get_num_coordinates(world.geometry.values).sum())
+    attributes = int(world.drop(columns="geometry").memory_usage(deep=True).sum())
+    return {"rows": len(world), "coordinates": coords, "bytes": attributes + 16 * coords}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline Natural Earth basemap")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="download (or read) the country polygons into the local asset")
+    build_cmd.add_argument("--source", default=NATURAL_EARTH_URL, help="URL or local GeoJSON/shapefile")
+    sub.add_parser("info", help="version, load time and memory footprint of the local asset")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        manifest = build(args.source)
+        print(f"Basemap v{manifest['version']}: {manifest['rows']} countries -> {BASEMAP_PATH}")
+    else:
+        manifest = load_manifest()
+        if manifest and manifest["sha256"] != file_hash(BASEMAP_PATH):
+            print("warning: basemap file does not match its manifest")
+        start = time.perf_counter()
+        world = load()
+        elapsed = time.perf_counter() - start
+        footprint = memory_footprint(world)
+        print(f"Basemap v{manifest.get('version', '?')} from {manifest.get('source', '?')}")
+        print(f"{footprint['rows']} countries, {footprint['coordinates']} coordinates, "
+              f"~{footprint['bytes'] / 1024:.0f} KiB in memory, loaded in {elapsed * 1000:.0f} ms "
+              f"({os.path.getsize(BASEMAP_PATH) / 1024:.0f} KiB on disk)")
@@ -0,0 +1,155 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from catalog import plant_types, world_pref_names
+from store import list_region_years, read_region_year
+
+PAD_DAY = np.iinfo(np.int64).max
+
+
+def stack_columns(frames, columns):
+    """Stack {(region, year): DataFrame} into (series x days) arrays padded to the longest series.
+
+    Returns keys, days (padded with PAD_DAY) and {column: array} (padded with
+    NaN; all NaN for series without that column).
+    """
+    keys = sorted(frames)
+    lengths = np.array([len(frames[k]) for k in keys], dtype=np.int64)
+    n = int(lengths.max()) if len(keys) else 0
+    days = np.full((len(keys), n), PAD_DAY, dtype=np.int64)
+    values = {c: np.full((len(keys), n), np.nan) for c in columns}
+    if not len(keys) or not n:
+        return keys, days, values
+
+    # One concat, then scatter every row into its (series, position) cell
+    long = pd.concat([frames[k].reindex(columns=["date", *columns]) for k in keys], ignore_index=True)
+    row = np.repeat(np.arange(len(keys)), lengths)
+    col = np.arange(len(long)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    days[row, col] = pd.to_datetime(long['date']).values.astype("datetime64[D]").astype(np.int64)
+    for c in columns:
+        values[c][row, col] = long[c].to_numpy(dtype=float)
+    return keys, days, values
+
+
+def stack_series(frames):
+    """keys, days, NDVI and GDD_cumsum of every series, as stack_columns stacks them."""
+    keys, days, values = stack_columns(frames, ["NDVI", "GDD_cumsum"])
+    return keys, days, values["NDVI"], values["GDD_cumsum"]
+
+
+def first_bloom_index(days, ndvi, gdd, start_days, gdd_thresholds, slope_thresholds):
+    """Index of the first threshold crossing for every (plant, series), -1 when none.
+
+    Same rule as the app: rows from start_day on, NDVI slope taken within that
+    window (so its first row has none), GDD_cumsum >= G and slope >= S.
+    `gdd` is (series, days), or (plants, series, days) for per-plant base temperatures.
+    """
+    in_window = days >= start_days[:, None]
+    first = in_window.argmax(axis=1)
+    cols = np.arange(days.shape[1])
+    has_slope = in_window & (cols[None, :] > first[:, None])
+    slope = np.diff(ndvi, axis=1, prepend=np.nan)
+
+    g = np.asarray(gdd_thresholds, dtype=float)[:, None, None]
+    s = np.asarray(slope_thresholds, dtype=float)[:, None, None]
+    gdd = gdd if gdd.ndim == 3 else gdd[None]
+    cond = has_slope[None] & (gdd >= g) & (slope[None] >= s)
+    return np.where(cond.any(axis=2), cond.argmax(axis=2), -1)
+
+
+def predict_all(frames, plants=None, start="03-01", engine=None, method="mean"):
+    """Bloom date for every region-year in `frames` and every plant, as one long table.
+
+    Plants whose "t_base" differs from the stored 5 deg C get their GDD
+    recomputed from T2M (gdd.GDDEngine, or `engine` when one over the same frames is cached),
+    all bases in one pass. Any `method` but "mean" (gdd.METHODS) recomputes
+    every plant's GDD from T2M_MIN / T2M_MAX; series without them get no date.
+    """
+    from gdd import T_base, GDDEngine
+
+    plants = plants or {name: t for name, t in plant_types.items() if t["gdd"] is not None}
+    keys, days, ndvi, gdd = stack_series(frames)
+    start_days = np.array(
+        [np.datetime64(f"{year}-{start}", "D").astype(np.int64) for _, year in keys], dtype=np.int64
+    )
+    names = list(plants)
+    bases = [plants[p].get("t_base") or T_base for p in names]
+    recompute = any(b != T_base for b in bases) and all("T2M" in df.columns for df in frames.values())
+    if recompute or method != "mean":
+        # 植物ごとの基準温度で保存済みの気温から積算し直す (plants, series, days)
+        gdd = np.moveaxis((engine or GDDEngine(frames)).cube(bases, method), -1, 0)
+    idx = first_bloom_index(
+        days, ndvi, gdd, start_days,
+        [plants[p]["gdd"] for p in names], [plants[p]["ndvi"] for p in names],
+    )
+
+    rows = np.broadcast_to(np.arange(len(keys)), idx.shape)
+    bloom = days[rows, np.maximum(idx, 0)].astype("datetime64[D]")
+    bloom[idx < 0] = np.datetime64("NaT")
+    return pd.DataFrame({
+        "region": np.tile([k[0] for k in keys], len(names)),
+        "year": np.tile([k[1] for k in keys], len(names)),
+        "plant": np.repeat(names, len(keys)),
+        "bloom_date": pd.to_datetime(bloom.ravel()),
+    })
+
+
+def load_frames(regions, years):
+    wanted = set(regions)
+    return {
+        (region, year): read_region_year(region, year)
+        for region, year in list_region_years()
+        if region in wanted and year in years
+    }
+
+
+def synthetic_frames(n_regions=250, years=range(2019, 2025), seed=0):
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for r in range(n_regions):
+        for year in years:
+            dates = pd.date_range(f"{year}-01-01", f"{year}-12-31")
+            doy = dates.dayofyear.to_numpy()
+            t2m = 15 - 10 * np.cos(2 * np.pi * (doy - 15) / 365) + rng.normal(0, 2, len(dates))
+            ndvi = 4000 + rng.normal(0, 20, len(dates)).cumsum()
+            spread = rng.uniform(4, 12, len(dates))
+            frames[(f"Region{r}", year)] = pd.DataFrame({
+                'date': dates,
+                'T2M': t2m,
+                'T2M_MIN': t2m - spread / 2,
+                'T2M_MAX': t2m + spread / 2,
+                'NDVI': ndvi,
+                'GDD_cumsum': np.clip(t2m - 5, 0, None).cumsum(),
+            })
+    return frames
+
+
+if __name__ == "__main__":
+    from gdd import METHODS
+
+    parser = argparse.ArgumentParser(description="Bloom dates for every region, plant and year")
+    parser.add_argument("--years", type=int, nargs="+", default=list(range(2019, 2025)))
+    parser.add_argument("--start", default="03-01", help="observation start (MM-DD) in each year")
+    parser.add_argument("--gdd-method", default="mean", choices=list(METHODS),
+                        help="daily GDD from T2M (mean) or from T2M_MIN / T2M_MAX (ingested with analyze.py --minmax)")
+    parser.add_argument("--out", default="bloom_dates.csv")
+    parser.add_argument("--bench", action="store_true", help="time the full 250-region grid on synthetic data")
+    args = parser.parse_args()
+
+    if args.bench:
+        frames = synthetic_frames(years=args.years)
+    else:
+        t0 = time.perf_counter()
+        frames = load_frames(world_pref_names, args.years)
+        print(f"Loaded {len(frames)} region-years in {time.perf_counter() - t0:.2f}s")
+
+    t0 = time.perf_counter()
+    table = predict_all(frames, start=args.start, method=args.gdd_method)
+    elapsed = time.perf_counter() - t0
+    print(f"Predicted {len(table)} bloom dates ({len(frames)} region-years) in {elapsed * 1000:.0f} ms")
+    if not args.bench:
+        table.to_csv(args.out, index=False)
+        print(f"Saved {args.out}")
@@ -0,0 +1,168 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from store import BASE_DIR, STORE_DIR, WORLD_DIR, list_region_years, read_region_year
+
+INDEX_PATH = os.path.join(BASE_DIR, "bloom_index.npz")
+
+
+def _to_day(value):
+    return np.datetime64(pd.Timestamp(value).date(), "D").astype(np.int64)
+
+
+def _sparse_max(slope):
+    # levels[k][i] = max(slope[i : i + 2**k]), padded with -inf past the end
+    levels = [slope]
+    width = 1
+    while width * 2 <= slope.shape[-1]:
+        prev = levels[-1]
+        nxt = np.full_like(prev, -np.inf)
+        nxt[..., : prev.shape[-1] - width] = np.maximum(prev[..., :-width], prev[..., width:])
+        levels.append(nxt)
+        width *= 2
+    return np.stack(levels)
+
+
+def _row_searchsorted(a, v):
+    """np.searchsorted(a[r], v[r], 'left') for every row r of a 2-D sorted array."""
+    n = a.shape[1]
+    lo = np.zeros(a.shape[0], dtype=np.int64)
+    step = 1 << max(n - 1, 0).bit_length()
+    rows = np.arange(a.shape[0])
+    while step:
+        probe = lo + step - 1
+        ok = probe < n
+        move = ok.copy()
+        move[ok] = a[rows[ok], probe[ok]] < v[ok]
+        lo[move] += step
+        step >>= 1
+    return lo
+
+
+class BloomIndex:
+    """Per region-year arrays answering threshold bloom queries by binary search.
+
+    For each series the index keeps the dates, the non-decreasing GDD_cumsum
+    (so the GDD crossing is a searchsorted) and a sparse max-table over the
+    daily NDVI slope (so the first slope crossing after it is a binary descent).
+    The first row after the start date has no slope, as in the app's diff().
+    """
+
+    def __init__(self, keys, days, gdd, table):
+        self.keys = [tuple(k) for k in keys]
+        self.positions = {key: i for i, key in enumerate(self.keys)}
+        self.days = days      # (series, n) int64 days since epoch, padded with int64 max
+        self.gdd = gdd        # (series, n) GDD_cumsum, padded with +inf
+        self.table = table    # (levels, series, n) slope range maxima, padded with -inf
+
+    @classmethod
+    def build(cls, frames):
+        """`frames` maps (region, year) to a DataFrame with date, NDVI and GDD_cumsum."""
+        keys = sorted(frames)
+        n = max((len(frames[k]) for k in keys), default=1)
+        days = np.full((len(keys), n), np.iinfo(np.int64).max, dtype=np.int64)
+        gdd = np.full((len(keys), n), np.inf)
+        slope = np.full((len(keys), n), -np.inf)
+        for i, key in enumerate(keys):
+            df = frames[key].sort_values('date')
+            m = len(df)
+            days[i, :m] = pd.to_datetime(df['date']).values.astype("datetime64[D]").astype(np.int64)
+            gdd[i, :m] = df['GDD_cumsum'].to_numpy(dtype=float)
+            s = np.diff(df['NDVI'].to_numpy(dtype=float), prepend=np.nan)
+            slope[i, :m] = np.where(np.isnan(s), -np.inf, s)
+        return cls(keys, days, gdd, _sparse_max(slope))
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            keys = list(zip(data["regions"].tolist(), data["years"].tolist()))
+            return cls(keys, data["days"], data["gdd"], data["table"])
+
+    def save(self, path=INDEX_PATH):
+        regions = np.array([k[0] for k in self.keys])
+        years = np.array([k[1] for k in self.keys], dtype=np.int64)
+        np.savez_compressed(path, regions=regions, years=years, days=self.days, gdd=self.gdd, table=self.table)
+
+    def __contains__(self, key):
+        return tuple(key) in self.positions
+
+    def _query_rows(self, rows, start_day, gdd_threshold, slope_threshold):
+        days, gdd = self.days[rows], self.gdd[rows]
+        n = days.shape[1]
+        count = len(rows)
+        first = _row_searchsorted(days, np.full(count, start_day, dtype=np.int64)) + 1
+        crossed = _row_searchsorted(gdd, np.full(count, float(gdd_threshold)))
+        j = np.maximum(first, crossed)
+
+        # Skip slope blocks whose maximum is below the threshold, largest first
+        for level in range(self.table.shape[0] - 1, -1, -1):
+            width = 1 << level
+            ok = j + width <= n
+            skip = ok.copy()
+            skip[ok] = self.table[level, rows[ok], j[ok]] < slope_threshold
+            j[skip] += width
+
+        found = j < n
+        found[found] = self.table[0, rows[found], j[found]] >= slope_threshold
+        result = np.full(count, np.datetime64("NaT"), dtype="datetime64[D]")
+        result[found] = days[found, j[found]].astype("datetime64[D]")
+        return result
+
+    def query(self, region, year, start_date, gdd_threshold, slope_threshold):
+        """First date on/after start_date with GDD_cumsum >= G and NDVI slope >= S, or None."""
+        row = np.array([self.positions[(region, year)]])
+        result = self._query_rows(row, _to_day(start_date), gdd_threshold, slope_threshold)[0]
+        return None if np.isnat(result) else pd.Timestamp(result)
+
+    def query_all(self, year, start_date, gdd_threshold, slope_threshold):
+        """Bloom date for every indexed region of `year`, as a DataFrame sorted by date."""
+        rows = np.array([i for i, key in enumerate(self.keys) if key[1] == year], dtype=np.int64)
+        dates = self._query_rows(rows, _to_day(start_date), gdd_threshold, slope_threshold)
+        table = pd.DataFrame({
+            "region": [self.keys[i][0] for i in rows],
+            "bloom_date": pd.to_datetime(dates),
+        })
+        return table.sort_values(["bloom_date", "region"], na_position="last", ignore_index=True)
+
+
+def build_index(path=INDEX_PATH, store_dir=STORE_DIR, world_dir=WORLD_DIR):
+    frames = {key: read_region_year(*key, store_dir, world_dir) for key in list_region_years(store_dir, world_dir)}
+    index = BloomIndex.build(frames)
+    index.save(path)
+    return index
+
+
+def scan_bloom_date(df, start_date, gdd_threshold, slope_threshold):
+    # The original per-request pandas scan, kept for cross-checking
+    df = df[df['date'] >= pd.to_datetime(start_date)].copy()
+    df['NDVI_slope'] = df['NDVI'].diff()
+    cond = (df['GDD_cumsum'] >= gdd_threshold) & (df['NDVI_slope'] >= slope_threshold)
+    return df[cond]['date'].iloc[0] if cond.any() else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precomputed bloom-date index")
+    parser.add_argument("command", choices=["build", "check"])
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = build_index()
+    print(f"Indexed {len(index.keys)} region-years in {time.perf_counter() - start:.2f}s -> {INDEX_PATH}")
+
+    if args.command == "check":
+        # Compare every index answer with the pandas scan over a grid of queries
+        mismatches = 0
+        for region, year in index.keys:
+            df = read_region_year(region, year)
+            for month in (1, 3, 5):
+                for gdd_threshold in (0, 80, 120, 500):
+                    for slope_threshold in (0.0, 2.0, 10.0, 15.0):
+                        start_date = pd.Timestamp(year, month, 1)
+                        expected = scan_bloom_date(df, start_date, gdd_threshold, slope_threshold)
+                        got = index.query(region, year, start_date, gdd_threshold, slope_threshold)
+                        mismatches += expected != got
+        print(f"{mismatches} mismatches")
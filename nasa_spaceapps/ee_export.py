@@ -0,0 +1,256 @@
+import io
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from ingest import interpolate_regions
+from jobs import COUNTRY, StageFailed
+
+# Columns of every exported row: one per (region, composite)
+SELECTORS = ["country", "NAME_1", "date", "mean", "lat", "lon"]
+TERMINAL = {"COMPLETED", "FAILED", "CANCELLED"}
+# Task states that are still on their way to TERMINAL; any other state (UNKNOWN ...) counts as a failure
+ACTIVE = {"UNSUBMITTED", "READY", "RUNNING", "CANCEL_REQUESTED"}
+
+
+class EarthEngineClient:
+    """The few Earth Engine calls the NDVI export path makes.
+
+    The schedulers only talk to this surface, so a fake with the same five
+    methods runs them offline. Exports land in a Cloud Storage bucket; reading
+    them back needs google-cloud-storage.
+    """
+
+    def __init__(self, ee_module, bucket=None, prefix="ndvi_exports", page_size=5000):
+        self.ee = ee_module
+        self.bucket = bucket
+        self.prefix = prefix
+        self.page_size = page_size
+
+    def start_export(self, collection, name):
+        task = self.ee.batch.Export.table.toCloudStorage(
+            collection=collection,
+            description=name,
+            bucket=self.bucket,
+            fileNamePrefix=f"{self.prefix}/{name}",
+            fileFormat="CSV",
+            selectors=SELECTORS,
+        )
+        task.start()
+        return task.id
+
+    def statuses(self, task_ids):
+        """{task id: status dict with at least "state"} in one call for all tasks."""
+        return {status["id"]: status for status in self.ee.data.getTaskStatus(list(task_ids))}
+
+    def cancel(self, task_id):
+        self.ee.data.cancelTask(task_id)
+
+    def download(self, name):
+        from google.cloud import storage
+
+        blob = storage.Client().bucket(self.bucket).blob(f"{self.prefix}/{name}.csv")
+        return pd.read_csv(io.StringIO(blob.download_as_text()))
+
+    def compute_features(self, collection, page_token=None):
+        """(rows, next page token) for one page of a feature collection, no task needed."""
+        params = {"expression": collection, "pageSize": self.page_size}
+        if page_token:
+            params["pageToken"] = page_token
+        result = self.ee.data.computeFeatures(params)
+        return [f["properties"] for f in result.get("features", [])], result.get("nextPageToken")
+
+
+def ndvi_collection(ee, modis, regions_by_country):
+    """Mean NDVI (scale 250) of every region in every composite, with country and centroid on each row."""
+    regions = ee.FeatureCollection([
+        ee.Feature(f['geometry'], {'country': country, 'NAME_1': f['properties']['NAME_1']})
+        for country, features in regions_by_country.items()
+        for f in features
+    ])
+
+    def with_centroid(f):
+        lonlat = f.geometry().centroid(1).coordinates()
+        return f.set('lon', lonlat.get(0), 'lat', lonlat.get(1))
+
+    regions = regions.map(with_centroid)
+
+    def reduce_image(image):
+        date = image.date().format('YYYY-MM-dd')
+        reduced = image.reduceRegions(collection=regions, reducer=ee.Reducer.mean(), scale=250)
+        return reduced.map(lambda f: f.set('date', date))
+
+    return modis.map(reduce_image).flatten().select(SELECTORS, None, False)
+
+
+def country_frames(rows):
+    """{country: daily NDVI table} shaped like Ingestor.process_regions' ndvi checkpoint."""
+    rows = pd.DataFrame(rows, columns=SELECTORS).rename(columns={'mean': 'NDVI'})
+    rows['NDVI'] = rows['NDVI'].astype(float).fillna(-9999)
+    rows['date'] = pd.to_datetime(rows['date'])
+    frames = {}
+    for country, part in rows.groupby('country'):
+        daily = interpolate_regions(part[['NAME_1', 'date', 'NDVI']])
+        coords = part.groupby('NAME_1')[['lat', 'lon']].first().astype(float)
+        daily['lat'] = daily['NAME_1'].map(coords['lat'])
+        daily['lon'] = daily['NAME_1'].map(coords['lon'])
+        frames[country] = daily
+    return frames
+
+
+class ExportScheduler:
+    """Keep up to `max_running` Export.table tasks in flight and poll them all in one call.
+
+    Jobs are (name, collection, countries) tuples. run() yields
+    (job, rows, error) in completion order; a failed task is resubmitted
+    until `max_attempts`, then yielded with its error. A task in a state
+    outside ACTIVE / TERMINAL, missing from the status answer, or still
+    active after `timeout` seconds (it is cancelled) counts as failed.
+    """
+
+    def __init__(self, client, max_running=8, poll_interval=15.0, max_attempts=3, timeout=6 * 3600,
+                 sleep=time.sleep, clock=time.monotonic):
+        self.client = client
+        self.max_running = max_running
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.sleep = sleep
+        self.clock = clock
+
+    def run(self, jobs):
+        queue = deque((job, 1) for job in jobs)
+        running = {}
+        while queue or running:
+            while queue and len(running) < self.max_running:
+                job, attempt = queue.popleft()
+                task_id = self.client.start_export(job[1], f"{job[0]}_{attempt}")
+                running[task_id] = (job, attempt, self.clock())
+            self.sleep(self.poll_interval)
+            statuses = self.client.statuses(running)
+            for task_id in list(running):
+                state = statuses.get(task_id, {}).get("state", "UNKNOWN")
+                job, attempt, started = running[task_id]
+                if state in ACTIVE:
+                    if self.clock() - started < self.timeout:
+                        continue
+                    self.client.cancel(task_id)
+                    error = f"{state} after {self.timeout:.0f}s; cancelled"
+                elif state in TERMINAL:
+                    error = statuses[task_id].get("error_message", state)
+                else:
+                    error = f"task state {state}"
+                del running[task_id]
+                if state == "COMPLETED":
+                    try:
+                        yield job, self.client.download(f"{job[0]}_{attempt}"), None
+                        continue
+                    except Exception as e:
+                        error = repr(e)
+                if attempt < self.max_attempts:
+                    queue.append((job, attempt + 1))
+                else:
+                    yield job, None, error
+
+
+class PagedScheduler:
+    """computeFeatures paging for the same jobs: no bucket needed, `workers` collections at a time."""
+
+    def __init__(self, client, workers=4, max_attempts=3, backoff=1.0, sleep=time.sleep):
+        self.client = client
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.sleep = sleep
+
+    def fetch(self, collection):
+        rows, token = [], None
+        while True:
+            for attempt in range(1, self.max_attempts + 1):
+                try:
+                    page, token = self.client.compute_features(collection, token)
+                    break
+                except Exception:
+                    if attempt == self.max_attempts:
+                        raise
+                    self.sleep(self.backoff * 2 ** (attempt - 1))
+            rows.extend(page)
+            if not token:
+                return rows
+
+    def run(self, jobs):
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.fetch, job[1]): job for job in jobs}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    yield futures[future], None, repr(e)
+
+
+def run_exports(ingestor, countries, scheduler, batch_size=5, workers=8):
+    """All-regions NDVI for `countries` through batched EE jobs, merged into the store as each batch lands.
+
+    Each finished batch is split per country into the same ndvi checkpoint
+    Ingestor.process_regions writes, so T2M / merge / store for those
+    countries start right away on `workers` threads and reruns skip them.
+    """
+    if not ingestor.all_regions:
+        raise ValueError("run_exports needs an Ingestor with all_regions=True; the export path fetches every level-1 region")
+    year = ingestor.year
+    iso3s = dict(countries)
+    counts = {}
+    start = time.monotonic()
+
+    def count(status):
+        counts[status] = counts.get(status, 0) + 1
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        def geometry(name):
+            return ingestor.stages.run((name, COUNTRY, year), "geometry", lambda: ingestor.fetch_regions(iso3s[name]))
+
+        merges, regions = {}, {}
+        for name, future in [(name, pool.submit(geometry, name)) for name in iso3s]:
+            try:
+                features = future.result()
+            except StageFailed as e:
+                print(f"❌ {e}")
+                count("failed")
+                continue
+            if not features:
+                count("missing")
+            elif ingestor.manifest.status(name, COUNTRY, year, "ndvi") == "done":
+                merges[pool.submit(ingestor.process_country, name, iso3s[name])] = name
+            else:
+                regions[name] = features
+
+        names = list(regions)
+        jobs = [
+            (f"ndvi_{year}_{i // batch_size:04d}",
+             ndvi_collection(ingestor.ee, ingestor.modis, {name: regions[name] for name in names[i:i + batch_size]}),
+             names[i:i + batch_size])
+            for i in range(0, len(names), batch_size)
+        ]
+        print(f"🛰️ {len(jobs)} NDVI jobs for {len(names)} countries ({year})")
+
+        for (job_name, _, batch), rows, error in scheduler.run(jobs):
+            frames = country_frames(rows) if error is None else {}
+            for name in batch:
+                key = (name, COUNTRY, year)
+                if name in frames:
+                    ingestor.stages.checkpoints.save(key, "ndvi", frames[name])
+                    ingestor.manifest.record(*key, "ndvi", "done", 1)
+                    merges[pool.submit(ingestor.process_country, name, iso3s[name])] = name
+                else:
+                    ingestor.manifest.record(*key, "ndvi", "failed", 1, error=error or "no rows exported")
+                    count("failed")
+            print(f"📥 {job_name}: {len(frames)}/{len(batch)} countries" + (f" ({error})" if error else ""))
+
+        for future in as_completed(merges):
+            count(ingestor.outcome(future, merges[future]))
+
+    elapsed = time.monotonic() - start
+    print(f"⏱️ {sum(counts.values())} countries in {elapsed:.1f}s {counts}")
+    return {"counts": counts, "elapsed": elapsed}
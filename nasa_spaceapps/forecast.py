@@ -0,0 +1,153 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from store import read_region_year, read_region_years
+
+TRAIN_YEARS = tuple(range(2019, 2025))
+# RandomForest settings of each app; the offline registry (model_registry.py) trains both
+FOREST_PARAMS = {"n_estimators": 300, "max_depth": 10}       # flower_predict_app
+WORLD_FOREST_PARAMS = {"n_estimators": 50, "max_depth": 5}   # earth_flower_predict
+T_base = 5
+temp_trend_per_year = 3.0
+
+
+class Forecaster:
+    """NDVI model over a daily frame with doy, GDD_cumsum and T2M columns."""
+
+    name = "base"
+
+    def fit(self, train_df):
+        raise NotImplementedError
+
+    def predict(self, df):
+        raise NotImplementedError
+
+
+class ForestForecaster(Forecaster):
+    """RandomForest on [GDD_cumsum, T2M] -> NDVI (the original forecast model)."""
+
+    name = "forest"
+
+    def __init__(self, n_estimators=300, max_depth=10):
+        self.n_estimators = n_estimators
+        self.max_depth = max_depth
+        self.model = None
+
+    def fit(self, train_df):
+        from sklearn.ensemble import RandomForestRegressor
+
+        self.model = RandomForestRegressor(n_estimators=self.n_estimators, max_depth=self.max_depth, random_state=42)
+        self.model.fit(train_df[['GDD_cumsum', 'T2M']], train_df['NDVI'])
+        return self
+
+    def predict(self, df):
+        return self.model.predict(df[['GDD_cumsum', 'T2M']])
+
+
+class HarmonicForecaster(Forecaster):
+    """Seasonal harmonics of day-of-year plus a linear GDD_cumsum term, solved by least squares."""
+
+    name = "harmonic"
+
+    def __init__(self, harmonics=3):
+        self.harmonics = harmonics
+        self.coef = None
+
+    def design(self, df):
+        t = 2 * np.pi * df['doy'].to_numpy(dtype=float) / 365.25
+        columns = [np.ones_like(t)]
+        for k in range(1, self.harmonics + 1):
+            columns += [np.cos(k * t), np.sin(k * t)]
+        # Days with no T2M climatology (late December) carry the last known GDD_cumsum
+        columns.append(df['GDD_cumsum'].ffill().to_numpy(dtype=float) / 1000.0)
+        return np.column_stack(columns)
+
+    def fit(self, train_df):
+        self.coef, *_ = np.linalg.lstsq(self.design(train_df), train_df['NDVI'].to_numpy(dtype=float), rcond=None)
+        return self
+
+    def predict(self, df):
+        return self.design(df) @ self.coef
+
+
+FORECASTERS = {
+    "forest": ForestForecaster,
+    "harmonic": HarmonicForecaster,
+}
+
+
+def make_forecaster(kind="forest", **params):
+    return FORECASTERS[kind](**params)
+
+
+def prepare_training(train_df):
+    train_df = train_df.copy()
+    train_df['date'] = pd.to_datetime(train_df['date'])
+    train_df = train_df.dropna(subset=['NDVI', 'GDD_cumsum', 'T2M'])
+    train_df['doy'] = train_df['date'].dt.dayofyear
+    return train_df
+
+
+def training_frame(region, years=TRAIN_YEARS):
+    return prepare_training(read_region_years(region, years))
+
+
+def fit_forest(train_df, n_estimators=300, max_depth=10):
+    return ForestForecaster(n_estimators, max_depth).fit(train_df)
+
+
+def future_frame(train_df, year):
+    """Expected daily T2M / GDD for `year`: the day-of-year mean plus a warming trend."""
+    last_year = train_df['date'].dt.year.max()
+    avg_daily_temp = train_df.groupby('doy')['T2M'].mean()
+    future_dates = pd.date_range(f"{year}-01-01", f"{year}-12-31")
+    future_df = pd.DataFrame({'date': future_dates})
+    future_df['doy'] = future_df['date'].dt.dayofyear
+    future_df['T2M'] = future_df['doy'].map(avg_daily_temp) + temp_trend_per_year*(year-last_year)
+    future_df['GDD_daily'] = (future_df['T2M'] - T_base).clip(lower=0)
+    future_df['GDD_cumsum'] = future_df['GDD_daily'].cumsum()
+    return future_df
+
+
+def forecast(train_df, model, year):
+    future_df = future_frame(train_df, year)
+    future_df['NDVI_pred'] = model.predict(future_df)
+    return future_df
+
+
+def benchmark(region="Japan_Tokyo", years=TRAIN_YEARS, kinds=("forest", "harmonic")):
+    """Leave-one-year-out accuracy and fit+predict latency for each forecaster."""
+    frames = {}
+    for year in years:
+        try:
+            frames[year] = prepare_training(read_region_year(region, year))
+        except FileNotFoundError:
+            continue
+
+    rows = []
+    for kind in kinds:
+        errors, seconds = [], []
+        for held_out, test_df in frames.items():
+            train_df = pd.concat([df for y, df in frames.items() if y != held_out], ignore_index=True)
+            start = time.perf_counter()
+            pred = make_forecaster(kind).fit(train_df).predict(test_df)
+            seconds.append(time.perf_counter() - start)
+            errors.append(pred - test_df['NDVI'].to_numpy())
+        errors = np.concatenate(errors)
+        rows.append({
+            "model": kind,
+            "rmse": float(np.sqrt(np.mean(errors ** 2))),
+            "mae": float(np.mean(np.abs(errors))),
+            "fit_predict_ms": 1000 * float(np.mean(seconds)),
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Forecaster accuracy vs latency")
+    parser.add_argument("--region", default="Japan_Tokyo")
+    args = parser.parse_args()
+    print(benchmark(args.region).to_string(index=False))
@@ -0,0 +1,157 @@
+import argparse
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from batch_predict import PAD_DAY, stack_columns, synthetic_frames
+
+T_base = 5.0  # base temperature of the stored GDD_daily / GDD_cumsum columns
+MAX_PLANES = 16  # (method, base) planes an engine keeps; each is series x days float64
+
+TEMPERATURES = ["T2M", "T2M_MIN", "T2M_MAX"]
+# method -> temperature columns it needs
+METHODS = {
+    "mean": ["T2M"],                   # max(T2M - base, 0), as ingest stores it
+    "minmax": ["T2M_MIN", "T2M_MAX"],  # max((Tmin + Tmax) / 2 - base, 0)
+    "triangle": ["T2M_MIN", "T2M_MAX"],  # single triangle between Tmin and Tmax
+}
+
+
+def stack_temperatures(frames):
+    """batch_predict.stack_columns over every temperature column present in any series."""
+    return stack_columns(frames, [c for c in TEMPERATURES if any(c in df.columns for df in frames.values())])
+
+
+def daily_gdd(bases, method="mean", T2M=None, T2M_MIN=None, T2M_MAX=None):
+    """(series, days, bases) daily degree-days: the temperatures broadcast against a trailing bases axis."""
+    b = np.asarray(bases, dtype=float)
+    if method == "mean":
+        return np.clip(T2M[..., None] - b, 0, None)
+    low, high = T2M_MIN[..., None], T2M_MAX[..., None]
+    mean = (low + high) / 2
+    if method == "minmax":
+        return np.clip(mean - b, 0, None)
+    if method != "triangle":
+        raise ValueError(f"unknown GDD method {method!r}; expected one of {list(METHODS)}")
+    # 基準温度が Tmin と Tmax の間にある日は三角形の基準温度より上の部分だけ数える
+    with np.errstate(divide="ignore", invalid="ignore"):
+        partial = (high - b) ** 2 / (2 * (high - low))
+    return np.where(low >= b, mean - b, np.where(high <= b, 0.0, partial))
+
+
+def cumulative(daily):
+    """Running sum along the days axis; missing days add nothing and stay NaN."""
+    missing = np.isnan(daily)
+    return np.where(missing, np.nan, np.cumsum(np.where(missing, 0.0, daily), axis=1))
+
+
+class GDDEngine:
+    """Cumulative GDD at any base temperature from stored temperatures, without re-ingesting.
+
+    The temperatures of every series are stacked once. A (method, base)
+    plane is computed the first time a query needs it, together with every
+    other missing base of that query in one broadcast pass, and kept for
+    later queries; past `max_planes` the least recently used are dropped.
+    The app shares one engine between sessions, so queries take a lock.
+    """
+
+    def __init__(self, frames, max_planes=MAX_PLANES):
+        self.keys, self.days, self.temps = stack_temperatures(frames)
+        self.positions = {key: i for i, key in enumerate(self.keys)}
+        self.max_planes = max_planes
+        self.planes = OrderedDict()  # (method, base) -> (series, days) cumulative GDD, oldest use first
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_store(cls, years=None):
+        from store import list_region_years, read_region_year
+
+        return cls({key: read_region_year(*key) for key in list_region_years() if years is None or key[1] in years})
+
+    def __contains__(self, key):
+        return tuple(key) in self.positions
+
+    def planes_for(self, bases, method="mean"):
+        """The (series, days) cumulative GDD plane of every base, computing the missing ones in one pass."""
+        if method not in METHODS:
+            raise ValueError(f"unknown GDD method {method!r}; expected one of {list(METHODS)}")
+        missing = [c for c in METHODS[method] if c not in self.temps]
+        if missing:
+            raise ValueError(f"method {method!r} needs {missing}; ingest with analyze.py --minmax")
+        bases = [float(b) for b in bases]
+        with self.lock:
+            todo = [b for b in dict.fromkeys(bases) if (method, b) not in self.planes]
+            if todo:
+                planes = cumulative(daily_gdd(todo, method, **{c: self.temps[c] for c in METHODS[method]}))
+                for i, b in enumerate(todo):
+                    self.planes[(method, b)] = planes[..., i]
+            found = [self.planes[(method, b)] for b in bases]
+            for b in bases:
+                self.planes.move_to_end((method, b))
+            while len(self.planes) > self.max_planes:
+                self.planes.popitem(last=False)
+        return found
+
+    def cube(self, bases, method="mean"):
+        """(series, days, bases) cumulative GDD for every stacked series, rows in self.keys order."""
+        return np.stack(self.planes_for(bases, method), axis=-1)
+
+    def series(self, region, year, base=T_base, method="mean"):
+        """Cumulative GDD of one region-year as a date-indexed Series."""
+        row = self.positions[(region, year)]
+        plane, = self.planes_for([base], method)
+        valid = self.days[row] != PAD_DAY
+        return pd.Series(plane[row, valid],
+                         index=pd.DatetimeIndex(self.days[row, valid].astype("datetime64[D]"), name="date"),
+                         name="GDD_cumsum")
+
+
+def benchmark(frames, bases):
+    """Time the broadcast cube against one pandas clip/cumsum per series and base."""
+    start = time.perf_counter()
+    engine = GDDEngine(frames)
+    stack_s = time.perf_counter() - start
+    start = time.perf_counter()
+    engine.cube(bases)
+    cube_s = time.perf_counter() - start
+    start = time.perf_counter()
+    engine.cube(bases)
+    cached_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for df in frames.values():
+        for base in bases:
+            (df['T2M'] - base).clip(lower=0).cumsum()
+    loop_s = time.perf_counter() - start
+    return {"series": len(frames), "bases": len(bases), "stack_s": stack_s, "cube_s": cube_s,
+            "cached_s": cached_s, "pandas_loop_s": loop_s}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cumulative GDD at several base temperatures from stored T2M")
+    parser.add_argument("--bases", type=float, nargs="+", default=[0.0, 5.0, 8.0, 10.0])
+    parser.add_argument("--method", choices=list(METHODS), default="mean")
+    parser.add_argument("--bench", type=int, metavar="REGIONS", help="time a synthetic cube of REGIONS x 5 years")
+    args = parser.parse_args()
+
+    if args.bench:
+        print(benchmark(synthetic_frames(args.bench, years=range(2020, 2025)), args.bases))
+    else:
+        engine = GDDEngine.from_store()
+        cube = engine.cube(args.bases, args.method)
+        # 保存済みの GDD_cumsum（T_base）と一致するか確認
+        if args.method == "mean" and T_base in args.bases:
+            from store import read_region_year
+
+            plane = cube[..., args.bases.index(T_base)]
+            worst = max(
+                (np.nanmax(np.abs(plane[i, :len(df)] - df['GDD_cumsum'].to_numpy())) if len(df) else 0.0)
+                for i, df in enumerate(read_region_year(*key) for key in engine.keys)
+            )
+            print(f"max |cube - stored GDD_cumsum| at {T_base}: {worst:.2e}")
+        finals = np.nanmax(cube, axis=1)
+        table = pd.DataFrame(finals, columns=[f"GDD@{b:g}" for b in args.bases],
+                             index=pd.MultiIndex.from_tuples(engine.keys, names=["region", "year"]))
+        print(table.round(0).to_string())
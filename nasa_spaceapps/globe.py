@@ -0,0 +1,159 @@
+import argparse
+import json
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from catalog import region_iso3, world_pref_names
+
+COLORSCALES = {"NDVI": "RdYlGn", "GDD_cumsum": "YlOrRd"}
+
+
+@lru_cache(maxsize=None)
+def _country_iso3(country):
+    # Only for regions ingested after catalog.region_iso3 was generated
+    import pycountry
+
+    try:
+        return pycountry.countries.lookup(country.replace("_", " ")).alpha_3
+    except LookupError:
+        return None
+
+
+def iso3(region):
+    """ISO3 of a region key like "Japan_Tokyo", from the precomputed table when possible."""
+    if region in region_iso3:
+        return region_iso3[region]
+    parts = region.split("_")
+    for n in range(len(parts) - 1, 0, -1):
+        code = _country_iso3("_".join(parts[:n]))
+        if code:
+            return code
+    return None
+
+
+def frame_table(frames, metric="NDVI", stride=1):
+    """(dates, locations, values[date, location]) averaged per country, grouped once over all regions.
+
+    `frames` maps region -> DataFrame with date and `metric` columns.
+    """
+    regions = list(frames)
+    lengths = [len(frames[r]) for r in regions]
+    long = pd.DataFrame({
+        'date': pd.to_datetime(np.concatenate([frames[r]['date'].to_numpy() for r in regions])),
+        'iso3': np.repeat([iso3(r) for r in regions], lengths),
+        'value': np.concatenate([frames[r][metric].to_numpy(dtype=float) for r in regions]),
+    }).dropna(subset=['iso3'])
+    table = long.groupby(['date', 'iso3'])['value'].mean().unstack('iso3').sort_index()
+    table = table.iloc[::stride]
+    return table.index, list(table.columns), table.to_numpy()
+
+
+def figure_dict(dates, locations, values, metric="NDVI", title=None, duration=100):
+    """Plotly figure as plain dicts; frames carry only z, locations live on the base trace."""
+    zmin, zmax = float(np.nanmin(values)), float(np.nanmax(values))
+    # NaN is not valid JSON; plotly leaves None cells uncoloured
+    z = np.where(np.isnan(values), None, np.round(values, 3)).tolist()
+    names = [str(d.date()) for d in dates]
+    return {
+        "data": [{
+            "type": "choropleth",
+            "locations": locations,
+            "z": z[0],
+            "colorscale": COLORSCALES[metric],
+            "zmin": zmin,
+            "zmax": zmax,
+            "colorbar": {"title": {"text": metric}},
+        }],
+        "layout": {
+            "title": {"text": title or f"🌸 {metric} Animation"},
+            "geo": {
+                "projection": {"type": "orthographic"},
+                "showcoastlines": True,
+                "showland": True,
+                "landcolor": "rgb(217,217,217)",
+                "showocean": True,
+                "oceancolor": "rgb(200,230,250)",
+            },
+            "updatemenus": [{
+                "type": "buttons",
+                "showactive": False,
+                "y": 1,
+                "x": 1.1,
+                "xanchor": "right",
+                "yanchor": "top",
+                "buttons": [{
+                    "label": "Play",
+                    "method": "animate",
+                    "args": [None, {"frame": {"duration": duration, "redraw": True}, "fromcurrent": True}],
+                }],
+            }],
+        },
+        "frames": [
+            {"name": name, "data": [{"type": "choropleth", "z": row}], "traces": [0]}
+            for name, row in zip(names, z)
+        ],
+    }
+
+
+def globe_json(frames, metric="NDVI", title=None, stride=1):
+    dates, locations, values = frame_table(frames, metric, stride)
+    return json.dumps(figure_dict(dates, locations, values, metric, title))
+
+
+def synthetic_frames(n_regions=250, days=365, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2024-01-01", periods=days)
+    regions = (world_pref_names * (n_regions // len(world_pref_names) + 1))[:n_regions]
+    return {
+        f"{region}{'_' * (i // len(world_pref_names))}": pd.DataFrame({
+            'date': dates,
+            'NDVI': 4000 + rng.normal(0, 20, days).cumsum(),
+        })
+        for i, region in enumerate(regions)
+    }
+
+
+def benchmark_baseline(frames, metric="NDVI"):
+    # The original builder: pycountry per row, two boolean filters per date, go.Figure validation
+    import plotly.graph_objects as go
+    import pycountry
+
+    def country_to_iso3(name):
+        try:
+            return pycountry.countries.lookup(name).alpha_3
+        except LookupError:
+            return None
+
+    df = pd.concat([f.assign(country_name=r.split("_")[0]) for r, f in frames.items()], ignore_index=True)
+    df['ISO_A3'] = df['country_name'].apply(country_to_iso3)
+    dates = df['date'].sort_values().unique()
+    fig = go.Figure(
+        data=[go.Choropleth(locations=df[df['date'] == dates[0]]['ISO_A3'], z=df[df['date'] == dates[0]][metric])],
+        frames=[
+            go.Frame(
+                data=[go.Choropleth(locations=df[df['date'] == d]['ISO_A3'], z=df[df['date'] == d][metric])],
+                name=str(pd.Timestamp(d).date()),
+            ) for d in dates
+        ],
+    )
+    return fig.to_json()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Globe animation build time")
+    parser.add_argument("--regions", type=int, default=250)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--baseline", action="store_true", help="also time the original per-date filter builder")
+    args = parser.parse_args()
+
+    frames = synthetic_frames(args.regions, args.days)
+    start = time.perf_counter()
+    payload = globe_json(frames)
+    print(f"grouped build: {time.perf_counter() - start:.2f}s, {len(payload) / 2**20:.1f} MiB JSON")
+    if args.baseline:
+        start = time.perf_counter()
+        payload = benchmark_baseline(frames)
+        print(f"per-date filter build: {time.perf_counter() - start:.2f}s, {len(payload) / 2**20:.1f} MiB JSON")
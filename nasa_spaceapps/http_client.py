@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, "http_cache")
+DEFAULT_TTL = 7 * 24 * 3600  # seconds before a cached response is revalidated
+# Answers worth keeping: the data, and "no such resource" (GADM has no file for some ISO3 codes)
+CACHED_STATUSES = (200, 404)
+
+
+def request_key(url, params=None):
+    """Stable cache key for (endpoint, params), independent of parameter order."""
+    payload = json.dumps([url, sorted((params or {}).items())], default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CachedClient:
+    """JSON GETs over one pooled requests.Session with an on-disk response cache.
+
+    Bodies are stored once under objects/<sha256 of content>; meta/<request key>
+    points at the body with its status, ETag / Last-Modified and fetch time.
+    A fresh entry (younger than its TTL, or ttl=None for data that never
+    changes) is served without any network call; a stale one is revalidated
+    with If-None-Match / If-Modified-Since, so an unchanged resource costs a
+    304 instead of a download. Only 200 and 404 answers are cached: 429 and
+    5xx raise for the caller to retry with backoff, and other statuses (403,
+    400 ...) are returned without being stored.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, ttl=DEFAULT_TTL, pool_size=16, timeout=30):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.lock = threading.Lock()
+        self.key_locks = {}  # request key -> [lock, threads holding or waiting on it]
+        self.stats = {"hit": 0, "revalidated": 0, "fetched": 0}
+        os.makedirs(os.path.join(cache_dir, "meta"), exist_ok=True)
+        os.makedirs(os.path.join(cache_dir, "objects"), exist_ok=True)
+
+    def _count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    @contextmanager
+    def _key_lock(self, key):
+        """Hold the lock of one request key; it is dropped once no thread holds or waits on it."""
+        with self.lock:
+            entry = self.key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self.lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self.key_locks[key]
+
+    def _meta_path(self, key):
+        return os.path.join(self.cache_dir, "meta", f"{key}.json")
+
+    def _object_path(self, digest):
+        return os.path.join(self.cache_dir, "objects", digest)
+
+    def _write(self, path, data):
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _load(self, key):
+        try:
+            with open(self._meta_path(key), encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(self._object_path(meta["sha256"]), "rb") as f:
+                return meta, f.read()
+        except (FileNotFoundError, ValueError, KeyError):
+            return None, None
+
+    def _store(self, key, url, params, response):
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        if not os.path.exists(self._object_path(digest)):
+            self._write(self._object_path(digest), body)
+        meta = {
+            "url": url,
+            "params": params,
+            "status": response.status_code,
+            "sha256": digest,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+        self._write(self._meta_path(key), json.dumps(meta).encode("utf-8"))
+        return meta, body
+
+    def get(self, url, params=None, ttl=..., before_request=None):
+        """(status, body bytes) for a GET, from the cache when fresh. ttl=None never expires.
+
+        `before_request` (e.g. a rate limiter's wait) runs only when the network is used.
+        """
+        ttl = self.ttl if ttl is ... else ttl
+        key = request_key(url, params)
+        # Threads asking for the same request wait for the first one instead of fetching it again
+        with self._key_lock(key):
+            return self._get(key, url, params, ttl, before_request)
+
+    def _get(self, key, url, params, ttl, before_request):
+        meta, body = self._load(key)
+        if meta is not None and (ttl is None or time.time() - meta["fetched_at"] < ttl):
+            self._count("hit")
+            return meta["status"], body
+
+        headers = {}
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        if before_request is not None:
+            before_request()
+        response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and meta is not None:
+            meta["fetched_at"] = time.time()
+            self._write(self._meta_path(key), json.dumps(meta).encode("utf-8"))
+            self._count("revalidated")
+            return meta["status"], body
+        if response.status_code == 429 or response.status_code >= 500:
+            # Rate limits and server errors are not cached; let the caller retry with backoff
+            response.raise_for_status()
+        self._count("fetched")
+        if response.status_code not in CACHED_STATUSES:
+            return response.status_code, response.content
+        meta, body = self._store(key, url, params, response)
+        return meta["status"], body
+
+    def get_json(self, url, params=None, ttl=..., before_request=None):
+        """(status, parsed JSON or None) for a GET; a cached 404 is not re-requested."""
+        status, body = self.get(url, params, ttl, before_request)
+        if status != 200:
+            return status, None
+        return status, json.loads(body)
+
+    def close(self):
+        self.session.close()
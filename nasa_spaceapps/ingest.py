@@ -0,0 +1,496 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import requests
+from matplotlib.figure import Figure
+
+import store
+from gdd import T_base
+from http_client import CachedClient
+from jobs import COUNTRY, Checkpoints, JobManifest, StageFailed, StageRunner
+from phenology import peak_flags
+
+# ローカルのスタブサーバーでも動かせるように URL は環境変数で差し替え可能
+GADM_URL = os.environ.get("GADM_URL", "https://geodata.ucdavis.edu/gadm/gadm4.1/json/gadm41_{iso3}_1.json")
+POWER_URL = os.environ.get("POWER_URL", "https://power.larc.nasa.gov/api/temporal/daily/point")
+
+# NASA POWER の気象データ (MERRA-2) の格子：緯度0.5° x 経度0.625°
+POWER_GRID = (0.5, 0.625)
+POWER_FILL = -999.0
+
+# バックエンドごとの1秒あたりリクエスト数
+DEFAULT_RATES = {"gadm": 2.0, "ee": 4.0, "power": 1.0}
+
+
+class RateLimiter:
+    """Spread calls to one backend evenly, at most `per_second` across all threads."""
+
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second if per_second else 0.0
+        self.lock = threading.Lock()
+        self.next_time = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_time)
+            self.next_time = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def safe_region_name(country_name, region_name):
+    return f"{country_name}_{region_name}".replace("/", "_").replace(" ", "_")
+
+
+def power_cell(lat, lon):
+    """Centre of the POWER grid cell containing a point; points in one cell get identical data."""
+    dlat, dlon = POWER_GRID
+    return round(round(lat / dlat) * dlat, 4), round(round(lon / dlon) * dlon, 4)
+
+
+def split_years(power_json):
+    """{year: date/T2M (and T2M_MIN/T2M_MAX when requested) frame} from one POWER response that may span several years."""
+    parameters = power_json["properties"]["parameter"]
+    t2m_df = pd.DataFrame(parameters).astype(float).rename_axis("date").reset_index()
+    t2m_df["date"] = pd.to_datetime(t2m_df["date"])
+    # まだ値のない日は -999（欠測値）で返ってくるので落とす
+    t2m_df = t2m_df[(t2m_df.drop(columns="date") > POWER_FILL).all(axis=1)]
+    return {year: part.reset_index(drop=True) for year, part in t2m_df.groupby(t2m_df["date"].dt.year)}
+
+
+class Ingestor:
+    """Fetch GADM / Earth Engine / NASA POWER data for one year and write world/ CSVs.
+
+    `ee_module` is the Earth Engine module (or a stand-in with the same surface),
+    so the whole pipeline can run against local fakes. `t2m_years` = (first, last)
+    makes every POWER request cover that whole span, so a backfill that runs one
+    Ingestor per year (sharing `http`) fetches each point once instead of once a year.
+    `ndvi_backend` (e.g. raster_ndvi.RasterNDVI over local MOD13Q1 tiles) replaces
+    Earth Engine for centroids and NDVI; `ee_module` may then be None.
+    `minmax` also fetches daily T2M_MIN / T2M_MAX and stores them with T2M.
+    """
+
+    def __init__(self, ee_module, year, output_dir="world", rates=None, modis=None, all_regions=False,
+                 store_dir=store.STORE_DIR, jobs_dir=None, max_attempts=4, backoff=1.0, http=None,
+                 t2m_years=None, ndvi_backend=None, minmax=False):
+        self.ee = ee_module
+        self.ndvi_backend = ndvi_backend
+        self.year = year
+        self.t2m_years = t2m_years or (year, year)
+        # 日最低・最高気温も取ると gdd.py の triangle / minmax 法が使える
+        self.power_parameters = "T2M,T2M_MIN,T2M_MAX" if minmax else "T2M"
+        self.output_dir = output_dir
+        self.store_dir = store_dir
+        self.all_regions = all_regions
+        self.refreshed = []  # safe names that refresh_country extended
+        os.makedirs(output_dir, exist_ok=True)
+        rates = {**DEFAULT_RATES, **(rates or {})}
+        self.limiters = {name: RateLimiter(rate) for name, rate in rates.items()}
+        # GADM / POWER は共有セッション＋ディスクキャッシュ経由（キャッシュヒット時はレート制限も不要）
+        self.http = http or CachedClient()
+
+        # ステージごとのチェックポイントとジョブ台帳（再実行時は失敗したステージだけやり直す）
+        jobs_dir = jobs_dir or os.path.join(output_dir, "_jobs")
+        self.manifest = JobManifest(os.path.join(jobs_dir, "manifest.sqlite"))
+        self.stages = StageRunner(self.manifest, Checkpoints(jobs_dir), max_attempts, backoff)
+
+        # MODISコレクション
+        self.modis_collection = "MODIS/006/MOD13Q1" if year <= 2023 else "MODIS/061/MOD13Q1"
+        self.modis = modis if modis is not None or ndvi_backend is not None else (
+            self.ee.ImageCollection(self.modis_collection).select('NDVI').filterDate(f'{year}-01-01', f'{year}-12-31')
+        )
+
+    # === GADMレベル1ポリゴン取得 ===
+    def fetch_regions(self, country_iso3):
+        # GADM 4.1 は固定リリースなので期限なしでキャッシュ
+        status, gj = self.http.get_json(GADM_URL.format(iso3=country_iso3), ttl=None,
+                                        before_request=self.limiters["gadm"].wait)
+        if status == 404:
+            return None
+        if status != 200:
+            raise requests.HTTPError(f"GADM returned {status} for {country_iso3}")
+        return gj.get("features")
+
+    # === centroid取得 ===
+    def fetch_centroid(self, feature):
+        if self.ndvi_backend is not None:
+            return self.ndvi_backend.centroid(feature)
+        self.limiters["ee"].wait()
+        lon, lat = self.ee.Geometry(feature['geometry']).centroid().coordinates().getInfo()
+        return lat, lon
+
+    # === NDVI取得 ===
+    def fetch_ndvi(self, feature):
+        if self.ndvi_backend is not None:
+            ndvi_df = self.ndvi_backend.region_means([feature], self.year)
+            return interpolate_daily(ndvi_df[['date', 'NDVI']].fillna(-9999))
+        ee = self.ee
+        ee_feature = ee.Feature(feature)
+
+        def extract_ndvi(image):
+            mean_dict = image.reduceRegion(
+                reducer=ee.Reducer.mean(),
+                geometry=ee_feature.geometry(),
+                scale=250,
+                maxPixels=1e13
+            )
+            date = image.date().format('YYYY-MM-dd')
+            ndvi_value = ee.Algorithms.If(mean_dict.get('NDVI'), mean_dict.get('NDVI'), -9999)
+            return ee.Feature(None, {'date': date, 'NDVI': ndvi_value})
+
+        self.limiters["ee"].wait()
+        ndvi_list = self.modis.map(extract_ndvi).getInfo()['features']
+        ndvi_df = pd.DataFrame([{'date': f['properties']['date'], 'NDVI': f['properties']['NDVI']} for f in ndvi_list])
+        ndvi_df['date'] = pd.to_datetime(ndvi_df['date'])
+        return interpolate_daily(ndvi_df)
+
+    # === 全行政区のNDVIを1リクエストで取得 ===
+    def fetch_ndvi_regions(self, features):
+        """Reduce every level-1 region in one reduceRegions call per image.
+
+        Returns the daily-interpolated NDVI table (NAME_1, date, NDVI) and a
+        {NAME_1: (lat, lon)} centroid map, all from a single getInfo().
+        """
+        ndvi_df, centroids = self.fetch_ndvi_composites(features)
+        return interpolate_regions(ndvi_df), centroids
+
+    def fetch_ndvi_composites(self, features, since=None):
+        """The raw 16-day composites (NAME_1, date, NDVI) of `features`, from `since` on when given."""
+        if self.ndvi_backend is not None:
+            ndvi_df = self.ndvi_backend.region_means(features, self.year)
+            ndvi_df['NDVI'] = ndvi_df['NDVI'].fillna(-9999)
+            if since is not None:
+                ndvi_df = ndvi_df[ndvi_df['date'] >= since].reset_index(drop=True)
+            centroids = {f['properties']['NAME_1']: self.ndvi_backend.centroid(f) for f in features}
+            return ndvi_df, centroids
+        ee = self.ee
+        modis = self.modis
+        if since is not None:
+            modis = modis.filterDate(since.strftime('%Y-%m-%d'), f'{self.year}-12-31')
+        regions = ee.FeatureCollection([
+            ee.Feature(f['geometry'], {'NAME_1': f['properties']['NAME_1']}) for f in features
+        ])
+
+        def reduce_image(image):
+            date = image.date().format('YYYY-MM-dd')
+            reduced = image.reduceRegions(collection=regions, reducer=ee.Reducer.mean(), scale=250)
+            return reduced.map(lambda f: f.set('date', date))
+
+        # ジオメトリは返さずプロパティだけ受け取る
+        ndvi_fc = modis.map(reduce_image).flatten().select(['NAME_1', 'date', 'mean'], None, False)
+        centroids_fc = regions.map(
+            lambda f: ee.Feature(None, {'NAME_1': f.get('NAME_1'), 'lonlat': f.geometry().centroid(1).coordinates()})
+        )
+
+        self.limiters["ee"].wait()
+        info = ee.Dictionary({'ndvi': ndvi_fc, 'centroids': centroids_fc}).getInfo()
+
+        centroids = {}
+        for f in info['centroids']['features']:
+            lon, lat = f['properties']['lonlat']
+            centroids[f['properties']['NAME_1']] = (lat, lon)
+
+        ndvi_df = pd.DataFrame([f['properties'] for f in info['ndvi']['features']], columns=['NAME_1', 'date', 'mean'])
+        ndvi_df = ndvi_df.rename(columns={'mean': 'NDVI'})
+        ndvi_df['NDVI'] = ndvi_df['NDVI'].astype(float).fillna(-9999)
+        ndvi_df['date'] = pd.to_datetime(ndvi_df['date'])
+        return ndvi_df, centroids
+
+    # === NASA POWER T2M ===
+    def fetch_t2m(self, lat, lon):
+        first, last = self.t2m_years
+        # 過ぎた年の値は変わらないので期限なし、今年を含む期間は1日で再検証
+        ttl = None if last < time.localtime().tm_year else 24 * 3600
+        power_json = self.fetch_power(lat, lon, f"{first}0101", f"{last}1231", ttl)
+        # 期間全体の応答から対象年だけ切り出す（他の年は同じキャッシュから切り出される）
+        return split_years(power_json)[self.year]
+
+    def fetch_power(self, lat, lon, start, end, ttl):
+        # 同じ格子に入る近くの地点は同じリクエスト（＝同じキャッシュ）にまとめる
+        lat, lon = power_cell(lat, lon)
+        params = {
+            "start": start,
+            "end": end,
+            "latitude": lat,
+            "longitude": lon,
+            "parameters": self.power_parameters,
+            "format": "JSON",
+            "community": "AG"
+        }
+        status, power_json = self.http.get_json(POWER_URL, params=params, ttl=ttl,
+                                                before_request=self.limiters["power"].wait)
+        if status != 200:
+            # 429 と 5xx は get が例外にする。403 などの応答もステージの失敗として台帳に残す
+            raise requests.HTTPError(f"NASA POWER returned {status} for ({lat}, {lon}) {start}-{end}")
+        return power_json
+
+    def save(self, merged, safe_name, title):
+        out_csv = os.path.join(self.output_dir, f"{safe_name}_{self.year}_ndvi_temp.csv")
+        out_png = os.path.join(self.output_dir, f"{safe_name}_{self.year}_ndvi_curve.png")
+        merged.to_csv(out_csv, index=False)
+        store.write_region_year(merged, safe_name, self.year, self.store_dir)
+
+        # pyplot はスレッドセーフではないので Figure を直接使う
+        peaks = merged[merged['peak'] == 1]
+        fig = Figure(figsize=(12, 5))
+        ax = fig.subplots()
+        ax.plot(merged['date'], merged['NDVI'], label='NDVI')
+        if len(peaks) > 0:
+            ax.plot(peaks['date'], peaks['NDVI'], 'ro', label='peak')
+        ax.set_xlabel("Date")
+        ax.set_ylabel("NDVI")
+        ax.set_title(title)
+        ax.legend()
+        fig.tight_layout()
+        fig.savefig(out_png, dpi=300)
+
+    def already_saved(self, key, safe_name):
+        if self.manifest.status(*key, "merge") == "done":
+            return True
+        # 台帳より前に書かれたCSVは完了扱いで台帳に登録する
+        if os.path.exists(os.path.join(self.output_dir, f"{safe_name}_{self.year}_ndvi_temp.csv")):
+            self.manifest.record(*key, "merge", "done")
+            return True
+        return False
+
+    def process_country(self, country_name, country_iso3):
+        print(f"\n🌍 Processing {country_name}")
+        features = self.stages.run((country_name, COUNTRY, self.year), "geometry", lambda: self.fetch_regions(country_iso3))
+        if features is None:
+            print(f"⚠️ GADM not found for {country_name}, skipping")
+            return "missing"
+        if not features:
+            print(f"⚠️ No level-1 regions for {country_name}, skipping")
+            return "missing"
+
+        if self.all_regions:
+            return self.process_regions(country_name, features)
+
+        # レベル1の最初の行政区だけ使う
+        feature = features[0]
+        region_name = feature['properties']['NAME_1']
+        safe_name = safe_region_name(country_name, region_name)
+        key = (country_name, region_name, self.year)
+        if self.already_saved(key, safe_name):
+            print(f"⏩ Skipping {safe_name} (already processed)")
+            return "skipped"
+
+        lat, lon = self.stages.run(key, "centroid", lambda: list(self.fetch_centroid(feature)))
+        print(f"   📍 {country_name} Lat: {lat:.2f}, Lon: {lon:.2f}")
+        ndvi_daily = self.stages.run(key, "ndvi", lambda: self.fetch_ndvi(feature))
+        t2m_df = self.stages.run(key, "t2m", lambda: self.fetch_t2m(lat, lon))
+
+        title = f"{country_name} - {region_name} NDVI ({self.year})"
+        self.stages.run(key, "merge", lambda: self.save(merge_ndvi_t2m(ndvi_daily, t2m_df), safe_name, title),
+                        checkpoint=False)
+        print(f"✅ Saved {safe_name}")
+        return "saved"
+
+    def process_regions(self, country_name, features):
+        """Every level-1 region of a country: one NDVI request for all, then T2M and merge per region."""
+        safe_names = {f['properties']['NAME_1']: safe_region_name(country_name, f['properties']['NAME_1']) for f in features}
+        pending = [
+            name for name, safe_name in safe_names.items()
+            if not self.already_saved((country_name, name, self.year), safe_name)
+        ]
+        if not pending:
+            print(f"⏩ Skipping {country_name} (all {len(safe_names)} regions already processed)")
+            return "skipped"
+
+        def fetch_all():
+            ndvi_daily, centroids = self.fetch_ndvi_regions([f for f in features if f['properties']['NAME_1'] in pending])
+            # centroid はNDVIと同じリクエストで返るので同じチェックポイントに入れる
+            ndvi_daily['lat'] = ndvi_daily['NAME_1'].map(lambda n: centroids[n][0])
+            ndvi_daily['lon'] = ndvi_daily['NAME_1'].map(lambda n: centroids[n][1])
+            return ndvi_daily
+
+        ndvi_all = self.stages.run((country_name, COUNTRY, self.year), "ndvi", fetch_all)
+
+        saved, failures = 0, []
+        for region_name, region_ndvi in ndvi_all[ndvi_all['NAME_1'].isin(pending)].groupby('NAME_1'):
+            key = (country_name, region_name, self.year)
+            safe_name = safe_names[region_name]
+            try:
+                lat, lon = self.stages.run(key, "centroid", lambda: [region_ndvi['lat'].iloc[0], region_ndvi['lon'].iloc[0]])
+                t2m_df = self.stages.run(key, "t2m", lambda: self.fetch_t2m(lat, lon))
+                ndvi_daily = region_ndvi[['date', 'NDVI']].reset_index(drop=True)
+                title = f"{country_name} - {region_name} NDVI ({self.year})"
+                self.stages.run(key, "merge", lambda: self.save(merge_ndvi_t2m(ndvi_daily, t2m_df), safe_name, title),
+                                checkpoint=False)
+                saved += 1
+            except StageFailed as e:
+                # 1行政区の失敗で国全体を止めない（台帳に記録済み）
+                failures.append(e)
+        if failures and not saved:
+            raise failures[0]
+        suffix = f", {len(failures)} failed" if failures else ""
+        print(f"✅ Saved {country_name} ({saved} regions{suffix})")
+        return "partial" if failures else "saved"
+
+    # === 差分更新：新しい合成値とPOWERの日だけ追記 ===
+    def refresh_country(self, country_name, country_iso3):
+        """Extend every stored region of a country with the composites and POWER days it does not have yet.
+
+        One NDVI request covers the country's regions from a month before the
+        earliest stored end; POWER is asked only for the days after each
+        region's end. Stage checkpoints are not used: the data changes daily.
+        """
+        features = self.stages.run((country_name, COUNTRY, self.year), "geometry", lambda: self.fetch_regions(country_iso3))
+        stored = {}
+        for f in features or []:
+            safe_name = safe_region_name(country_name, f['properties']['NAME_1'])
+            if os.path.exists(store.partition_path(safe_name, self.year, self.store_dir)):
+                stored[f['properties']['NAME_1']] = (f, safe_name, store.read_region_year(safe_name, self.year, self.store_dir))
+        if not stored:
+            return "missing"
+
+        since = min(df['date'].iloc[-1] for _, _, df in stored.values()) - pd.Timedelta(days=32)
+        composites, centroids = self.fetch_ndvi_composites([f for f, _, _ in stored.values()], since)
+        ttl = None if self.year < time.localtime().tm_year else 24 * 3600
+        added = 0
+        for region_name, (feature, safe_name, df) in stored.items():
+            start = (df['date'].iloc[-1] + pd.Timedelta(days=1)).strftime('%Y%m%d')
+            if start > f"{self.year}1231":
+                continue
+            lat, lon = centroids[region_name]
+            t2m_new = split_years(self.fetch_power(lat, lon, start, f"{self.year}1231", ttl)).get(self.year)
+            if t2m_new is None:
+                continue
+            try:
+                merged, n = extend_merged(df, composites[composites['NAME_1'] == region_name], t2m_new)
+            except ValueError as e:
+                print(f"⚠️ {safe_name}: {e}")
+                continue
+            if n:
+                merged.to_csv(os.path.join(self.output_dir, f"{safe_name}_{self.year}_ndvi_temp.csv"), index=False)
+                store.write_region_year(merged, safe_name, self.year, self.store_dir)
+                self.refreshed.append(safe_name)
+                added += n
+        print(f"🔄 {country_name}: +{added} days over {len(stored)} regions")
+        return "updated" if added else "current"
+
+    def refresh(self, countries, workers=8):
+        """refresh_country for `(country_name, iso3)` pairs, then rebuild_derived for the regions that grew.
+
+        Regions not in the store yet are left to run().
+        """
+        counts = {}
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(self.refresh_country, name, iso3): name for name, iso3 in countries}
+            for future in as_completed(futures):
+                status = self.outcome(future, futures[future])
+                counts[status] = counts.get(status, 0) + 1
+        self.rebuild_derived(self.refreshed)
+        elapsed = time.monotonic() - start
+        print(f"⏱️ refreshed {sum(counts.values())} countries in {elapsed:.1f}s {counts}")
+        return {"counts": counts, "elapsed": elapsed}
+
+    def rebuild_derived(self, regions):
+        """Rebuild bloom_index.npz and refit the registered models of `regions` after their partitions changed.
+
+        Both describe the app's store, so an Ingestor writing to another store_dir leaves them alone.
+        """
+        if not regions or self.store_dir != store.STORE_DIR:
+            return
+        import bloom_index
+        import model_registry
+
+        index = bloom_index.build_index(bloom_index.INDEX_PATH, self.store_dir, self.output_dir)
+        # 登録済みのモデルだけ：学習データ（TRAIN_YEARS）が変わっていなければ train はハッシュ比較だけで終わる
+        manifest = model_registry.load_manifest()
+        trained = []
+        for params in model_registry.PARAM_SETS:
+            registered = [r for r in sorted(set(regions)) if model_registry.entry_key(r, params) in manifest]
+            trained += model_registry.train(registered, params=params)[0]
+        print(f"🗂️ bloom index: {len(index.keys)} region-years; registry: {len(trained)} models refitted")
+
+    def outcome(self, future, country_name):
+        """Status of a finished process_country future; failures are reported, not raised."""
+        try:
+            return future.result()
+        except StageFailed as e:
+            print(f"❌ {e}")
+            return "failed"
+        except Exception as e:
+            print(f"❌ Error processing {country_name}: {e}")
+            return "error"
+
+    def run(self, countries, workers=8):
+        """Process `(country_name, iso3)` pairs on a bounded thread pool and report throughput."""
+        counts = {}
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(self.process_country, name, iso3): name for name, iso3 in countries}
+            for future in as_completed(futures):
+                status = self.outcome(future, futures[future])
+                counts[status] = counts.get(status, 0) + 1
+        elapsed = time.monotonic() - start
+        done = sum(counts.values())
+        per_minute = done / elapsed * 60 if elapsed > 0 else float("inf")
+        print(f"⏱️ {done} countries in {elapsed:.1f}s ({per_minute:.1f} countries/min) {counts}")
+        print(f"🌐 HTTP cache: {self.http.stats}")
+        summary = self.manifest.summary(self.year)
+        if not summary.empty:
+            print(summary.to_string(index=False, float_format="%.2f"))
+        return {"counts": counts, "elapsed": elapsed, "countries_per_minute": per_minute, "stages": summary}
+
+
+# 16日合成値を日次に線形補間
+def interpolate_daily(ndvi_df):
+    return ndvi_df.set_index('date').resample('D').interpolate().reset_index()
+
+
+def interpolate_regions(ndvi_df):
+    """interpolate_daily per NAME_1 over a (NAME_1, date, NDVI) table of composites."""
+    return pd.concat(
+        [interpolate_daily(part[['date', 'NDVI']]).assign(NAME_1=name) for name, part in ndvi_df.groupby('NAME_1')],
+        ignore_index=True,
+    )
+
+
+# === NDVI + T2M統合 ===
+def merge_ndvi_t2m(ndvi_daily, t2m_df):
+    merged = pd.merge(t2m_df, ndvi_daily, on='date', how='inner')
+    merged['GDD_daily'] = (merged['T2M'] - T_base).clip(lower=0)
+    merged['GDD_cumsum'] = merged['GDD_daily'].cumsum()
+
+    # === NDVIピーク検出 ===（保存値は生の値なので 0.0001 倍してから NDVI 0.5 以上の極大）
+    merged['peak'] = peak_flags(merged['NDVI'].values)
+    return merged
+
+
+def extend_merged(stored, composites, t2m_new):
+    """Append the days after `stored` ends instead of rebuilding the year with merge_ndvi_t2m.
+
+    `composites` are the raw composites from the last one at or before the
+    stored end onward and `t2m_new` the POWER days after it. Only that window
+    is interpolated and GDD_cumsum continues from the stored tail. Peaks are
+    re-detected over the whole year, so the result matches a full rebuild and
+    flags stored under an older peak rule are replaced.
+    """
+    end = stored['date'].iloc[-1]
+    composites = composites.sort_values('date')
+    anchor = composites['date'][composites['date'] <= end].max()
+    if pd.isna(anchor):
+        raise ValueError(f"no composite at or before {end.date()} to interpolate from")
+    window = composites[composites['date'] >= anchor]
+    # 日次の線形補間（resample('D').interpolate() と同じ値）を新しい日だけ計算する
+    new = t2m_new[(t2m_new['date'] > end) & (t2m_new['date'] <= window['date'].iloc[-1])].reset_index(drop=True)
+    if new.empty:
+        return stored, 0
+    new['NDVI'] = np.interp(new['date'].values.astype('int64'), window['date'].values.astype('int64'),
+                            window['NDVI'].values)
+    new['GDD_daily'] = (new['T2M'] - T_base).clip(lower=0)
+    new['GDD_cumsum'] = stored['GDD_cumsum'].iloc[-1] + new['GDD_daily'].cumsum()
+    merged = pd.concat([stored, new], ignore_index=True)
+
+    # プロミネンスは遠くの値にも左右されるので、ピークは一年分まとめて判定し直す
+    merged['peak'] = peak_flags(merged['NDVI'].values)
+    return merged, len(new)
@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+STAGES = ("geometry", "centroid", "ndvi", "t2m", "merge")
+COUNTRY = ""  # region value for stages that cover a whole country (geometry, all-regions NDVI)
+
+
+class StageFailed(Exception):
+    def __init__(self, stage, key, error):
+        super().__init__(f"{stage} failed for {'/'.join(str(k) for k in key if k)}: {error}")
+        self.stage = stage
+        self.key = key
+        self.error = error
+
+
+class JobManifest:
+    """SQLite table of (country, region, year, stage) -> status, attempts, duration.
+
+    One row per stage, so a rerun can tell which stage of which region failed
+    and redo only that. Shared by the ingestion threads behind a lock.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " country TEXT, region TEXT, year INTEGER, stage TEXT,"
+                " status TEXT, attempts INTEGER, duration REAL, error TEXT, updated_at TEXT,"
+                " PRIMARY KEY (country, region, year, stage))"
+            )
+
+    def status(self, country, region, year, stage):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT status FROM jobs WHERE country=? AND region=? AND year=? AND stage=?",
+                (country, region, year, stage),
+            ).fetchone()
+        return row[0] if row else None
+
+    def record(self, country, region, year, stage, status, attempts=0, duration=0.0, error=None):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (country, region, year, stage, status, attempts, duration, error,
+                 datetime.now(timezone.utc).isoformat(timespec="seconds")),
+            )
+
+    def jobs(self, year=None):
+        query = "SELECT * FROM jobs" + (" WHERE year=?" if year is not None else "")
+        with self.lock:
+            return pd.read_sql_query(query, self.conn, params=(year,) if year is not None else None)
+
+    def summary(self, year=None):
+        """Per stage: job counts by status, attempts and latency of the successful runs."""
+        jobs = self.jobs(year)
+        rows = []
+        for stage in STAGES:
+            part = jobs[jobs['stage'] == stage]
+            if part.empty:
+                continue
+            ran = part[(part['status'] == 'done') & (part['attempts'] > 0)]['duration']
+            rows.append({
+                "stage": stage,
+                "done": int((part['status'] == 'done').sum()),
+                "failed": int((part['status'] == 'failed').sum()),
+                "retried": int((part['attempts'] > 1).sum()),
+                "mean_s": ran.mean(),
+                "p95_s": ran.quantile(0.95),
+            })
+        return pd.DataFrame(rows)
+
+    def close(self):
+        self.conn.close()
+
+
+class Checkpoints:
+    """Stage outputs on disk (JSON or CSV) next to the manifest, keyed like the jobs."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, country, region, year, stage, ext):
+        name = f"{stage}.{ext}"
+        return os.path.join(self.root, str(year), country.replace("/", "_"), (region or "_country").replace("/", "_"), name)
+
+    def save(self, key, stage, value):
+        if isinstance(value, pd.DataFrame):
+            path = self.path(*key, stage, "csv")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            value.to_csv(path + ".tmp", index=False)
+        else:
+            path = self.path(*key, stage, "json")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(value, f)
+        os.replace(path + ".tmp", path)
+
+    def load(self, key, stage):
+        path = self.path(*key, stage, "csv")
+        if os.path.exists(path):
+            df = pd.read_csv(path)
+            if 'date' in df.columns:
+                df['date'] = pd.to_datetime(df['date'])
+            return df
+        with open(self.path(*key, stage, "json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def exists(self, key, stage):
+        return any(os.path.exists(self.path(*key, stage, ext)) for ext in ("csv", "json"))
+
+
+class StageRunner:
+    """Run one stage of one job: reuse its checkpoint when done, else retry with exponential backoff."""
+
+    def __init__(self, manifest, checkpoints, max_attempts=4, backoff=1.0, sleep=time.sleep):
+        self.manifest = manifest
+        self.checkpoints = checkpoints
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.sleep = sleep
+
+    def run(self, key, stage, fn, checkpoint=True):
+        """`key` is (country, region, year). Returns fn()'s result or the checkpointed one."""
+        if self.manifest.status(*key, stage) == "done" and (not checkpoint or self.checkpoints.exists(key, stage)):
+            return self.checkpoints.load(key, stage) if checkpoint else None
+
+        start = time.monotonic()
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                result = fn()
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    self.manifest.record(*key, stage, "failed", attempt, time.monotonic() - start, repr(e))
+                    raise StageFailed(stage, key, e) from e
+                self.manifest.record(*key, stage, "retrying", attempt, time.monotonic() - start, repr(e))
+                # 1, 2, 4 ... x backoff seconds, with jitter so threads do not retry in lockstep
+                self.sleep(self.backoff * 2 ** (attempt - 1) * (0.5 + random.random()))
+                continue
+            if checkpoint:
+                self.checkpoints.save(key, stage, result)
+            self.manifest.record(*key, stage, "done", attempt, time.monotonic() - start)
+            return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingestion job manifest")
+    parser.add_argument("command", choices=["summary", "failed"])
+    parser.add_argument("--manifest", default=os.path.join("world", "_jobs", "manifest.sqlite"))
+    parser.add_argument("--year", type=int)
+    args = parser.parse_args()
+
+    manifest = JobManifest(args.manifest)
+    if args.command == "summary":
+        print(manifest.summary(args.year).to_string(index=False, float_format="%.2f"))
+    else:
+        jobs = manifest.jobs(args.year)
+        print(jobs[jobs['status'] == 'failed'][['country', 'region', 'year', 'stage', 'attempts', 'error']]
+              .to_string(index=False))
@@ -0,0 +1,62 @@
+import hashlib
+import json
+import os
+
+import joblib
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(BASE_DIR, "models")
+MAX_BYTES = 512 * 1024 * 1024  # on-disk budget before least-recently-used models are evicted
+
+
+def model_key(region, years, params, data_signature=()):
+    """Stable key for (region, training years, hyperparameters, source file versions)."""
+    payload = json.dumps([region, sorted(years), sorted(params.items()), list(data_signature)], default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def model_path(key, model_dir=MODEL_DIR):
+    return os.path.join(model_dir, f"{key}.joblib")
+
+
+def load(key, model_dir=MODEL_DIR):
+    path = model_path(key, model_dir)
+    try:
+        model = joblib.load(path)
+    except (FileNotFoundError, EOFError):
+        return None
+    os.utime(path)  # mark as recently used
+    return model
+
+
+def save(key, model, model_dir=MODEL_DIR, max_bytes=MAX_BYTES):
+    os.makedirs(model_dir, exist_ok=True)
+    path = model_path(key, model_dir)
+    tmp = path + ".tmp"
+    joblib.dump(model, tmp)
+    os.replace(tmp, path)
+    evict(model_dir, max_bytes)
+    return path
+
+
+def evict(model_dir=MODEL_DIR, max_bytes=MAX_BYTES):
+    """Delete the least recently used models until the directory fits in max_bytes."""
+    entries = []
+    for name in os.listdir(model_dir):
+        if name.endswith(".joblib"):
+            stat = os.stat(os.path.join(model_dir, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.remove(os.path.join(model_dir, name))
+        total -= size
+
+
+def get_or_fit(key, fit, model_dir=MODEL_DIR):
+    model = load(key, model_dir)
+    if model is None:
+        model = fit()
+        save(key, model, model_dir)
+    return model
@@ -0,0 +1,159 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import joblib
+
+import forecast
+from catalog import world_pref_names
+from store import BASE_DIR, list_region_years, source_path
+
+REGISTRY_DIR = os.path.join(BASE_DIR, "registry")
+MANIFEST_PATH = os.path.join(REGISTRY_DIR, "manifest.json")
+DEFAULT_PARAMS = forecast.FOREST_PARAMS
+PARAM_SETS = [forecast.FOREST_PARAMS, forecast.WORLD_FOREST_PARAMS]  # one entry per region for each app
+
+
+def model_id(params):
+    return f"rf_n{params['n_estimators']}_d{params['max_depth']}"
+
+
+def stored_years(region, years=forecast.TRAIN_YEARS):
+    """The requested years that have a stored partition for the region; entries are keyed on these."""
+    return [year for year in years if os.path.exists(source_path(region, year))]
+
+
+def data_hash(region, years=forecast.TRAIN_YEARS):
+    """sha256 over the content of every training partition of a region."""
+    digest = hashlib.sha256()
+    for year in years:
+        try:
+            with open(source_path(region, year), "rb") as f:
+                content = f.read()
+        except FileNotFoundError:
+            continue
+        digest.update(f"{year}:{len(content)}:".encode())
+        digest.update(content)
+    return digest.hexdigest()
+
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def entry_key(region, params):
+    return f"{region}/{model_id(params)}"
+
+
+def train(regions, years=forecast.TRAIN_YEARS, params=DEFAULT_PARAMS, force=False, registry_dir=REGISTRY_DIR):
+    """Fit and store a model for every region whose training data changed since its last version."""
+    manifest_path = os.path.join(registry_dir, "manifest.json")
+    manifest = load_manifest(manifest_path)
+    trained, unchanged = [], []
+    for region in regions:
+        key = entry_key(region, params)
+        # Years without data do not change the model, so a wider TRAIN_YEARS alone refits nothing
+        region_years = stored_years(region, years)
+        digest = data_hash(region, region_years)
+        entry = manifest.get(key)
+        current = entry and os.path.exists(os.path.join(registry_dir, entry["path"]))
+        if current and entry["data_hash"] == digest and entry["years"] == region_years and not force:
+            unchanged.append(region)
+            continue
+        try:
+            train_df = forecast.training_frame(region, region_years)
+        except FileNotFoundError:
+            continue
+
+        version = entry["version"] + 1 if entry else 1
+        path = os.path.join(registry_dir, region, f"{model_id(params)}_v{version}.joblib")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        joblib.dump(forecast.fit_forest(train_df, **params), path)
+        if entry and os.path.exists(os.path.join(registry_dir, entry["path"])):
+            os.remove(os.path.join(registry_dir, entry["path"]))
+
+        manifest[key] = {
+            "version": version,
+            "data_hash": digest,
+            "years": region_years,
+            "params": params,
+            "path": os.path.relpath(path, registry_dir),
+            "rows": len(train_df),
+            "trained_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        save_manifest(manifest, manifest_path)
+        trained.append(region)
+    return trained, unchanged
+
+
+def load(region, years=forecast.TRAIN_YEARS, params=DEFAULT_PARAMS, registry_dir=REGISTRY_DIR):
+    """The registered model for a region, or None when missing or trained on different data."""
+    entry = load_manifest(os.path.join(registry_dir, "manifest.json")).get(entry_key(region, params))
+    region_years = stored_years(region, years)
+    if entry is None or entry["years"] != region_years or entry["data_hash"] != data_hash(region, region_years):
+        return None
+    try:
+        return joblib.load(os.path.join(registry_dir, entry["path"]))
+    except FileNotFoundError:
+        return None
+
+
+def benchmark(region, year=2026, params=DEFAULT_PARAMS, repeat=3):
+    """Cold-request latency for a forecast: fitting in the request vs loading the registered model."""
+    def fit_request():
+        train_df = forecast.training_frame(region)
+        return forecast.forecast(train_df, forecast.fit_forest(train_df, **params), year)
+
+    def registry_request():
+        train_df = forecast.training_frame(region)
+        return forecast.forecast(train_df, load(region, params=params), year)
+
+    results = {}
+    for label, fn in [("fit per request", fit_request), ("registry", registry_request)]:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        results[label] = (time.perf_counter() - start) / repeat
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline forecast model registry")
+    sub = parser.add_subparsers(dest="command", required=True)
+    train_cmd = sub.add_parser("train", help="(re)fit models for regions whose data changed")
+    train_cmd.add_argument("--regions", nargs="+")
+    train_cmd.add_argument("--years", type=int, nargs="+", default=list(forecast.TRAIN_YEARS),
+                           help="training years (default: the apps' TRAIN_YEARS); years without data are skipped")
+    train_cmd.add_argument("--force", action="store_true")
+    bench_cmd = sub.add_parser("bench", help="cold-request latency before/after the registry")
+    bench_cmd.add_argument("--region", default="Japan_Tokyo")
+    args = parser.parse_args()
+
+    if args.command == "train":
+        available = {region for region, year in list_region_years() if year in args.years}
+        regions = args.regions or [r for r in world_pref_names if r in available]
+        for params in PARAM_SETS:
+            start = time.perf_counter()
+            trained, unchanged = train(regions, args.years, params, force=args.force)
+            print(f"{model_id(params)}: trained {len(trained)} models, {len(unchanged)} unchanged "
+                  f"in {time.perf_counter() - start:.1f}s")
+    else:
+        for params in PARAM_SETS:
+            train([args.region], params=params)
+            for label, seconds in benchmark(args.region, params=params).items():
+                print(f"{model_id(params)} {label:16s} {seconds * 1000:.0f} ms")
@@ -0,0 +1,247 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+SCALE = 0.0001     # MOD13Q1 NDVI scale factor: stored NDVI is in raw units (Tokyo ~4,400)
+FILL = -3000       # raw values at or below are fills (MODIS -3000, ingest's -9999); valid is -2000..10000
+PEAK_HEIGHT = 0.5  # minimum NDVI of a flagged peak, in NDVI units
+PEAK_PROMINENCE = 0.05  # minimum rise of a flagged peak above its higher base (scipy prominence), in NDVI units
+SEASON_FRACTION = 0.2  # start / end of season: NDVI crosses this share of the rise / fall amplitude
+
+
+def to_ndvi(values, units="auto"):
+    """NDVI in NDVI units with fills as NaN. `units` is "raw", "scaled" or "auto" (raw when |NDVI| > 1.5)."""
+    values = np.asarray(values, dtype=float)
+    values = np.where(values <= FILL, np.nan, values)
+    if units == "auto":
+        units = "raw" if np.nanmax(np.abs(values), initial=0.0) > 1.5 else "scaled"
+    return values * SCALE if units == "raw" else values
+
+
+def prominences(rows, r, c, block=1024):
+    """Prominence of the peaks at (r, c) of a 2-D array, as scipy.signal.peak_prominences defines it.
+
+    From each peak the search runs outwards until a higher value (or a NaN,
+    as in scipy) or the row edge; the base on each side is the minimum
+    passed, and the prominence is the peak minus the higher base. Range
+    max / min tables over power-of-two windows turn each search into a
+    binary descent, for all peaks at once and `block` rows at a time.
+    """
+    out = np.empty(len(r))
+    for lo_row in range(0, rows.shape[0], block):
+        sel = (r >= lo_row) & (r < lo_row + block)
+        if sel.any():
+            out[sel] = _prominences(rows[lo_row:lo_row + block], r[sel] - lo_row, c[sel])
+    return out
+
+
+def _prominences(rows, r, c):
+    n = rows.shape[1]
+    highs = [np.where(np.isnan(rows), np.inf, rows)]  # highs[k][:, i] = max of rows[:, i:i + 2**k]
+    lows = [np.where(np.isnan(rows), np.inf, rows)]
+    while 2 ** len(highs) <= n:
+        w = 2 ** (len(highs) - 1)
+        highs.append(np.maximum(highs[-1][:, :-w], highs[-1][:, w:]))
+        lows.append(np.minimum(lows[-1][:, :-w], lows[-1][:, w:]))
+    value = rows[r, c]
+
+    def range_min(a, b):  # min over [a, b]
+        k = np.floor(np.log2(b - a + 1)).astype(int)
+        out = np.empty(len(a))
+        for level in np.unique(k):
+            m = k == level
+            out[m] = np.minimum(lows[level][r[m], a[m]], lows[level][r[m], b[m] - 2 ** level + 1])
+        return out
+
+    left, right = c.copy(), c.copy()
+    for k in range(len(highs) - 1, -1, -1):
+        w = 2 ** k
+        # 窓の中がすべてピーク以下なら探索をその分だけ外へ進める
+        step = left - w >= 0
+        step[step] = highs[k][r[step], left[step] - w] <= value[step]
+        left[step] -= w
+        step = right + w <= n - 1
+        step[step] = highs[k][r[step], right[step] + 1] <= value[step]
+        right[step] += w
+    return value - np.maximum(range_min(left, c), range_min(c, right))
+
+
+def local_peaks(x, height=None, prominence=None):
+    """Local maxima along the last axis, flagged where scipy.signal.find_peaks(x, height, prominence) puts them.
+
+    A peak is a strict rise into a (possibly flat) top followed by a strict
+    fall; flat tops are flagged at their middle. Every row of a 2-D array is
+    handled in one pass over the runs of equal values.
+    """
+    x = np.asarray(x, dtype=float)
+    rows = np.atleast_2d(x)
+    n = rows.shape[1]
+    flags = np.zeros(rows.shape, dtype=bool)
+    if n < 3:
+        return flags.reshape(x.shape)
+    # 各行の先頭と値が変わる位置が「同じ値の連続」の始まり（行をまたぐ連続はできない）
+    starts = np.ones(rows.shape, dtype=bool)
+    starts[:, 1:] = rows[:, 1:] != rows[:, :-1]
+    flat = rows.ravel()
+    s = np.flatnonzero(starts)
+    e = np.append(s[1:], flat.size) - 1
+    ok = (s % n > 0) & (e % n < n - 1)
+    ok[ok] = (flat[s[ok]] > flat[s[ok] - 1]) & (flat[e[ok]] > flat[e[ok] + 1])
+    if height is not None:
+        ok &= flat[s] >= height
+    mid = (s[ok] + e[ok]) // 2
+    if prominence is not None:
+        mid = mid[prominences(rows, mid // n, mid % n) >= prominence]
+    flags.ravel()[mid] = True
+    return flags.reshape(x.shape)
+
+
+def peak_flags(ndvi, units="raw", height=PEAK_HEIGHT, prominence=PEAK_PROMINENCE):
+    """0/1 peak column for stored NDVI: local maxima of at least `height` that rise `prominence` above their surroundings, in NDVI units."""
+    return local_peaks(to_ndvi(ndvi, units), height, prominence).astype(np.int8)
+
+
+def season_metrics(ndvi, frac=SEASON_FRACTION):
+    """Start, peak and end of season plus amplitude for every row of a (series, days) NDVI array.
+
+    One season per series, around its maximum. Start of season is the day after
+    the last day before the peak below left minimum + `frac` x (peak - left
+    minimum); end of season is the day before the first such day after it
+    (right minimum). Amplitude is the peak minus the mean of both minima.
+    Indices are -1 and values NaN for rows without data.
+    """
+    x = np.atleast_2d(np.asarray(ndvi, dtype=float))
+    n_series, n = x.shape
+    valid = ~np.isnan(x)
+    has = valid.any(axis=1)
+    rows = np.arange(n_series)
+    cols = np.arange(n)[None, :]
+
+    peak = np.where(valid, x, -np.inf).argmax(axis=1)
+    peak_value = x[rows, peak]
+    before = valid & (cols <= peak[:, None])
+    after = valid & (cols >= peak[:, None])
+    left_min = np.where(before, x, np.inf).min(axis=1)
+    right_min = np.where(after, x, np.inf).min(axis=1)
+
+    first_valid = valid.argmax(axis=1)
+    last_valid = n - 1 - valid[:, ::-1].argmax(axis=1)
+    below_left = before & (x < (left_min + frac * (peak_value - left_min))[:, None])
+    below_right = after & (x < (right_min + frac * (peak_value - right_min))[:, None])
+    sos = np.where(below_left.any(axis=1), n - below_left[:, ::-1].argmax(axis=1), first_valid)
+    eos = np.where(below_right.any(axis=1), below_right.argmax(axis=1) - 1, last_valid)
+
+    base = (left_min + right_min) / 2
+    missing = lambda a, fill: np.where(has, a, fill)
+    return {
+        "sos": missing(sos, -1), "peak": missing(peak, -1), "eos": missing(eos, -1),
+        "peak_ndvi": missing(peak_value, np.nan), "base_ndvi": missing(base, np.nan),
+        "amplitude": missing(peak_value - base, np.nan),
+    }
+
+
+def series_metrics(dates, ndvi, units="auto", frac=SEASON_FRACTION):
+    """season_metrics of one curve with dates in place of indices (None when there is no data)."""
+    metrics = {k: v[0] for k, v in season_metrics(to_ndvi(ndvi, units)[None, :], frac).items()}
+    if metrics["peak"] < 0:
+        return None
+    dates = pd.to_datetime(pd.Series(dates)).reset_index(drop=True)
+    return {**metrics, **{k: dates[metrics[k]] for k in ("sos", "peak", "eos")}}
+
+
+def phenology_table(frames, units="raw", frac=SEASON_FRACTION, height=PEAK_HEIGHT, prominence=PEAK_PROMINENCE):
+    """Season metrics and peak count of every {(region, year): DataFrame} series, from one stacked array."""
+    from batch_predict import stack_series
+
+    keys, days, ndvi, _ = stack_series(frames)
+    ndvi = to_ndvi(ndvi, units)
+    metrics = season_metrics(ndvi, frac)
+    rows = np.arange(len(keys))
+
+    def date(idx):
+        out = days[rows, np.maximum(idx, 0)].astype("datetime64[D]")
+        out[idx < 0] = np.datetime64("NaT")
+        return pd.to_datetime(out)
+
+    return pd.DataFrame({
+        "region": [k[0] for k in keys],
+        "year": [k[1] for k in keys],
+        "sos": date(metrics["sos"]),
+        "peak": date(metrics["peak"]),
+        "eos": date(metrics["eos"]),
+        "peak_ndvi": metrics["peak_ndvi"],
+        "amplitude": metrics["amplitude"],
+        "n_peaks": local_peaks(ndvi, height, prominence).sum(axis=1),
+    })
+
+
+def synthetic_series(n_series=5000, n_days=366, seed=0):
+    """Raw-unit (x 10000) double-logistic seasons with noise and a few fill values."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_days)[None, :]
+    green, brown = rng.uniform(60, 160, (n_series, 1)), rng.uniform(220, 320, (n_series, 1))
+    low, high = rng.uniform(1000, 3000, (n_series, 1)), rng.uniform(4500, 8500, (n_series, 1))
+    curve = low + (high - low) * (1 / (1 + np.exp(-(t - green) / 8)) - 1 / (1 + np.exp(-(t - brown) / 10)))
+    ndvi = curve + rng.normal(0, 80, curve.shape)
+    ndvi[rng.random(curve.shape) < 0.002] = -9999
+    return ndvi
+
+
+def loop_sos(series, frac=SEASON_FRACTION):
+    """Start of season of one NDVI series by walking it day by day, the reference for season_metrics."""
+    valid = [i for i, v in enumerate(series) if not np.isnan(v)]
+    if not valid:
+        return -1
+    peak = max(valid, key=lambda i: (series[i], -i))
+    left_min = min(series[i] for i in valid if i <= peak)
+    threshold = left_min + frac * (series[peak] - left_min)
+    below = [i for i in valid if i <= peak and series[i] < threshold]
+    return below[-1] + 1 if below else valid[0]
+
+
+def benchmark(n_series=5000, n_days=366):
+    """Vectorized flags + metrics against a find_peaks / per-series loop over the same raw series."""
+    from scipy.signal import find_peaks
+
+    raw = synthetic_series(n_series, n_days)
+    start = time.perf_counter()
+    ndvi = to_ndvi(raw, "raw")
+    flags = local_peaks(ndvi, PEAK_HEIGHT, PEAK_PROMINENCE)
+    metrics = season_metrics(ndvi)
+    vector_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loop_flags = np.zeros_like(flags)
+    loop = np.empty(n_series, dtype=np.int64)
+    for i, series in enumerate(raw):
+        series = to_ndvi(series, "raw")
+        peaks, _ = find_peaks(series, height=PEAK_HEIGHT, prominence=PEAK_PROMINENCE)
+        loop_flags[i, peaks] = True
+        loop[i] = loop_sos(series)
+    loop_s = time.perf_counter() - start
+
+    # 昔の height=0.5 を生の値に当てた場合：ほぼ全ての極大が通ってしまう
+    unscaled = sum(len(find_peaks(series, height=0.5)[0]) for series in raw[:200])
+    return {
+        "series": n_series, "days": n_days, "vectorized_s": vector_s, "loop_s": loop_s,
+        "flags_match": bool((flags == loop_flags).all()), "sos_match": bool((metrics["sos"] == loop).all()),
+        "peaks_per_series": float(flags.sum() / n_series), "unscaled_peaks_per_series": unscaled / 200,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Peaks and season metrics (SOS / peak / EOS / amplitude) of NDVI series")
+    parser.add_argument("--years", type=int, nargs="+", help="stored years to summarize (default: all)")
+    parser.add_argument("--bench", type=int, metavar="SERIES", help="time the vectorized path on synthetic series")
+    args = parser.parse_args()
+
+    if args.bench:
+        print(benchmark(args.bench))
+    else:
+        from store import list_region_years, read_region_year
+
+        frames = {key: read_region_year(*key) for key in list_region_years()
+                  if args.years is None or key[1] in args.years}
+        print(phenology_table(frames).to_string(index=False, float_format="%.3f"))
@@ -0,0 +1,216 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+import rasterio
+from rasterio.features import geometry_mask
+from rasterio.warp import transform_geom
+from rasterio.windows import Window, from_bounds
+from shapely.geometry import shape
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, "raster_cache")
+
+# MOD13Q1.A2024001.h28v05.061.2024018031232.hdf / .tif
+TILE_NAME = re.compile(r"MOD13Q1\.A(?P<year>\d{4})(?P<doy>\d{3})\.(?P<tile>h\d{2}v\d{2})\.")
+HDF_NDVI = 'HDF4_EOS:EOS_GRID:"{path}":MODIS_Grid_16DAY_250m_500m_VI:"250m 16 days NDVI"'
+FILL = -3000  # MOD13Q1 NDVI fill value; valid range is -2000..10000
+
+
+def scan_tiles(tiles_dir, year):
+    """{tile: [(date, path), ...] sorted by date} for the MOD13Q1 files of one year."""
+    tiles = {}
+    for path in sorted(glob.glob(os.path.join(tiles_dir, "**", "MOD13Q1.A*"), recursive=True)):
+        m = TILE_NAME.search(os.path.basename(path))
+        if not m or int(m['year']) != year or not path.endswith((".tif", ".tiff", ".hdf")):
+            continue
+        date = pd.Timestamp(year, 1, 1) + pd.Timedelta(days=int(m['doy']) - 1)
+        tiles.setdefault(m['tile'], []).append((date, path))
+    return {tile: sorted(files) for tile, files in tiles.items()}
+
+
+def _open(path):
+    return rasterio.open(HDF_NDVI.format(path=path) if path.endswith(".hdf") else path)
+
+
+class TileStack:
+    """All composites of one tile and year as a (n_dates, rows, cols) int16 memmap.
+
+    Built once from the source files; afterwards a region only pages in its
+    own bounding-box window of every composite.
+    """
+
+    def __init__(self, tile, files, cache_dir):
+        self.tile = tile
+        self.dates = [date for date, _ in files]
+        year = self.dates[0].year
+        path = os.path.join(cache_dir, "stacks", f"{tile}_{year}.npy")
+        meta_path = path[:-4] + ".json"
+        sources = [os.path.basename(p) for _, p in files]
+
+        meta = None
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        if meta is None or meta["sources"] != sources or not os.path.exists(path):
+            meta = self._build(files, path, sources)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+        self.crs = meta["crs"]
+        self.transform = rasterio.Affine(*meta["transform"])
+        self.nodata = meta["nodata"]
+        self.cube = np.load(path, mmap_mode="r")
+        left, top = self.transform * (0, 0)
+        right, bottom = self.transform * (self.cube.shape[2], self.cube.shape[1])
+        self.bounds = (min(left, right), min(top, bottom), max(left, right), max(top, bottom))
+
+    @staticmethod
+    def _build(files, path, sources):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with _open(files[0][1]) as src:
+            shape_, crs, transform, nodata = (src.height, src.width), src.crs.to_wkt(), src.transform, src.nodata
+        cube = np.lib.format.open_memmap(path + ".tmp", mode="w+", dtype=np.int16, shape=(len(files), *shape_))
+        for i, (_, p) in enumerate(files):
+            with _open(p) as src:
+                cube[i] = src.read(1)
+        cube.flush()
+        del cube
+        os.replace(path + ".tmp", path)
+        return {"sources": sources, "crs": crs, "transform": list(transform)[:6],
+                "nodata": FILL if nodata is None else nodata}
+
+
+class RasterNDVI:
+    """Per-region mean NDVI from local MOD13Q1 tiles, the same numbers Ingestor asks Earth Engine for.
+
+    A region's geometry is projected into each tile it overlaps, clipped to
+    its bounding-box window and rasterized once (pixel centres, as at scale
+    250); the mask is cached on disk per region and tile. The mean over the
+    mask is then taken for every composite in one vectorized pass, skipping
+    fill pixels.
+    """
+
+    def __init__(self, tiles_dir, cache_dir=CACHE_DIR):
+        self.tiles_dir = tiles_dir
+        self.cache_dir = cache_dir
+        self.stacks = {}
+
+    def tile_stacks(self, year):
+        if year not in self.stacks:
+            self.stacks[year] = [TileStack(tile, files, self.cache_dir)
+                                 for tile, files in scan_tiles(self.tiles_dir, year).items()]
+        return self.stacks[year]
+
+    def _mask(self, geometry, stack):
+        """(window, mask) of a region within one tile, or None when they do not overlap."""
+        digest = hashlib.sha1(json.dumps(geometry, sort_keys=True).encode("utf-8")).hexdigest()
+        path = os.path.join(self.cache_dir, "masks", stack.tile, f"{digest}.npz")
+        if os.path.exists(path):
+            cached = np.load(path)
+            if cached["window"][2] == 0:
+                return None
+            return Window(*cached["window"]), cached["mask"]
+
+        projected = transform_geom("EPSG:4326", stack.crs, geometry)
+        minx, miny, maxx, maxy = shape(projected).bounds
+        left, bottom, right, top = stack.bounds
+        result = None
+        if minx < right and maxx > left and miny < top and maxy > bottom:
+            window = from_bounds(max(minx, left), max(miny, bottom), min(maxx, right), min(maxy, top), stack.transform)
+            # widen to whole pixels so no pixel centre on the edge is dropped
+            col0, row0 = int(np.floor(window.col_off)), int(np.floor(window.row_off))
+            window = Window(col0, row0, int(np.ceil(window.col_off + window.width)) - col0,
+                            int(np.ceil(window.row_off + window.height)) - row0)
+            window = window.intersection(Window(0, 0, stack.cube.shape[2], stack.cube.shape[1]))
+            mask = geometry_mask([projected], out_shape=(window.height, window.width),
+                                 transform=rasterio.windows.transform(window, stack.transform), invert=True)
+            if mask.any():
+                result = (window, mask)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if result is None:
+            np.savez(path, window=np.zeros(4, dtype=np.int64), mask=np.zeros((0, 0), dtype=bool))
+        else:
+            window, mask = result
+            np.savez(path, window=np.array([window.col_off, window.row_off, window.width, window.height]), mask=mask)
+        return result
+
+    def region_means(self, features, year):
+        """(NAME_1, date, NDVI) per composite, like the reduceRegions rows; NaN where no valid pixel."""
+        stacks = self.tile_stacks(year)
+        if not stacks:
+            raise FileNotFoundError(f"no MOD13Q1 tiles for {year} under {self.tiles_dir}")
+        dates = sorted({d for stack in stacks for d in stack.dates})
+        rows = []
+        for feature in features:
+            sums = np.zeros(len(dates))
+            counts = np.zeros(len(dates))
+            for stack in stacks:
+                found = self._mask(feature['geometry'], stack)
+                if found is None:
+                    continue
+                window, mask = found
+                # (n_dates, n_pixels) for every composite of this tile at once
+                block = stack.cube[:, window.row_off:window.row_off + window.height,
+                                   window.col_off:window.col_off + window.width][:, mask]
+                valid = (block != stack.nodata) & (block >= -2000)
+                idx = [dates.index(d) for d in stack.dates]
+                sums[idx] += np.where(valid, block, 0).sum(axis=1, dtype=np.int64)
+                counts[idx] += valid.sum(axis=1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means = sums / counts
+            rows.append(pd.DataFrame({'NAME_1': feature['properties']['NAME_1'], 'date': dates, 'NDVI': means}))
+        return pd.concat(rows, ignore_index=True)
+
+    @staticmethod
+    def centroid(feature):
+        point = shape(feature['geometry']).centroid
+        return point.y, point.x
+
+
+def naive_means(tiles_dir, features, year):
+    """Reference path for the benchmark: re-read and re-rasterize every composite for every region."""
+    rows = []
+    for feature in features:
+        for tile, files in scan_tiles(tiles_dir, year).items():
+            for date, path in files:
+                with _open(path) as src:
+                    projected = transform_geom("EPSG:4326", src.crs, feature['geometry'])
+                    data = src.read(1)
+                    mask = geometry_mask([projected], out_shape=data.shape, transform=src.transform, invert=True)
+                    values = data[mask]
+                    values = values[(values != (src.nodata if src.nodata is not None else FILL)) & (values >= -2000)]
+                    rows.append((feature['properties']['NAME_1'], date, values.sum(), values.size))
+    df = pd.DataFrame(rows, columns=['NAME_1', 'date', 'sum', 'count']).groupby(['NAME_1', 'date'], sort=False).sum()
+    return (df['sum'] / df['count']).rename('NDVI').reset_index()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mean NDVI per GADM level-1 region from local MOD13Q1 tiles")
+    parser.add_argument("tiles_dir")
+    parser.add_argument("regions", help="GADM level-1 GeoJSON (e.g. gadm41_JPN_1.json)")
+    parser.add_argument("--year", type=int, default=2024)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--bench", action="store_true", help="also time the re-read-everything reference path")
+    args = parser.parse_args()
+
+    with open(args.regions, encoding="utf-8") as f:
+        features = json.load(f)['features']
+    backend = RasterNDVI(args.tiles_dir, args.cache_dir)
+    for label in ("cold", "warm"):
+        backend.stacks.clear()
+        start = time.perf_counter()
+        means = backend.region_means(features, args.year)
+        print(f"{label}: {len(features)} regions x {means['date'].nunique()} composites in {time.perf_counter() - start:.2f}s")
+    if args.bench:
+        start = time.perf_counter()
+        naive_means(args.tiles_dir, features, args.year)
+        print(f"per-composite reads: {time.perf_counter() - start:.2f}s")
+    print(means.groupby('NAME_1')['NDVI'].mean().round(1).to_string())
@@ -0,0 +1,183 @@
+import argparse
+import glob
+import io
+import os
+import re
+import time
+import zipfile
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = os.path.join(BASE_DIR, "store")
+WORLD_DIR = os.path.join(BASE_DIR, "world")
+
+# Column types for every region-year partition
+COLUMNS = {
+    "date": "datetime64[ns]",
+    "T2M": "float64",
+    "NDVI": "float64",
+    "GDD_daily": "float64",
+    "GDD_cumsum": "float64",
+    "peak": "int8",
+}
+# Daily min / max temperature, kept when the ingestion fetched them (Ingestor(minmax=True))
+OPTIONAL_COLUMNS = {
+    "T2M_MIN": "float64",
+    "T2M_MAX": "float64",
+}
+
+CSV_NAME = re.compile(r"^(?P<region>.+)_(?P<year>\d{4})_ndvi_temp\.csv$")
+
+
+def partition_path(region, year, store_dir=STORE_DIR):
+    # store/{region}/{year}.parquet
+    return os.path.join(store_dir, region, f"{year}.parquet")
+
+
+def csv_path(region, year, world_dir=WORLD_DIR):
+    return os.path.join(world_dir, f"{region}_{year}_ndvi_temp.csv")
+
+
+def to_schema(df):
+    types = {**COLUMNS, **{c: t for c, t in OPTIONAL_COLUMNS.items() if c in df.columns}}
+    df = df[list(types)].copy()
+    df["date"] = pd.to_datetime(df["date"])
+    return df.astype(types)
+
+
+def write_region_year(df, region, year, store_dir=STORE_DIR):
+    path = partition_path(region, year, store_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    to_schema(df).to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    return path
+
+
+def read_region_year(region, year, store_dir=STORE_DIR, world_dir=WORLD_DIR):
+    """Load one region-year from the store, falling back to the legacy world/ CSV.
+
+    Raises FileNotFoundError when neither exists.
+    """
+    path = partition_path(region, year, store_dir)
+    if os.path.exists(path):
+        return pd.read_parquet(path)
+    return to_schema(pd.read_csv(csv_path(region, year, world_dir)))
+
+
+def read_region_years(region, years, store_dir=STORE_DIR, world_dir=WORLD_DIR):
+    dfs = []
+    for year in years:
+        try:
+            dfs.append(read_region_year(region, year, store_dir, world_dir))
+        except FileNotFoundError:
+            continue
+    if not dfs:
+        raise FileNotFoundError(f"No data for {region} in {list(years)}")
+    return pd.concat(dfs, ignore_index=True)
+
+
+def source_path(region, year, store_dir=STORE_DIR, world_dir=WORLD_DIR):
+    """The file read_region_year would load, for cache keys based on mtime."""
+    path = partition_path(region, year, store_dir)
+    return path if os.path.exists(path) else csv_path(region, year, world_dir)
+
+
+def list_partitions(store_dir=STORE_DIR):
+    parts = []
+    for path in glob.glob(os.path.join(store_dir, "*", "*.parquet")):
+        region = os.path.basename(os.path.dirname(path))
+        parts.append((region, int(os.path.splitext(os.path.basename(path))[0])))
+    return sorted(parts)
+
+
+def list_region_years(store_dir=STORE_DIR, world_dir=WORLD_DIR):
+    """Every (region, year) readable through read_region_year: store partitions plus legacy CSVs."""
+    parts = set(list_partitions(store_dir))
+    for path in glob.glob(os.path.join(world_dir, "*_ndvi_temp.csv")):
+        match = CSV_NAME.match(os.path.basename(path))
+        if match is not None:
+            parts.add((match["region"], int(match["year"])))
+    return sorted(parts)
+
+
+# --- Converters for the existing CSV files ---
+
+def convert_csv_dir(src_dir=WORLD_DIR, store_dir=STORE_DIR, prefix=""):
+    converted = []
+    for path in sorted(glob.glob(os.path.join(src_dir, "*_ndvi_temp.csv"))):
+        match = CSV_NAME.match(os.path.basename(path))
+        df = pd.read_csv(path)
+        if match is None or df.empty:
+            continue
+        region = prefix + match["region"]
+        write_region_year(df, region, int(match["year"]), store_dir)
+        converted.append((region, int(match["year"])))
+    return converted
+
+
+def convert_zip(zip_path, store_dir=STORE_DIR, prefix="Japan_"):
+    # kanto.zip holds kanto/{pref}_{year}_ndvi_temp.csv; the 2023 files are header-only
+    converted = []
+    with zipfile.ZipFile(zip_path) as zf:
+        for name in sorted(zf.namelist()):
+            match = CSV_NAME.match(os.path.basename(name))
+            if match is None:
+                continue
+            df = pd.read_csv(io.BytesIO(zf.read(name)))
+            if df.empty:
+                continue
+            region = prefix + match["region"]
+            write_region_year(df, region, int(match["year"]), store_dir)
+            converted.append((region, int(match["year"])))
+    return converted
+
+
+def benchmark(partitions, store_dir=STORE_DIR, world_dir=WORLD_DIR, repeat=20):
+    """Time loading every partition from CSV (as the app did) and from Parquet."""
+    def load_csv():
+        for region, year in partitions:
+            df = pd.read_csv(csv_path(region, year, world_dir))
+            df["date"] = pd.to_datetime(df["date"])
+
+    def load_parquet():
+        for region, year in partitions:
+            pd.read_parquet(partition_path(region, year, store_dir))
+
+    results = {}
+    for label, fn in [("csv", load_csv), ("parquet", load_parquet)]:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        results[label] = (time.perf_counter() - start) / repeat
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Columnar NDVI/GDD store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    conv = sub.add_parser("convert", help="convert world/ CSVs (and kanto.zip) into the store")
+    conv.add_argument("--world", default=WORLD_DIR)
+    conv.add_argument("--zip", default=os.path.join(BASE_DIR, "kanto.zip"))
+    bench = sub.add_parser("bench", help="compare CSV and Parquet load time")
+    bench.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        converted = convert_csv_dir(args.world)
+        if os.path.exists(args.zip):
+            converted += convert_zip(args.zip)
+        print(f"Converted {len(converted)} region-years into {STORE_DIR}")
+    else:
+        partitions = [p for p in list_partitions() if os.path.exists(csv_path(*p))]
+        if not partitions:
+            parser.exit(1, f"No partitions with a matching world/ CSV in {STORE_DIR}; run `python store.py convert` first\n")
+        results = benchmark(partitions, repeat=args.repeat)
+        for label, seconds in results.items():
+            print(f"{label:8s} {len(partitions)} partitions: {seconds * 1000:.1f} ms")
+        ratio = results['csv'] / results['parquet']
+        # 1年353行程度のファイルでは Parquet のメタデータ読み込みが CSV の解析と同じくらいかかる
+        verdict = "faster" if ratio > 1.5 else "slower" if ratio < 0.67 else "about as fast as CSV"
+        print(f"csv / parquet: {ratio:.1f}x (Parquet is {verdict} at this data size; "
+              "the store's gains are the typed schema and one file per region-year, not read speed)")
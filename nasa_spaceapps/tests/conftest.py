@@ -0,0 +1,53 @@
+import json
+import os
+import sys
+
+import pytest
+
+# The app modules import each other by bare name (python analyze.py / streamlit run from nasa_spaceapps/)
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(TESTS_DIR), TESTS_DIR]
+
+from fakes import FakeEE, StubServer, countries_geojson, region_features  # noqa: E402
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """Local GADM / POWER server for Japan (two regions) and France (one); everything else is a 404."""
+    import ingest
+
+    server = StubServer({
+        "JPN": region_features(["Tokyo", "Osaka"]),
+        "FRA": region_features(["Bretagne"], lon=-3.0, lat=48.0),
+    })
+    monkeypatch.setattr(ingest, "GADM_URL", server.url + "/gadm/{iso3}")
+    monkeypatch.setattr(ingest, "POWER_URL", server.url + "/power")
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def make_ingestor(tmp_path):
+    """Ingestor over FakeEE and directories under `root` (tmp_path); keyword arguments override the test defaults."""
+    import ingest
+    from http_client import CachedClient
+
+    def make(year=2024, ee_module=None, root=tmp_path, **kw):
+        kw.setdefault("rates", {"gadm": 1000, "ee": 1000, "power": 1000})
+        kw.setdefault("backoff", 0.01)
+        kw.setdefault("http", CachedClient(str(root / "http_cache")))
+        return ingest.Ingestor(ee_module or FakeEE(), year, str(root / "world"), store_dir=str(root / "store"), **kw)
+
+    return make
+
+
+@pytest.fixture
+def world_path(tmp_path):
+    """basemap.build over a few Natural Earth-shaped countries; the real asset is downloaded on first use."""
+    import basemap
+
+    source = tmp_path / "countries.geojson"
+    source.write_text(json.dumps(countries_geojson()), encoding="utf-8")
+    path = str(tmp_path / "basemap" / "countries.parquet")
+    basemap.build(str(source), path)
+    return path
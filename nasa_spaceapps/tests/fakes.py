@@ -0,0 +1,280 @@
+"""Offline stand-ins for the services the ingestion talks to.
+
+`FakeEE` has the slice of the Earth Engine API Ingestor and ee_export use,
+evaluated eagerly in Python. `StubServer` serves GADM level-1 GeoJSON and
+NASA POWER daily T2M over local HTTP. `countries_geojson` stands in for the
+Natural Earth admin-0 download.
+"""
+import datetime
+import hashlib
+import json
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def composite_value(date):
+    """Raw NDVI of the fake composite on `date`: one season peaking in late July."""
+    doy = date.timetuple().tm_yday
+    return 4000.0 + 2000.0 * math.sin(math.pi * doy / 366)
+
+
+def resolve(value):
+    if isinstance(value, _Value):
+        return resolve(value.value)
+    if isinstance(value, dict):
+        return {k: resolve(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [resolve(v) for v in value]
+    return value
+
+
+class _Date:
+    def __init__(self, date):
+        self.date = date
+
+    def format(self, fmt):
+        return self.date.isoformat()
+
+
+class _Value:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self, i):
+        return _Value(resolve(self.value)[i])
+
+    def getInfo(self):
+        return resolve(self.value)
+
+
+def _points(coords):
+    if coords and isinstance(coords[0], (int, float)):
+        yield coords
+    else:
+        for c in coords:
+            yield from _points(c)
+
+
+class FakeEE:
+    """Module-like Earth Engine stand-in: pass an instance as Ingestor(ee_module=...)."""
+
+    def __init__(self, until=None):
+        self.until = until  # composites after this date do not exist yet
+        self.get_info_calls = 0
+        fake = self
+
+        class Geometry:
+            def __init__(self, geometry):
+                self.geometry_ = geometry
+
+            def centroid(self, *args):
+                points = list(_points(self.geometry_["coordinates"]))
+                lon = sum(p[0] for p in points) / len(points)
+                lat = sum(p[1] for p in points) / len(points)
+                return Geometry({"type": "Point", "coordinates": [lon, lat]})
+
+            def coordinates(self):
+                return _Value(self.geometry_["coordinates"])
+
+        class Feature:
+            def __init__(self, geometry, properties=None):
+                if isinstance(geometry, dict) and geometry.get("type") == "Feature":
+                    geometry, properties = geometry["geometry"], geometry["properties"]
+                self.geometry_ = Geometry(geometry) if isinstance(geometry, dict) else geometry
+                self.properties = dict(properties or {})
+
+            def geometry(self):
+                return self.geometry_
+
+            def get(self, key):
+                return self.properties[key]
+
+            def set(self, *pairs):
+                properties = dict(self.properties)
+                properties.update(zip(pairs[::2], pairs[1::2]))
+                return Feature(self.geometry_, properties)
+
+        class FeatureCollection:
+            def __init__(self, features):
+                self.features = list(features)
+
+            def map(self, fn):
+                return FeatureCollection(fn(f) for f in self.features)
+
+            def flatten(self):
+                flat = []
+                for f in self.features:
+                    flat.extend(f.features if isinstance(f, FeatureCollection) else [f])
+                return FeatureCollection(flat)
+
+            def select(self, properties, new_properties=None, retain_geometry=True):
+                return FeatureCollection(
+                    Feature(None, {p: f.properties[p] for p in properties if p in f.properties}) for f in self.features
+                )
+
+            def info(self):
+                return {"features": [{"properties": resolve(f.properties)} for f in self.features]}
+
+            def getInfo(self):
+                fake.get_info_calls += 1
+                return self.info()
+
+        class Image:
+            def __init__(self, date):
+                self.date_ = date
+
+            def date(self):
+                return _Date(self.date_)
+
+            def reduceRegion(self, reducer, geometry, scale, maxPixels=None):
+                return {"NDVI": composite_value(self.date_)}
+
+            def reduceRegions(self, collection, reducer, scale):
+                return collection.map(lambda f: f.set("mean", composite_value(self.date_)))
+
+        class ImageCollection:
+            def __init__(self, name=None, images=None):
+                if images is None:
+                    images = [datetime.date(year, 1, 1) + datetime.timedelta(days=16 * i)
+                              for year in range(2018, 2027) for i in range(23)]
+                self.images = images
+
+            def select(self, *args):
+                return self
+
+            def filterDate(self, start, end):
+                start, end = datetime.date.fromisoformat(start), datetime.date.fromisoformat(end)
+                return ImageCollection(images=[d for d in self.images if start <= d < end])
+
+            def map(self, fn):
+                available = [d for d in self.images if fake.until is None or d <= fake.until]
+                return FeatureCollection(fn(Image(d)) for d in available)
+
+        class Dictionary:
+            def __init__(self, items):
+                self.items = items
+
+            def getInfo(self):
+                fake.get_info_calls += 1
+                return {k: v.info() if isinstance(v, FeatureCollection) else resolve(v) for k, v in self.items.items()}
+
+        class Reducer:
+            @staticmethod
+            def mean():
+                return "mean"
+
+        class Algorithms:
+            @staticmethod
+            def If(condition, a, b):
+                return a if condition is not None else b
+
+        self.Geometry, self.Feature, self.FeatureCollection = Geometry, Feature, FeatureCollection
+        self.Image, self.ImageCollection, self.Dictionary = Image, ImageCollection, Dictionary
+        self.Reducer, self.Algorithms = Reducer, Algorithms
+
+
+def square(lon, lat, size=0.2):
+    return {"type": "Polygon", "coordinates": [[
+        [lon, lat], [lon + size, lat], [lon + size, lat + size], [lon, lat + size], [lon, lat],
+    ]]}
+
+
+def region_features(names, lon=139.0, lat=35.0):
+    return [
+        {"type": "Feature", "properties": {"NAME_1": name}, "geometry": square(lon + i, lat)}
+        for i, name in enumerate(names)
+    ]
+
+
+# (ADMIN, NAME, ADM0_A3, ISO_A3) as Natural Earth spells them: NAME is abbreviated, ISO_A3 is -99 for some
+COUNTRIES = [
+    ("Japan", "Japan", "JPN", "JPN"),
+    ("South Korea", "South Korea", "KOR", "KOR"),
+    ("Bolivia", "Bolivia", "BOL", "BOL"),
+    ("France", "France", "FRA", "-99"),
+    ("Norway", "Norway", "NOR", "-99"),
+    ("Democratic Republic of the Congo", "Dem. Rep. Congo", "COD", "COD"),
+]
+
+
+def countries_geojson():
+    return {"type": "FeatureCollection", "features": [
+        {"type": "Feature", "properties": {"ADMIN": admin, "NAME": name, "ADM0_A3": adm0, "ISO_A3": iso3},
+         "geometry": square(10.0 * i, 0.0, 5.0)}
+        for i, (admin, name, adm0, iso3) in enumerate(COUNTRIES)
+    ]}
+
+
+def t2m_value(date):
+    return 10.0 + 10.0 * math.sin(2 * math.pi * (date.timetuple().tm_yday - 100) / 366)
+
+
+class StubServer:
+    """GADM at /gadm/{ISO3}, POWER at /power; `fail` holds status codes to return next per kind.
+
+    200 answers carry an ETag and a matching If-None-Match gets a bare 304.
+    """
+
+    def __init__(self, countries, last_day=None):
+        self.countries = countries  # {iso3: [feature, ...]}
+        self.last_day = last_day  # POWER days after this come back as -999
+        self.fail = {"gadm": [], "power": []}
+        self.calls = {"gadm": [], "power": []}
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                kind = "gadm" if url.path.startswith("/gadm/") else "power"
+                stub.calls[kind].append(url)
+                if stub.fail[kind]:
+                    self.reply(stub.fail[kind].pop(0), {"error": "stub"})
+                elif kind == "gadm":
+                    iso3 = url.path.rsplit("/", 1)[-1]
+                    if iso3 in stub.countries:
+                        self.reply(200, {"type": "FeatureCollection", "features": stub.countries[iso3]})
+                    else:
+                        self.reply(404, {"error": "not found"})
+                else:
+                    self.reply(200, stub.power(parse_qs(url.query)))
+
+            def reply(self, status, body):
+                data = json.dumps(body).encode("utf-8")
+                etag = '"%s"' % hashlib.sha1(data).hexdigest()
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(status)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def power(self, query):
+        start = datetime.datetime.strptime(query["start"][0], "%Y%m%d").date()
+        end = datetime.datetime.strptime(query["end"][0], "%Y%m%d").date()
+        series = {name: {} for name in query["parameters"][0].split(",")}
+        day = start
+        while day <= end:
+            known = self.last_day is None or day <= self.last_day
+            t = t2m_value(day)
+            values = {"T2M": t, "T2M_MIN": t - 4.0, "T2M_MAX": t + 4.0}
+            for name in series:
+                series[name][day.strftime("%Y%m%d")] = values[name] if known else -999.0
+            day += datetime.timedelta(days=1)
+        return {"properties": {"parameter": series}}
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import basemap
+from animation import region_country, render_gif, synthetic_world
+
+
+@pytest.mark.parametrize("region, country", [
+    ("Japan_Tokyo", "Japan"),
+    ("Korea,_Republic_of_Seoul", "South Korea"),
+    ("Bolivia,_Plurinational_State_of_Beni", "Bolivia"),
+    ("France_Bretagne", "France"),
+    ("Atlantis_Capital", None),
+])
+def test_region_country_matches_on_iso3(region, country, world_path):
+    assert region_country(basemap.load(world_path), region) == country
+
+
+def test_render_gif_frames():
+    dates = pd.date_range("2024-03-01", periods=4)
+    gif = render_gif(synthetic_world(), "Japan", dates, [1.0, np.nan, 3.0, 4.0], "GDD_cumsum", figsize=(3, 2))
+    assert gif.startswith(b"GIF89a") and gif.endswith(b";")
+
+
+@pytest.mark.parametrize("values", [[], [np.nan, np.nan]])
+def test_render_gif_without_values_returns_none(values):
+    dates = pd.date_range("2024-03-01", periods=len(values))
+    assert render_gif(synthetic_world(), "Japan", dates, values) is None
@@ -0,0 +1,62 @@
+import functools
+import os
+
+import pandas as pd
+import pytest
+import streamlit as st
+
+import app_cache
+import store
+from bloom_index import BloomIndex
+
+
+def frame(year, slope_day):
+    dates = pd.date_range(f"{year}-01-01", periods=120)
+    ndvi = [4000.0 + 50.0 * max(i - slope_day + 1, 0) for i in range(120)]  # slope 50 from slope_day on
+    return pd.DataFrame({"date": dates, "T2M": 10.0, "NDVI": ndvi, "GDD_daily": 5.0,
+                         "GDD_cumsum": [5.0 * (i + 1) for i in range(120)], "peak": 0})
+
+
+@pytest.fixture
+def local_store(tmp_path, monkeypatch):
+    store_dir, world_dir = str(tmp_path / "store"), str(tmp_path / "world")
+    monkeypatch.setattr(app_cache, "INDEX_PATH", str(tmp_path / "bloom_index.npz"))
+    monkeypatch.setattr(app_cache, "list_region_years", functools.partial(store.list_region_years, store_dir, world_dir))
+    monkeypatch.setattr(app_cache, "read_region_year",
+                        lambda r, y: store.read_region_year(r, y, store_dir, world_dir))
+    monkeypatch.setattr(app_cache, "source_path", lambda r, y: store.source_path(r, y, store_dir, world_dir))
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    yield store_dir
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def bloom(year=2024):
+    return app_cache.threshold_bloom_date("Japan_Tokyo", year, f"{year}-01-01", 100, 40)
+
+
+def test_bloom_index_follows_rewritten_partitions(local_store):
+    store.write_region_year(frame(2024, 30), "Japan_Tokyo", 2024, local_store)
+    assert bloom() == pd.Timestamp("2024-01-31")
+
+    path = store.write_region_year(frame(2024, 60), "Japan_Tokyo", 2024, local_store)
+    os.utime(path, (os.path.getmtime(path) + 5,) * 2)
+    assert bloom() == pd.Timestamp("2024-03-01")
+
+
+def test_stale_prebuilt_index_is_not_used(local_store):
+    path = store.write_region_year(frame(2024, 30), "Japan_Tokyo", 2024, local_store)
+    BloomIndex.build({("Japan_Tokyo", 2024): frame(2024, 30)}).save(app_cache.INDEX_PATH)
+    os.utime(app_cache.INDEX_PATH, (os.path.getmtime(path) + 5,) * 2)
+    assert app_cache.bloom_index() is app_cache.bloom_index()  # up to date: loaded once and shared
+    assert bloom() == pd.Timestamp("2024-01-31")
+
+    # Ingestion rewrites the partition after the index was built
+    store.write_region_year(frame(2024, 60), "Japan_Tokyo", 2024, local_store)
+    os.utime(path, (os.path.getmtime(app_cache.INDEX_PATH) + 5,) * 2)
+    assert bloom() == pd.Timestamp("2024-03-01")
+
+    # A region-year added after the index was built
+    store.write_region_year(frame(2023, 10), "Japan_Tokyo", 2023, local_store)
+    assert ("Japan_Tokyo", 2023) in app_cache.bloom_index()
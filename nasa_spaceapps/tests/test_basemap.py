@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+import basemap
+from fakes import COUNTRIES
+
+
+def test_build_keeps_admin_names_and_fills_iso3(world_path):
+    manifest = basemap.load_manifest(os.path.join(os.path.dirname(world_path), "manifest.json"))
+    world = basemap.load(world_path)
+
+    assert manifest["sha256"] == basemap.file_hash(world_path)
+    assert len(world) == manifest["rows"] == len(COUNTRIES)
+    assert list(world.columns) == ["ADMIN", "ISO_A3", "geometry"]
+    # ADMIN is the full name, not the abbreviated NAME; -99 falls back to ADM0_A3
+    assert world["ADMIN"].tolist() == [c[0] for c in COUNTRIES]
+    assert world["ISO_A3"].tolist() == [c[2] for c in COUNTRIES]
+
+
+def test_missing_asset_is_downloaded_once(world_path, tmp_path, monkeypatch):
+    sources = []
+
+    def build(source, path):
+        sources.append(source)
+        os.link(world_path, path)
+
+    monkeypatch.setattr(basemap, "build", build)
+    path = str(tmp_path / "countries.parquet")
+    assert len(basemap.load(path)) == len(basemap.load(path))
+    assert sources == [basemap.NATURAL_EARTH_URL]
+
+
+def test_failed_download_names_the_build_command(tmp_path, monkeypatch):
+    def build(source, path):
+        raise OSError("network unreachable")
+
+    monkeypatch.setattr(basemap, "build", build)
+    with pytest.raises(FileNotFoundError, match="basemap.py build"):
+        basemap.load(str(tmp_path / "countries.parquet"))
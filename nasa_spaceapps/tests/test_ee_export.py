@@ -0,0 +1,106 @@
+import pandas as pd
+import pytest
+
+import ee_export
+import store
+
+
+class FakeClient:
+    """EarthEngineClient stand-in: each task walks through `script` (one state per poll, the last one repeats)."""
+
+    def __init__(self, script=("RUNNING", "COMPLETED"), scripts=None):
+        self.script = script
+        self.scripts = scripts or {}  # export name -> script for that attempt
+        self.tasks = {}
+        self.cancelled = []
+        self.max_running = 0
+
+    def start_export(self, collection, name):
+        task_id = f"T{len(self.tasks)}"
+        self.tasks[task_id] = {"name": name, "collection": collection, "polls": 0}
+        return task_id
+
+    def statuses(self, task_ids):
+        self.max_running = max(self.max_running, len(task_ids))
+        out = {}
+        for task_id in task_ids:
+            task = self.tasks[task_id]
+            script = self.scripts.get(task["name"], self.script)
+            state = script[min(task["polls"], len(script) - 1)]
+            task["polls"] += 1
+            if state is not None:  # None: the task is missing from the answer
+                out[task_id] = {"id": task_id, "state": state, "error_message": f"{task['name']} {state}"}
+        return out
+
+    def cancel(self, task_id):
+        self.cancelled.append(task_id)
+
+    def download(self, name):
+        collection = next(t["collection"] for t in self.tasks.values() if t["name"] == name)
+        if isinstance(collection, list):
+            return collection
+        # A FakeEE feature collection built by ndvi_collection
+        return pd.DataFrame([f["properties"] for f in collection.info()["features"]], columns=ee_export.SELECTORS)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def __call__(self):
+        return self.now
+
+
+def scheduler(client, **kw):
+    clock = Clock()
+    return ee_export.ExportScheduler(client, poll_interval=10, sleep=clock.sleep, clock=clock, **kw)
+
+
+def jobs(n):
+    return [(f"job{i}", [{"i": i}], [f"C{i}"]) for i in range(n)]
+
+
+def test_jobs_complete_within_the_running_limit():
+    client = FakeClient(scripts={"job1_1": ("RUNNING", "FAILED")})
+    results = list(scheduler(client, max_running=2).run(jobs(5)))
+
+    assert sorted(job[0] for job, rows, error in results) == [f"job{i}" for i in range(5)]
+    assert all(error is None and rows == job[1] for job, rows, error in results)
+    assert client.max_running == 2
+    assert [t["name"] for t in client.tasks.values()].count("job1_2") == 1
+
+
+@pytest.mark.parametrize("state", ["UNKNOWN", "SOMETHING_NEW", None])
+def test_unknown_states_fail_instead_of_polling_forever(state):
+    client = FakeClient(script=("RUNNING", state))
+    results = list(scheduler(client, max_attempts=2).run(jobs(1)))
+
+    assert len(results) == 1 and results[0][1] is None
+    assert results[0][2] == f"task state {state or 'UNKNOWN'}"
+    assert len(client.tasks) == 2
+
+
+def test_stuck_tasks_are_cancelled_after_the_timeout():
+    client = FakeClient(script=("READY",))
+    (job, rows, error), = scheduler(client, max_attempts=2, timeout=60).run(jobs(1))
+
+    assert rows is None and error == "READY after 60s; cancelled"
+    assert client.cancelled == ["T0", "T1"]
+
+
+def test_run_exports_stores_every_region(stub, make_ingestor):
+    ingestor = make_ingestor(all_regions=True)
+    counts = ee_export.run_exports(ingestor, [("Japan", "JPN"), ("France", "FRA")], scheduler(FakeClient()),
+                                   batch_size=1, workers=2)["counts"]
+
+    assert counts == {"saved": 2}
+    assert sorted(store.list_partitions(ingestor.store_dir)) == [
+        ("France_Bretagne", 2024), ("Japan_Osaka", 2024), ("Japan_Tokyo", 2024)]
+
+
+def test_run_exports_needs_all_regions(make_ingestor):
+    with pytest.raises(ValueError, match="all_regions"):
+        ee_export.run_exports(make_ingestor(), [("Japan", "JPN")], scheduler(FakeClient()))
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch_predict
+from gdd import GDDEngine, T_base
+
+
+@pytest.fixture
+def frames():
+    return batch_predict.synthetic_frames(3, years=[2023, 2024])
+
+
+def test_cube_matches_clip_cumsum(frames):
+    engine = GDDEngine(frames)
+    cube = engine.cube([0.0, T_base, 10.0], "minmax")
+    for i, key in enumerate(engine.keys):
+        df = frames[key]
+        mean = (df['T2M_MIN'] + df['T2M_MAX']) / 2
+        for j, base in enumerate([0.0, T_base, 10.0]):
+            np.testing.assert_allclose(cube[i, :len(df), j], (mean - base).clip(lower=0).cumsum())
+
+
+def test_triangle_counts_only_above_base():
+    dates = pd.date_range("2024-01-01", periods=3)
+    frames = {("A", 2024): pd.DataFrame({"date": dates, "T2M": [5.0] * 3,
+                                         "T2M_MIN": [0.0, 6.0, 0.0], "T2M_MAX": [10.0, 10.0, 4.0]})}
+    # 5 より上の三角形 25 / 20、Tmin が基準以上なら平均 - 基準、Tmax が基準以下なら 0
+    np.testing.assert_allclose(GDDEngine(frames).series("A", 2024, 5.0, "triangle"), [1.25, 4.25, 4.25])
+
+
+def test_planes_are_capped_least_recently_used(frames):
+    engine = GDDEngine(frames, max_planes=2)
+    reference = GDDEngine(frames).cube([0.0, 5.0, 10.0])
+    engine.cube([0.0, 5.0])
+    engine.cube([0.0])
+    engine.cube([10.0])
+    assert list(engine.planes) == [("mean", 0.0), ("mean", 10.0)]
+    np.testing.assert_array_equal(engine.cube([0.0, 5.0, 10.0]), reference)
+    assert len(engine.planes) == 2
+
+
+def test_method_needs_min_max(frames):
+    frames = {key: df.drop(columns=['T2M_MIN', 'T2M_MAX']) for key, df in frames.items()}
+    with pytest.raises(ValueError, match="T2M_MIN"):
+        GDDEngine(frames).cube([T_base], "triangle")
+
+
+def test_predict_all_methods(frames):
+    mean = batch_predict.predict_all(frames)
+    # synthetic_frames の Tmin / Tmax は T2M を中心にしているので minmax は mean と同じ日になる
+    pd.testing.assert_frame_equal(batch_predict.predict_all(frames, method="minmax"), mean)
+    # 三角形法は毎日 minmax 以上を積算するので開花は早まることはあっても遅れない
+    triangle = batch_predict.predict_all(frames, method="triangle")
+    assert triangle["bloom_date"].notna().sum() >= mean["bloom_date"].notna().sum()
+    both = mean["bloom_date"].notna()
+    assert (triangle["bloom_date"][both] <= mean["bloom_date"][both]).all()
@@ -0,0 +1,69 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import globe
+
+
+@pytest.mark.parametrize("region, code", [
+    ("Japan_Tokyo", "JPN"),               # precomputed table
+    ("Korea,_Republic_of_Busan", "KOR"),
+    ("Japan_Osaka", "JPN"),               # not in the table: pycountry on the country part
+    ("France_Bretagne", "FRA"),
+    ("Atlantis_Capital", None),
+])
+def test_iso3(region, code):
+    assert globe.iso3(region) == code
+
+
+@pytest.fixture
+def frames():
+    dates = pd.date_range("2024-03-01", periods=5)
+    return {
+        "Japan_Tokyo": pd.DataFrame({"date": dates, "NDVI": [1.0, 2.0, 3.0, 4.0, 5.0]}),
+        # Two regions of one country are averaged; Osaka misses a day and has a NaN
+        "Japan_Osaka": pd.DataFrame({"date": dates[[0, 1, 3, 4]], "NDVI": [3.0, np.nan, 6.0, 7.0]}),
+        "France_Bretagne": pd.DataFrame({"date": dates[2:], "NDVI": [0.5, 0.6, 0.7]}),
+        "Atlantis_Capital": pd.DataFrame({"date": dates, "NDVI": 9.0}),
+    }
+
+
+def per_date_filter(frames, metric="NDVI"):
+    # What globe_json did before frame_table: filter every date, then every country, on the concatenated rows
+    df = pd.concat([f.assign(iso3=globe.iso3(r)) for r, f in frames.items()], ignore_index=True)
+    df = df[df["iso3"].notna()]
+    dates, codes = sorted(df["date"].unique()), sorted(df["iso3"].unique())
+    values = np.full((len(dates), len(codes)), np.nan)
+    for i, d in enumerate(dates):
+        day = df[df["date"] == d]
+        for j, code in enumerate(codes):
+            cell = day.loc[day["iso3"] == code, metric].dropna()
+            if len(cell):
+                values[i, j] = cell.mean()
+    return pd.DatetimeIndex(dates), codes, values
+
+
+@pytest.mark.parametrize("stride", [1, 2])
+def test_frame_table_matches_the_per_date_filter(frames, stride):
+    dates, locations, values = globe.frame_table(frames, stride=stride)
+    ref_dates, ref_locations, ref_values = per_date_filter(frames)
+
+    assert locations == ref_locations == ["FRA", "JPN"]
+    assert list(dates) == list(ref_dates[::stride])
+    np.testing.assert_array_equal(values, ref_values[::stride])
+    assert values[0].tolist()[1] == 2.0 and np.isnan(values[0, 0])
+
+
+def test_figure_dict_frames_carry_only_z(frames):
+    dates, locations, values = globe.frame_table(frames)
+    fig = json.loads(json.dumps(globe.figure_dict(dates, locations, values, title="t")))
+
+    base = fig["data"][0]
+    assert base["locations"] == ["FRA", "JPN"]
+    assert (base["zmin"], base["zmax"]) == (0.5, 6.0)
+    assert base["z"] == [None, 2.0]
+    assert [f["name"] for f in fig["frames"]] == [str(d.date()) for d in dates]
+    assert all(set(f["data"][0]) == {"type", "z"} for f in fig["frames"])
+    assert fig["frames"][-1]["data"][0]["z"] == [0.7, 6.0]
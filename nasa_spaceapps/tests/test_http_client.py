@@ -0,0 +1,58 @@
+import pytest
+import requests
+
+from http_client import CachedClient
+
+POWER = {"start": "20240101", "end": "20240110", "parameters": "T2M"}
+
+
+@pytest.fixture
+def client(tmp_path):
+    client = CachedClient(str(tmp_path / "http_cache"))
+    yield client
+    client.close()
+
+
+def test_ok_and_not_found_are_cached(stub, client):
+    assert client.get_json(stub.url + "/power", POWER)[0] == 200
+    assert client.get_json(stub.url + "/gadm/XXX", ttl=None) == (404, None)
+    assert client.get_json(stub.url + "/power", POWER)[0] == 200
+    assert client.get_json(stub.url + "/gadm/XXX", ttl=None) == (404, None)
+
+    assert (len(stub.calls["power"]), len(stub.calls["gadm"])) == (1, 1)
+    assert client.stats == {"hit": 2, "revalidated": 0, "fetched": 2}
+
+
+def test_stale_entry_is_revalidated(stub, client):
+    _, fresh = client.get_json(stub.url + "/power", POWER)
+    status, body = client.get_json(stub.url + "/power", POWER, ttl=0)
+
+    assert (status, body) == (200, fresh)
+    assert client.stats["revalidated"] == 1
+
+
+def test_forbidden_is_returned_but_not_cached(stub, client):
+    stub.fail["power"] = [403]
+    assert client.get_json(stub.url + "/power", POWER, ttl=None) == (403, None)
+    assert client.get_json(stub.url + "/power", POWER, ttl=None)[0] == 200
+    assert len(stub.calls["power"]) == 2
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_rate_limits_and_server_errors_raise(stub, client, status):
+    stub.fail["power"] = [status]
+    with pytest.raises(requests.HTTPError):
+        client.get_json(stub.url + "/power", POWER, ttl=None)
+    assert client.get_json(stub.url + "/power", POWER, ttl=None)[0] == 200
+
+
+
+def test_concurrent_requests_share_one_fetch_and_drop_their_lock(stub, client):
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(8) as pool:
+        answers = list(pool.map(lambda _: client.get_json(stub.url + "/power", POWER)[1], range(16)))
+
+    assert all(a == answers[0] for a in answers)
+    assert len(stub.calls["power"]) == 1
+    assert client.key_locks == {}
@@ -0,0 +1,86 @@
+import os
+
+import pandas as pd
+
+import ingest
+import store
+from fakes import FakeEE
+
+
+def test_run_saves_one_region_per_country(stub, make_ingestor):
+    ingestor = make_ingestor()
+    result = ingestor.run([("Japan", "JPN"), ("France", "FRA"), ("Chad", "TCD")], workers=3)
+
+    assert result["counts"] == {"saved": 2, "missing": 1}
+    df = store.read_region_year("Japan_Tokyo", 2024, ingestor.store_dir)
+    assert len(df) > 300
+    assert df["GDD_cumsum"].is_monotonic_increasing
+    expected = (df["T2M"] - ingest.T_base).clip(lower=0).cumsum()
+    assert (df["GDD_cumsum"] - expected).abs().max() < 1e-9
+    assert os.path.exists(os.path.join(ingestor.output_dir, "Japan_Tokyo_2024_ndvi_temp.csv"))
+    assert not os.path.exists(store.partition_path("Japan_Osaka", 2024, ingestor.store_dir))
+
+
+def test_all_regions_use_one_ndvi_request_per_country(stub, make_ingestor):
+    ee = FakeEE()
+    ingestor = make_ingestor(ee_module=ee, all_regions=True)
+    result = ingestor.run([("Japan", "JPN")], workers=1)
+
+    assert result["counts"] == {"saved": 1}
+    assert ee.get_info_calls == 1
+    for region in ("Japan_Tokyo", "Japan_Osaka"):
+        assert os.path.exists(store.partition_path(region, 2024, ingestor.store_dir))
+
+
+def test_rerun_skips_finished_countries(stub, make_ingestor):
+    make_ingestor().run([("Japan", "JPN")], workers=1)
+    calls = {kind: len(urls) for kind, urls in stub.calls.items()}
+
+    result = make_ingestor().run([("Japan", "JPN")], workers=1)
+
+    assert result["counts"] == {"skipped": 1}
+    assert {kind: len(urls) for kind, urls in stub.calls.items()} == calls
+
+
+def test_server_errors_are_retried(stub, make_ingestor):
+    stub.fail["power"] = [500, 503]
+    result = make_ingestor(max_attempts=3).run([("Japan", "JPN")], workers=1)
+
+    assert result["counts"] == {"saved": 1}
+    assert len(stub.calls["power"]) == 3
+
+
+def test_failed_stage_is_recorded_not_raised(stub, make_ingestor):
+    stub.fail["power"] = [500] * 5
+    ingestor = make_ingestor(max_attempts=2)
+    result = ingestor.run([("Japan", "JPN")], workers=1)
+
+    assert result["counts"] == {"failed": 1}
+    assert ingestor.manifest.status("Japan", "Tokyo", 2024, "t2m") == "failed"
+    assert ingestor.manifest.status("Japan", "Tokyo", 2024, "ndvi") == "done"
+
+
+def test_ndvi_is_interpolated_daily_between_composites(stub, make_ingestor):
+    ingestor = make_ingestor()
+    ingestor.run([("Japan", "JPN")], workers=1)
+    df = store.read_region_year("Japan_Tokyo", 2024, ingestor.store_dir)
+
+    assert df["date"].diff().dropna().eq(pd.Timedelta(days=1)).all()
+    assert df["NDVI"].between(4000, 6000).all()
+
+
+def test_rate_limited_power_is_retried(stub, make_ingestor):
+    stub.fail["power"] = [429]
+    result = make_ingestor(max_attempts=2).run([("Japan", "JPN")], workers=1)
+
+    assert result["counts"] == {"saved": 1}
+    assert len(stub.calls["power"]) == 2
+
+
+def test_power_error_status_fails_the_stage(stub, make_ingestor):
+    stub.fail["power"] = [403, 403]
+    ingestor = make_ingestor(max_attempts=2)
+    result = ingestor.run([("Japan", "JPN")], workers=1)
+
+    assert result["counts"] == {"failed": 1}
+    assert "NASA POWER returned 403" in ingestor.manifest.jobs(2024).set_index("stage").loc["t2m", "error"]
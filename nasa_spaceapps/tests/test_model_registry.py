@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import forecast
+import model_registry
+import store
+
+PARAMS = {"n_estimators": 5, "max_depth": 3}
+
+
+def season(year):
+    dates = pd.date_range(f"{year}-01-01", f"{year}-12-31")
+    t2m = 15 - 10 * np.cos(2 * np.pi * (dates.dayofyear.to_numpy() - 15) / 365)
+    gdd = np.clip(t2m - 5, 0, None)
+    return pd.DataFrame({"date": dates, "T2M": t2m, "NDVI": 4000 + 100 * t2m, "GDD_daily": gdd,
+                         "GDD_cumsum": gdd.cumsum(), "peak": 0})
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    store_dir, world_dir = str(tmp_path / "store"), str(tmp_path / "world")
+    monkeypatch.setattr(model_registry, "source_path", lambda r, y: store.source_path(r, y, store_dir, world_dir))
+    monkeypatch.setattr(forecast, "read_region_years",
+                        lambda r, years: store.read_region_years(r, years, store_dir, world_dir))
+    for year in (2022, 2023):
+        store.write_region_year(season(year), "Japan_Tokyo", year, store_dir)
+    return str(tmp_path / "registry"), store_dir
+
+
+def test_years_without_data_do_not_refit(registry):
+    registry_dir, _ = registry
+    assert model_registry.train(["Japan_Tokyo"], (2022, 2023), PARAMS, registry_dir=registry_dir) == (["Japan_Tokyo"], [])
+    assert model_registry.train(["Japan_Tokyo"], range(2015, 2025), PARAMS, registry_dir=registry_dir) == ([], ["Japan_Tokyo"])
+    assert model_registry.load("Japan_Tokyo", forecast.TRAIN_YEARS, PARAMS, registry_dir) is not None
+
+
+def test_new_data_invalidates_the_entry(registry):
+    registry_dir, store_dir = registry
+    model_registry.train(["Japan_Tokyo"], forecast.TRAIN_YEARS, PARAMS, registry_dir=registry_dir)
+    store.write_region_year(season(2024), "Japan_Tokyo", 2024, store_dir)
+
+    assert model_registry.load("Japan_Tokyo", forecast.TRAIN_YEARS, PARAMS, registry_dir) is None
+    assert model_registry.train(["Japan_Tokyo"], forecast.TRAIN_YEARS, PARAMS, registry_dir=registry_dir)[0] == ["Japan_Tokyo"]
+    entry = model_registry.load_manifest(f"{registry_dir}/manifest.json")["Japan_Tokyo/rf_n5_d3"]
+    assert (entry["version"], entry["years"]) == (2, [2022, 2023, 2024])
+
+
+def test_apps_use_the_registered_params():
+    assert model_registry.DEFAULT_PARAMS == forecast.FOREST_PARAMS
+    assert forecast.WORLD_FOREST_PARAMS in model_registry.PARAM_SETS
+
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.signal import find_peaks
+
+from phenology import (PEAK_HEIGHT, PEAK_PROMINENCE, local_peaks, loop_sos, peak_flags, phenology_table,
+                       season_metrics, synthetic_series, to_ndvi)
+
+
+@pytest.mark.parametrize("n", [3, 5, 17, 100])
+@pytest.mark.parametrize("prominence", [None, 0, 1, 3])
+def test_local_peaks_match_find_peaks(n, prominence):
+    # 小さな整数で平らな頂上や同じ高さの山を多く作り、NaN も混ぜる
+    rng = np.random.default_rng(n)
+    x = rng.integers(0, 6, (300, n)).astype(float)
+    x[rng.random(x.shape) < 0.05] = np.nan
+    flags = local_peaks(x, 1, prominence)
+    for row, got in zip(x, flags):
+        peaks, _ = find_peaks(row, height=1, prominence=prominence)
+        assert np.flatnonzero(got).tolist() == peaks.tolist()
+
+
+def test_noise_peaks_are_not_flagged():
+    ndvi = to_ndvi(synthetic_series(500), "raw")
+    flags = local_peaks(ndvi, PEAK_HEIGHT, PEAK_PROMINENCE)
+    # 一つの季節に一つの山：ノイズの極大はほぼすべて落ちる
+    assert flags.sum(axis=1).mean() < 1.05
+    # 欠損の隣は find_peaks と同じく山にならないので、欠損のない系列で確かめる
+    tall = (np.nanmax(ndvi, axis=1) >= PEAK_HEIGHT + 0.05) & ~np.isnan(ndvi).any(axis=1)
+    assert (flags[tall].sum(axis=1) >= 1).all()
+    assert local_peaks(ndvi, PEAK_HEIGHT).sum(axis=1).mean() > 10
+
+
+def test_season_start_matches_the_day_by_day_reference():
+    ndvi = to_ndvi(synthetic_series(300), "raw")
+    ndvi[0] = np.nan
+    expected = [loop_sos(series) for series in ndvi]
+    assert season_metrics(ndvi)["sos"].tolist() == expected
+    assert expected[0] == -1
+
+
+def test_peak_flags_and_table_use_the_same_rule():
+    dates = pd.date_range("2024-01-01", periods=366)
+    raw = synthetic_series(1)[0]
+    table = phenology_table({("A", 2024): pd.DataFrame({"date": dates, "NDVI": raw})})
+    assert table["n_peaks"].iloc[0] == peak_flags(raw).sum()
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+
+from raster_ndvi import FILL, RasterNDVI, naive_means
+
+# MODIS sinusoidal grid: tile hXXvYY starts at (-20015109 + XX * TILE, 10007554 - YY * TILE)
+SINUSOIDAL = "+proj=sinu +lon_0=0 +x_0=0 +y_0=0 +R=6371007.181 +units=m +no_defs"
+TILE = 1111950.5197665554
+PIXELS = 120
+
+
+@pytest.fixture(scope="module")
+def tiles_dir(tmp_path_factory):
+    out = tmp_path_factory.mktemp("tiles")
+    rng = np.random.default_rng(0)
+    for h, v in ((28, 5), (29, 5)):
+        transform = from_origin(-20015109.354 + h * TILE, 10007554.677 - v * TILE, TILE / PIXELS, TILE / PIXELS)
+        base = rng.integers(-500, 500, (PIXELS, PIXELS))
+        for i in range(4):
+            data = (3000 + 150 * i + base).astype(np.int16)
+            data[rng.random(data.shape) < 0.05] = FILL
+            name = f"MOD13Q1.A2024{1 + 16 * i:03d}.h{h:02d}v{v:02d}.061.2024000000000.tif"
+            with rasterio.open(out / name, "w", driver="GTiff", height=PIXELS, width=PIXELS, count=1,
+                               dtype="int16", crs=SINUSOIDAL, transform=transform, nodata=FILL) as dst:
+                dst.write(data, 1)
+    return str(out)
+
+
+def region(name, lon0, lat0, lon1, lat1):
+    ring = [[lon0, lat0], [lon1, lat0], [lon1, lat1], [lon0, lat1], [lon0, lat0]]
+    return {"type": "Feature", "properties": {"NAME_1": name}, "geometry": {"type": "Polygon", "coordinates": [ring]}}
+
+
+FEATURES = [
+    region("Inside", 125.0, 34.0, 126.5, 35.5),     # h28v05 only
+    region("Straddling", 133.0, 35.0, 136.0, 36.0),  # across the h28 / h29 edge at ~134.3E
+    region("Elsewhere", 0.0, 45.0, 1.0, 46.0),      # no tile: NaN
+]
+
+
+def test_region_means_match_the_per_composite_reference(tiles_dir, tmp_path):
+    expected = naive_means(tiles_dir, FEATURES, 2024)
+    backend = RasterNDVI(tiles_dir, str(tmp_path / "cache"))
+    cold = backend.region_means(FEATURES, 2024)
+    backend.stacks.clear()
+    warm = backend.region_means(FEATURES, 2024)  # stacks and masks from the cache
+
+    for got in (cold, warm):
+        merged = expected.merge(got, on=["NAME_1", "date"], how="outer", suffixes=("_naive", ""))
+        assert len(merged) == len(FEATURES) * 4
+        np.testing.assert_allclose(merged["NDVI"], merged["NDVI_naive"], rtol=1e-12, equal_nan=True)
+    means = cold.groupby("NAME_1")["NDVI"].mean()
+    assert means[["Inside", "Straddling"]].between(3000, 3500).all() and np.isnan(means["Elsewhere"])
+
+
+def test_missing_year_raises(tiles_dir, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        RasterNDVI(tiles_dir, str(tmp_path / "cache")).region_means(FEATURES, 2023)
@@ -0,0 +1,91 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+import bloom_index
+import model_registry
+import store
+from fakes import FakeEE
+from ingest import extend_merged, interpolate_daily, merge_ndvi_t2m
+
+
+def test_extend_merged_matches_a_full_rebuild_on_random_truncations():
+    rng = np.random.default_rng(1)
+    dates = pd.date_range("2024-01-01", "2024-12-31", freq="16D")
+    days = pd.date_range("2024-01-01", "2024-12-31")
+    for _ in range(200):
+        composites = pd.DataFrame({"date": dates, "NDVI": rng.uniform(3000, 7000, len(dates))})
+        t2m = pd.DataFrame({"date": days, "T2M": rng.normal(12, 8, len(days))})
+        nc, nt = rng.integers(3, len(dates)), rng.integers(30, len(days))
+        nc2, nt2 = rng.integers(nc, len(dates) + 1), rng.integers(nt, len(days) + 1)
+        old = merge_ndvi_t2m(interpolate_daily(composites.iloc[:nc]), t2m.iloc[:nt])
+        full = merge_ndvi_t2m(interpolate_daily(composites.iloc[:nc2]), t2m.iloc[:nt2])
+
+        end = old["date"].iloc[-1]
+        recent, new_days = composites.iloc[:nc2], t2m.iloc[:nt2]
+        recent = recent[recent["date"] >= end - pd.Timedelta(days=32)]
+        extended, _ = extend_merged(old, recent, new_days[new_days["date"] > end])
+
+        assert extended["date"].tolist() == full["date"].tolist()
+        np.testing.assert_allclose(extended[["NDVI", "GDD_cumsum"]], full[["NDVI", "GDD_cumsum"]])
+        assert extended["peak"].tolist() == full["peak"].tolist()
+
+
+def test_extend_merged_replaces_stale_peak_flags():
+    dates = pd.date_range("2024-01-01", "2024-12-31", freq="16D")
+    days = pd.date_range("2024-01-01", "2024-12-31")
+    composites = pd.DataFrame({"date": dates, "NDVI": 4000 + 2000 * np.sin(np.pi * np.arange(len(dates)) / len(dates))})
+    t2m = pd.DataFrame({"date": days, "T2M": 12.0})
+    old = merge_ndvi_t2m(interpolate_daily(composites.iloc[:20]), t2m)
+    old["peak"] = 1  # 以前の規則で立てたフラグ
+    extended, _ = extend_merged(old, composites.iloc[19:], t2m[t2m["date"] > old["date"].iloc[-1]])
+    full = merge_ndvi_t2m(interpolate_daily(composites), t2m)
+    assert extended["peak"].tolist() == full["peak"].tolist()
+    assert extended["peak"].sum() == 1
+
+
+def test_refresh_extends_partitions_like_a_full_run(stub, make_ingestor, tmp_path):
+    stub.last_day = datetime.date(2024, 6, 10)
+    make_ingestor(ee_module=FakeEE(until=datetime.date(2024, 6, 1))).run([("Japan", "JPN")], workers=1)
+    before = store.read_region_year("Japan_Tokyo", 2024, str(tmp_path / "store"))
+
+    stub.last_day = None
+    result = make_ingestor().refresh([("Japan", "JPN"), ("France", "FRA")], workers=1)
+    (tmp_path / "full").mkdir()
+    make_ingestor(root=tmp_path / "full").run([("Japan", "JPN")], workers=1)
+
+    assert result["counts"] == {"updated": 1, "missing": 1}
+    refreshed = store.read_region_year("Japan_Tokyo", 2024, str(tmp_path / "store"))
+    full = store.read_region_year("Japan_Tokyo", 2024, str(tmp_path / "full" / "store"))
+    assert len(refreshed) > len(before)
+    pd.testing.assert_frame_equal(refreshed, full)
+
+
+def test_refresh_rebuilds_the_index_and_refits_registered_models(stub, make_ingestor, tmp_path, monkeypatch):
+    stub.last_day = datetime.date(2024, 6, 10)
+    make_ingestor(ee_module=FakeEE(until=datetime.date(2024, 6, 1))).run([("Japan", "JPN")], workers=1)
+    # The Ingestor writes the app's store, so the derived files are the app's too
+    monkeypatch.setattr(store, "STORE_DIR", str(tmp_path / "store"))
+    monkeypatch.setattr(bloom_index, "INDEX_PATH", str(tmp_path / "bloom_index.npz"))
+    monkeypatch.setattr(model_registry, "load_manifest", lambda: {"Japan_Tokyo/rf_n50_d5": {}})
+    trained = []
+    monkeypatch.setattr(model_registry, "train", lambda regions, params: (
+        trained.extend((r, model_registry.model_id(params)) for r in regions) or regions, []))
+
+    stub.last_day = None
+    make_ingestor().refresh([("Japan", "JPN")], workers=1)
+
+    index = bloom_index.BloomIndex.load(str(tmp_path / "bloom_index.npz"))
+    df = store.read_region_year("Japan_Tokyo", 2024, str(tmp_path / "store"))
+    assert index.keys == [("Japan_Tokyo", 2024)]
+    assert index.query("Japan_Tokyo", 2024, "2024-09-01", 100, 0.0) == \
+        bloom_index.scan_bloom_date(df, "2024-09-01", 100, 0.0)
+    # 登録済みのパラメータだけ学習し直す
+    assert trained == [("Japan_Tokyo", "rf_n50_d5")]
+
+
+def test_refresh_of_another_store_leaves_the_app_files_alone(stub, make_ingestor, tmp_path, monkeypatch):
+    make_ingestor(ee_module=FakeEE(until=datetime.date(2024, 6, 1))).run([("Japan", "JPN")], workers=1)
+    monkeypatch.setattr(bloom_index, "build_index", lambda *args: (_ for _ in ()).throw(AssertionError("rebuilt")))
+    make_ingestor().refresh([("Japan", "JPN")], workers=1)
@@ -0,0 +1,53 @@
+"""Cold-start import budget of the Streamlit apps on the threshold path.
+
+Each app is run once through streamlit's AppTest in a fresh interpreter with
+`-X importtime`; streamlit and the harness are imported before a marker, so
+what is logged after it is what the app itself pulls in.
+"""
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_MS = 2000  # imports triggered by the first threshold-path render
+# Libraries that only the forecast / map / globe paths need
+DEFERRED = ("sklearn", "scipy", "plotly", "geopandas", "pycountry", "joblib")
+MARKER = "--- app start ---"
+
+CHILD = f"""
+import sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({{script!r}}, default_timeout=120)
+sys.stderr.write({MARKER!r} + "\\n")
+sys.stderr.flush()
+at.run()
+if at.exception:
+    raise SystemExit(str(at.exception[0].value))
+"""
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure(script):
+    """[(module, cumulative_us, depth)] for the imports of one cold run of `script`."""
+    code = CHILD.format(script=os.path.join(APP_DIR, script))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=APP_DIR, capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stderr.splitlines()[-1] if result.stderr else "app run failed"
+    _, _, log = result.stderr.partition(MARKER)
+    return [(m.group(4), int(m.group(2)), len(m.group(3)) // 2) for m in map(LINE.match, log.splitlines()) if m]
+
+
+@pytest.mark.parametrize("script", ["flower_predict_app.py", "earth_flower_predict.py"])
+def test_threshold_path_imports_fit_the_budget(script):
+    imports = measure(script)
+    top = sorted(((name, us) for name, us, depth in imports if depth == 0), key=lambda x: -x[1])
+    total_ms = sum(us for _, us in top) / 1000
+    leaked = sorted({name.split(".")[0] for name, _, _ in imports} & set(DEFERRED))
+
+    assert not leaked, f"deferred modules imported at startup: {', '.join(leaked)}"
+    slowest = ", ".join(f"{name} {us / 1000:.0f} ms" for name, us in top[:5])
+    assert total_ms <= BUDGET_MS, f"{total_ms:.0f} ms of imports (budget {BUDGET_MS} ms): {slowest}"
@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+import store
+
+
+def frame(days=5):
+    dates = pd.date_range("2024-03-01", periods=days)
+    return pd.DataFrame({
+        "date": dates.astype(str), "T2M": 10.0, "NDVI": 4000.0, "GDD_daily": 5.0,
+        "GDD_cumsum": [5.0 * (i + 1) for i in range(days)], "peak": 0,
+    })
+
+
+def test_partition_round_trip_keeps_schema(tmp_path):
+    store.write_region_year(frame(), "Japan_Tokyo", 2024, str(tmp_path))
+    df = store.read_region_year("Japan_Tokyo", 2024, str(tmp_path), str(tmp_path / "world"))
+
+    assert list(df.columns) == list(store.COLUMNS)
+    assert df["date"].dtype == "datetime64[ns]"
+    assert df["peak"].dtype == "int8"
+    assert store.list_partitions(str(tmp_path)) == [("Japan_Tokyo", 2024)]
+
+
+def test_optional_temperature_columns_are_kept_only_when_present(tmp_path):
+    store.write_region_year(frame().assign(T2M_MIN=6.0, T2M_MAX=14.0), "A", 2024, str(tmp_path))
+    store.write_region_year(frame().assign(extra=1), "B", 2024, str(tmp_path))
+
+    assert {"T2M_MIN", "T2M_MAX"} <= set(store.read_region_year("A", 2024, str(tmp_path)).columns)
+    assert list(store.read_region_year("B", 2024, str(tmp_path)).columns) == list(store.COLUMNS)
+
+
+def test_legacy_csv_is_read_when_no_partition(tmp_path):
+    world = tmp_path / "world"
+    world.mkdir()
+    frame().to_csv(world / "France_Bretagne_2023_ndvi_temp.csv", index=False)
+
+    df = store.read_region_year("France_Bretagne", 2023, str(tmp_path / "store"), str(world))
+    assert len(df) == 5
+    assert store.list_region_years(str(tmp_path / "store"), str(world)) == [("France_Bretagne", 2023)]
+    with pytest.raises(FileNotFoundError):
+        store.read_region_year("France_Bretagne", 2022, str(tmp_path / "store"), str(world))
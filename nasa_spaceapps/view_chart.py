@@ -0,0 +1,43 @@
+import matplotlib.pyplot as plt
+import streamlit as st
+
+
+def bloom_chart(plot_values, ndvi_col, pred_date):
+    """NDVI curve (plus cumulative GDD for observed years) with the bloom day marked."""
+    fig, ax = plt.subplots(figsize=(10,4))
+
+    # NDVI と GDD のプロット
+    if ndvi_col == 'NDVI':
+        ax.plot(plot_values['date'], plot_values['NDVI'], label="NDVI", color='green')
+        ax.plot(plot_values['date'], plot_values['GDD_cumsum'], label="Cumulative GDD", color='orange')
+        plot_label = "NDVI"
+    else:
+        ax.plot(plot_values['date'], plot_values['NDVI_pred'], label="Predicted NDVI", color='green')
+        plot_label = "Predicted NDVI"
+
+    # 開花日の強調表示
+    if pred_date is not None:
+        bloom_ndvi = plot_values.loc[plot_values['date']==pred_date, ndvi_col].values
+        if len(bloom_ndvi) == 0:
+            bloom_ndvi = plot_values[ndvi_col].iloc[0]
+        else:
+            bloom_ndvi = bloom_ndvi[0]
+
+        # 縦線
+        ax.axvline(pred_date, color='red', linestyle='--', alpha=0.8)
+        # マーカー
+        ax.scatter(pred_date, bloom_ndvi, color='red', s=150, zorder=5, marker='*')
+        # 注釈
+        ax.annotate(f"Bloom Day:\n{pred_date.date()}",
+                    xy=(pred_date, bloom_ndvi),
+                    xytext=(10, 30),
+                    textcoords='offset points',
+                    arrowprops=dict(facecolor='red', arrowstyle='->'),
+                    fontsize=12, color='red', fontweight='bold')
+
+    ax.set_xlabel("Date")
+    ax.set_ylabel(plot_label)
+    ax.legend()
+    ax.grid(alpha=0.3)
+    st.pyplot(fig)
+    plt.close(fig)
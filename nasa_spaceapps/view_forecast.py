@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from app_cache import load_training_frame, model_forecast
+from forecast import FOREST_PARAMS, TRAIN_YEARS
+from phenology import local_peaks, series_metrics
+from view_threshold import season_caption
+
+
+def forecast_view(country, year, start_date, plant_choice, forest_params=FOREST_PARAMS):
+    """Bloom date from a forecast NDVI curve (years without data). Returns (future_df, pred_date)."""
+    # Model-based prediction method
+    train_years = TRAIN_YEARS
+    try:
+        load_training_frame(country, train_years)
+    except FileNotFoundError:
+        st.error(f"No training data found for {country}")
+        st.stop()
+
+    forecast_models = {
+        "Random Forest": ("forest", forest_params),
+        "Harmonic regression (fast)": ("harmonic", {}),
+    }
+    model_choice = st.selectbox("Forecast Model", list(forecast_models.keys()))
+    kind, params = forecast_models[model_choice]
+
+    # Train model and generate future data (reused across reruns for the same region/years/model)
+    future_df = model_forecast(country, train_years, year, kind, **params)
+    future_df = future_df[future_df['date']>=pd.to_datetime(start_date)]
+
+    # Detect peak
+    peaks = np.flatnonzero(local_peaks(future_df['NDVI_pred'].to_numpy(), height=np.percentile(future_df['NDVI_pred'],90)))
+    if len(peaks) > 0:
+        pred_date = future_df.iloc[peaks[0]]['date']
+        st.success(f"✅ Predicted Bloom Date for {country} {year} ({plant_choice}): {pred_date.date()}")
+    else:
+        pred_date = None
+        st.warning(f"⚠️ No bloom predicted for this period for {country}.")
+    season_caption(series_metrics(future_df['date'], future_df['NDVI_pred']))
+    return future_df, pred_date
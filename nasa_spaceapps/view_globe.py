@@ -0,0 +1,20 @@
+import plotly.io as pio
+import streamlit as st
+
+from app_cache import globe_figure_json
+from view_maps import show_animation
+
+
+def globe_view(region, year):
+    """Orthographic NDVI globe animation over all regions plus the cumulative GDD map for an observed year."""
+    # Serialized once per year and data version; only the plotly object is rebuilt on a rerun
+    try:
+        fig = pio.from_json(globe_figure_json(year, "NDVI"))
+    except FileNotFoundError as e:
+        st.error(str(e))
+        return
+    st.plotly_chart(fig, use_container_width=True)
+
+    # --- GDD animation ---
+    if st.button("Show GDD Animation"):
+        show_animation(region, year, "GDD_cumsum", stride=3)
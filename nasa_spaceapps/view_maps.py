@@ -0,0 +1,27 @@
+import streamlit as st
+
+from app_cache import map_animation
+
+
+def show_animation(region, year, metric, **frames):
+    # Cached GIF per (region, year, metric); geopandas is only imported on the first render
+    try:
+        gif = map_animation(region, year, metric, **frames)
+    except FileNotFoundError as e:
+        st.error(str(e))
+        return
+    if gif is None:
+        st.warning(f"⚠️ No {metric} data to animate for {region} {year} from the selected start date.")
+    else:
+        st.image(gif)
+
+
+def map_animations(region, year, start_date):
+    """NDVI / cumulative GDD animations of the observed series up to its first peak."""
+    # --- ボタンでアニメーション表示 ---
+    if st.button("Show NDVI Animation"):
+        show_animation(region, year, "NDVI", start_date=start_date, until_peak=True)
+
+    # --- GDD アニメーション ---
+    if st.button("Show GDD Animation"):
+        show_animation(region, year, "GDD_cumsum", start_date=start_date, until_peak=True)
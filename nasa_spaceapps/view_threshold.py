@@ -0,0 +1,62 @@
+import pandas as pd
+import streamlit as st
+
+from app_cache import bloom_league_table, load_region_year, threshold_bloom_date, with_base
+from gdd import METHODS, T_base
+from phenology import series_metrics
+
+
+def season_caption(metrics):
+    """One line with start / peak / end of season and amplitude (phenology.series_metrics)."""
+    if metrics is not None:
+        st.caption(
+            f"🌿 Season: start {metrics['sos'].date()} · peak {metrics['peak'].date()} "
+            f"(NDVI {metrics['peak_ndvi']:.2f}) · end {metrics['eos'].date()} · amplitude {metrics['amplitude']:.2f}"
+        )
+
+
+def threshold_view(country, year, start_date, plant_choice, gdd_threshold, ndvi_slope_threshold, t_base=T_base):
+    """Bloom date from stored NDVI/GDD (years with data), GDD counted from `t_base`. Returns (df, pred_date).
+
+    Region-years ingested with daily min / max temperatures also offer the
+    min/max and triangle GDD methods.
+    """
+    # --- Load data ---
+    try:
+        df = load_region_year(country, year)
+    except FileNotFoundError:
+        st.error(f"Data not found: {country} {year}")
+        st.stop()
+
+    df['date'] = pd.to_datetime(df['date'])
+    season = series_metrics(df['date'], df['NDVI'], units="raw")
+    method = "mean"
+    if set(METHODS["triangle"]) <= set(df.columns):
+        method = st.selectbox("GDD Method", list(METHODS))
+    df = with_base(df, country, year, t_base, method)
+    df = df[df['date'] >= pd.to_datetime(start_date)]
+    # Threshold-based method (answered from the precomputed bloom index at the stored base)
+    pred_date = threshold_bloom_date(country, year, start_date, gdd_threshold, ndvi_slope_threshold, t_base, method)
+    if pred_date is not None:
+        st.markdown(f"""
+        <div style="
+            background-color: rgba(255, 255, 255, 0.85);
+            border-left: 8px solid #2e8b57;
+            padding: 16px;
+            border-radius: 12px;
+            font-size: 18px;
+            color: #1b4332;
+            font-weight: 600;
+            box-shadow: 2px 2px 8px rgba(0,0,0,0.1);
+            margin-top: 15px;
+        ">
+        🌸 <b>Estimated Bloom Date</b> for <span style="color:#2d6a4f;">{country}</span> ({plant_choice}) :  
+        <span style="color:#d9480f; font-size:20px;">{pred_date.date()}</span>
+        </div>
+        """, unsafe_allow_html=True)
+    else:
+        st.warning(f"⚠️ No bloom predicted for this period for {country}.")
+    season_caption(season)
+    if st.checkbox(f"Show {plant_choice} bloom dates for all regions ({year})"):
+        st.dataframe(bloom_league_table(year, start_date, gdd_threshold, ndvi_slope_threshold, t_base, method))
+    return df, pred_date
@@ -1,59 +1,204 @@
-import serial
+import os
+import queue
+import re
 import smtplib
+import threading
+import time
+from collections import deque
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-import re
 
+import numpy as np
+import serial
+
+from serial_buffer import ReadingLog, RingBuffer, capacity_for, sustained_near
 
-sender_email = "tanabetest1230@gmail.com"
-receiver_email = "yukiko202201@gmail.com"
-password = "cvztowvbvyirjbwp"  
 
+# 認証情報はコードに書かず環境変数から読む
+sender_email = os.environ.get("NOTIFY_SENDER", "")
+receiver_email = os.environ.get("NOTIFY_RECEIVER", "")
+password = os.environ.get("NOTIFY_PASSWORD", "")
 
-serial_port = 'COM5'  
+# ローカルのSMTPスタブでも試せるように差し替え可能
+smtp_host = os.environ.get("NOTIFY_SMTP_HOST", "smtp.gmail.com")
+smtp_port = int(os.environ.get("NOTIFY_SMTP_PORT", "465"))
+smtp_ssl = os.environ.get("NOTIFY_SMTP_SSL", "1") == "1"
+
+serial_port = os.environ.get("NOTIFY_SERIAL_PORT", 'COM5')
 baud_rate = 9600
 
-def send_email():
-    
+alert_distance_cm = 6
+# 1回のノイズでは鳴らさない：直近 window_s 秒の中央値が閾値以内（min_samples 件以上）で接近とみなす
+window_s = 3.0
+min_samples = 3
+debounce_s = 60  # 接近が続いている間はこの間隔より頻繁に送らない
+max_per_hour = 10  # 1時間あたりの送信上限
+
+DISTANCE = re.compile(r'(\d+)\s*cm')
+
+
+def extract_distance(data):
+    match = DISTANCE.search(data)
+    if match:
+        return int(match.group(1))
+    return None
+
+
+class Mailer:
+    """One SMTP connection kept open across alerts; reconnects when the server has dropped it."""
+
+    def __init__(self, host=smtp_host, port=smtp_port, use_ssl=smtp_ssl, user=sender_email, password=password):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.user = user
+        self.password = password
+        self.server = None
+
+    def connect(self):
+        smtp = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        server = smtp(self.host, self.port, timeout=30)
+        if self.password:
+            try:
+                server.login(self.user, self.password)
+            except smtplib.SMTPException:
+                server.close()
+                raise
+        self.server = server
+
+    def send(self, message):
+        for attempt in range(2):
+            try:
+                if self.server is None:
+                    self.connect()
+                self.server.sendmail(message["From"], message["To"], message.as_string())
+                return
+            except OSError as e:
+                # SMTPException も OSError の一種：認証や宛先の拒否は繋ぎ直しても同じなのでそのまま上げる
+                if isinstance(e, smtplib.SMTPException) and not isinstance(e, smtplib.SMTPServerDisconnected):
+                    raise
+                # アイドル中に切断されていたら1回だけ繋ぎ直す
+                self.server = None
+                if attempt == 1:
+                    raise
+
+    def close(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.server = None
+
+
+def build_message(distance, suppressed=0):
     message = MIMEMultipart()
     message["From"] = sender_email
     message["To"] = receiver_email
     message["Subject"] = "6cm以内の通知"
 
-    
-    body = "窓に注意！"
+    body = f"窓に注意！（{distance} cm）"
+    if suppressed:
+        body += f"\n前回の通知以降、接近中の読み取りが {suppressed} 件ありました"
     message.attach(MIMEText(body, "plain"))
+    return message
+
+
+class AlertDispatcher(threading.Thread):
+    """Takes (time, distance) readings off a queue and sends debounced, rate-limited alerts.
+
+    Runs beside the serial reader, so a slow SMTP server never delays reads.
+    Every reading goes into a ring buffer (and the append-only log when given);
+    an alert needs sustained proximity over the last `window` seconds.
+    """
+
+    def __init__(self, readings, mailer, debounce=debounce_s, per_hour=max_per_hour, clock=time.monotonic,
+                 window=window_s, log=None):
+        super().__init__(daemon=True)
+        self.readings = readings
+        self.mailer = mailer
+        self.window = window
+        self.buffer = RingBuffer(capacity_for(days=1))
+        self.log = log
+        self.debounce = debounce
+        self.per_hour = per_hour
+        self.clock = clock
+        self.sent = deque()
+        self.suppressed = 0
+        self.last_alert = None
+
+    def should_send(self, now):
+        while self.sent and now - self.sent[0] >= 3600:
+            self.sent.popleft()
+        if self.last_alert is not None and now - self.last_alert < self.debounce:
+            return False
+        return len(self.sent) < self.per_hour
+
+    def handle(self, now, distance):
+        self.buffer.append(now, distance)
+        if self.log is not None:
+            self.log.append(serial_port, time.time(), distance)
+        recent = self.buffer.recent(self.window, now)
+        if not sustained_near(recent, alert_distance_cm, min_samples):
+            return
+        if not self.should_send(now):
+            self.suppressed += 1
+            return
+        try:
+            # 1回の値ではなく直近の中央値を知らせる
+            self.mailer.send(build_message(int(np.median(recent)), self.suppressed))
+            print("メールが送信されました")
+        except Exception as e:
+            # 送れなかった通知は数えない：次の読み取りでまた送る
+            print(f"エラーが発生しました: {e}")
+            return
+        self.last_alert = now
+        self.sent.append(now)
+        self.suppressed = 0
 
-    
+    def run(self):
+        while True:
+            item = self.readings.get()
+            if item is None:
+                break
+            self.handle(*item)
+        self.mailer.close()
+        if self.log is not None:
+            self.log.close()
+
+
+def read_serial(ser, readings, stop=None):
+    """Blocking readline (with the port's timeout) instead of polling in_waiting; feeds the queue."""
+    while stop is None or not stop.is_set():
+        line = ser.readline()
+        if not line:
+            continue  # タイムアウト：何も届いていない
+        data = line.decode('utf-8', errors='replace').rstrip()
+        print("Received data:", data)
+        distance = extract_distance(data)
+        if distance is not None:
+            readings.put((time.monotonic(), distance))
+
+
+if __name__ == "__main__":
+    if not sender_email or not receiver_email:
+        raise SystemExit("NOTIFY_SENDER と NOTIFY_RECEIVER を設定してください")
+    readings = queue.Queue()
+    dispatcher = AlertDispatcher(readings, Mailer(), log=ReadingLog("readings"))
+    dispatcher.start()
+    ser = None
     try:
-        server = smtplib.SMTP_SSL("smtp.gmail.com", 465)  
-        server.login(sender_email, password)
-        text = message.as_string()
-        server.sendmail(sender_email, receiver_email, text)
-        print("メールが送信されました")
+        ser = serial.Serial(serial_port, baud_rate, timeout=1)
+        print(f"{serial_port}に接続しました")
+        read_serial(ser, readings)
+    except serial.SerialException as e:
+        print(f"シリアルポートのエラー: {e}")
+    except KeyboardInterrupt:
+        pass
     except Exception as e:
-        print(f"エラーが発生しました: {e}")
+        print(f"予期しないエラーが発生しました: {e}")
     finally:
-        server.quit()
-def extract_distance(data):
-    match = re.search(r'(\d+)\s*cm', data)
-    if match:
-        return int(match.group(1))
-    return None
-try:
-    ser = serial.Serial(serial_port, baud_rate)
-    print(f"{serial_port}に接続しました")
-    while True:
-        if ser.in_waiting > 0:
-            data = ser.readline().decode('utf-8').rstrip()
-            print("Received data:", data)
-            distance = extract_distance(data)
-            if distance is not None and 0 <= distance <= 6:
-                send_email()
-except serial.SerialException as e:
-    print(f"シリアルポートのエラー: {e}")
-except Exception as e:
-    print(f"予期しないエラーが発生しました: {e}")
-finally:
-    if ser.is_open:
-        ser.close()
+        if ser is not None and ser.is_open:
+            ser.close()
+        readings.put(None)
+        dispatcher.join()
@@ -0,0 +1,190 @@
+import argparse
+import atexit
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# メモリ上の1サンプル: 先頭からの経過時間（10ms単位、約497日まで）と距離 cm → 6バイト
+SAMPLE = np.dtype([("time", "<u4"), ("distance", "<u2")])
+# ログの1レコード: センサー番号、UNIX時刻、距離 → 12バイト
+RECORD = np.dtype([("device", "<u2"), ("time", "<f8"), ("distance", "<u2")])
+TICK = 0.01
+
+
+def capacity_for(days, hz=2.0):
+    """Samples needed to keep `days` of one sensor at `hz` readings per second."""
+    return int(days * 86400 * hz)
+
+
+class RingBuffer:
+    """Fixed-size (time, distance) history of one sensor in a NumPy array; the oldest samples are overwritten."""
+
+    def __init__(self, capacity):
+        self.data = np.zeros(capacity, SAMPLE)
+        self.head = 0
+        self.count = 0
+        self.t0 = None
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+    def append(self, t, distance):
+        if self.t0 is None:
+            self.t0 = t
+        self.data[self.head] = (round((t - self.t0) / TICK), min(distance, 0xFFFF))
+        self.head = (self.head + 1) % len(self.data)
+        self.count = min(self.count + 1, len(self.data))
+
+    def ordered(self):
+        """All stored samples, oldest first (a copy only when the buffer has wrapped)."""
+        if self.count < len(self.data):
+            return self.data[:self.count]
+        return np.concatenate([self.data[self.head:], self.data[:self.head]])
+
+    def recent(self, seconds, now):
+        """Distances of the samples in the last `seconds` before `now`, oldest first."""
+        if not self.count:
+            return np.empty(0, np.uint16)
+        cutoff = max(0, round((now - seconds - self.t0) / TICK))
+        if self.count < len(self.data):
+            stored = self.data[:self.count]
+            return stored["distance"][np.searchsorted(stored["time"], cutoff):]
+        # 一周後は data[head:] が古い側、data[:head] が新しい側
+        newest, older = self.data[:self.head], self.data[self.head:]
+        start = np.searchsorted(newest["time"], cutoff)
+        if start > 0:
+            return newest["distance"][start:]
+        return np.concatenate([older["distance"][np.searchsorted(older["time"], cutoff):], newest["distance"]])
+
+    def rolling(self, n, stat=np.median):
+        """`stat` over every run of `n` consecutive samples (oldest first), vectorized."""
+        distances = self.ordered()["distance"]
+        if len(distances) < n:
+            return np.empty(0)
+        return stat(np.lib.stride_tricks.sliding_window_view(distances, n), axis=1)
+
+
+def sustained_near(recent, threshold, min_samples):
+    """Close for a while, not for one noisy echo: the median of the window is within the threshold."""
+    return len(recent) >= min_samples and np.median(recent) <= threshold
+
+
+def sustained_clear(recent, threshold):
+    """Every reading in the window is beyond the threshold."""
+    return len(recent) > 0 and recent.min() > threshold
+
+
+class ReadingLog:
+    """Append-only binary log of every reading: 12-byte records, one file per UTC day.
+
+    Sensor names get a small integer id, kept in devices.json next to the files.
+    Records are buffered and written once `flush_every` are pending or the
+    oldest is `flush_s` seconds old, and on close() or interpreter exit; a
+    hard crash loses at most that window.
+    """
+
+    def __init__(self, log_dir, flush_every=512, flush_s=5.0, clock=time.monotonic):
+        self.log_dir = log_dir
+        self.flush_every = flush_every
+        self.flush_s = flush_s
+        self.clock = clock
+        os.makedirs(log_dir, exist_ok=True)
+        self.devices_path = os.path.join(log_dir, "devices.json")
+        self.ids = {}
+        if os.path.exists(self.devices_path):
+            with open(self.devices_path, encoding="utf-8") as f:
+                self.ids = {name: i for i, name in enumerate(json.load(f))}
+        self.pending = []
+        self.pending_since = None
+        atexit.register(self.flush)
+
+    def device_id(self, name):
+        if name not in self.ids:
+            self.ids[name] = len(self.ids)
+            with open(self.devices_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(list(self.ids), f, ensure_ascii=False)
+            os.replace(self.devices_path + ".tmp", self.devices_path)
+        return self.ids[name]
+
+    def append(self, name, wall_time, distance):
+        now = self.clock()
+        if not self.pending:
+            self.pending_since = now
+        self.pending.append((self.device_id(name), wall_time, min(distance, 0xFFFF)))
+        if len(self.pending) >= self.flush_every or now - self.pending_since >= self.flush_s:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        records = np.array(self.pending, RECORD)
+        self.pending = []
+        days = (records["time"] // 86400).astype(np.int64)
+        for day in np.unique(days):
+            stamp = time.strftime("%Y%m%d", time.gmtime(int(day) * 86400))
+            with open(os.path.join(self.log_dir, f"readings-{stamp}.bin"), "ab") as f:
+                records[days == day].tofile(f)
+
+    def close(self):
+        self.flush()
+        atexit.unregister(self.flush)
+
+
+def read_log(log_dir):
+    """Every logged reading as a DataFrame (device, time, distance)."""
+    with open(os.path.join(log_dir, "devices.json"), encoding="utf-8") as f:
+        names = np.array(json.load(f))
+    paths = sorted(p for p in os.listdir(log_dir) if p.startswith("readings-") and p.endswith(".bin"))
+    records = np.concatenate([np.fromfile(os.path.join(log_dir, p), RECORD) for p in paths]) if paths \
+        else np.empty(0, RECORD)
+    return pd.DataFrame({
+        "device": names[records["device"]] if len(records) else np.empty(0, str),
+        "time": pd.to_datetime(records["time"], unit="s"),
+        "distance": records["distance"],
+    })
+
+
+def benchmark(devices=100, days=3.0, hz=2.0, window_s=3.0):
+    """Memory for `days` of `devices` sensors, plus append + windowed-median cost per reading."""
+    buffers = [RingBuffer(capacity_for(days, hz)) for _ in range(devices)]
+    rng = np.random.default_rng(0)
+    samples = capacity_for(days, hz) + 1000  # 一周して上書きされるところまで
+    distances = rng.integers(2, 200, samples)
+    buf = buffers[0]
+    start = time.perf_counter()
+    for i, d in enumerate(distances):
+        buf.append(i / hz, int(d))
+    append_s = (time.perf_counter() - start) / samples
+    now = (samples - 1) / hz
+    start = time.perf_counter()
+    for _ in range(10000):
+        sustained_near(buf.recent(window_s, now), 6, 3)
+    window_us = (time.perf_counter() - start) / 10000 * 1e6
+    start = time.perf_counter()
+    buf.rolling(int(window_s * hz))
+    rolling_s = time.perf_counter() - start
+    return {
+        "devices": devices, "days": days, "hz": hz,
+        "memory_mib": sum(b.nbytes for b in buffers) / 2**20,
+        "append_us": append_s * 1e6, "window_check_us": window_us,
+        "rolling_median_full_buffer_s": rolling_s,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distance reading buffer: log summary or benchmark")
+    parser.add_argument("command", choices=["summary", "bench"])
+    parser.add_argument("--log-dir", default="readings")
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--days", type=float, default=3.0)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        print(benchmark(args.devices, args.days))
+    else:
+        log = read_log(args.log_dir)
+        print(log.groupby("device")["distance"].describe().to_string())
@@ -0,0 +1,341 @@
+import argparse
+import asyncio
+import functools
+import os
+import re
+import threading
+import time
+from email.mime.text import MIMEText
+
+import serial
+
+import notification
+from serial_buffer import ReadingLog, RingBuffer, capacity_for, sustained_clear, sustained_near
+
+# fall_preventation.ino の1フレーム: "Distance: %d cm\r\n"
+PREFIX = b"Distance: "
+SUFFIX = b" cm"
+
+
+def parse_frame(line):
+    """Distance in cm from one raw frame, or None. Plain bytes checks, no regex."""
+    line = line.rstrip(b"\r\n")
+    if line.startswith(PREFIX) and line.endswith(SUFFIX):
+        digits = line[len(PREFIX):-len(SUFFIX)]
+        if digits.isdigit():
+            return int(digits)
+    return None
+
+
+class Device:
+    """Per-sensor state machine over its reading history: clear -> near -> clear; offline when silent.
+
+    "near" needs the median of the last `window_s` seconds within the
+    threshold (at least `min_samples` readings), so one noisy echo does not
+    alert; "clear" needs every reading in the window beyond threshold + hysteresis.
+    """
+
+    def __init__(self, name, threshold=notification.alert_distance_cm, window_s=notification.window_s,
+                 min_samples=notification.min_samples, hysteresis=2, history_days=1.0):
+        self.name = name
+        self.threshold = threshold
+        self.window_s = window_s
+        self.min_samples = min_samples
+        self.hysteresis = hysteresis
+        self.buffer = RingBuffer(capacity_for(history_days))
+        self.state = "clear"
+        self.last_seen = None
+        self.frames = 0
+
+    def feed(self, now, distance):
+        """The event ("near", "clear", "online") this reading causes, if any."""
+        self.frames += 1
+        self.last_seen = now
+        self.buffer.append(now, distance)
+        recent = self.buffer.recent(self.window_s, now)
+        if self.state == "near":
+            if sustained_clear(recent, self.threshold + self.hysteresis):
+                self.state = "clear"
+                return "clear"
+            return None
+        if sustained_near(recent, self.threshold, self.min_samples):
+            self.state = "near"
+            return "near"
+        if self.state == "offline":
+            self.state = "clear"
+            return "online"
+        return None
+
+    def check_stale(self, now, stale_s):
+        if self.state != "offline" and self.last_seen is not None and now - self.last_seen > stale_s:
+            self.state = "offline"
+            return "offline"
+        return None
+
+
+def pump_serial(ser, reader, loop):
+    """Feed a serial port into an asyncio StreamReader from a thread (Windows COM ports cannot join the loop).
+
+    A read error is raised from the reader and a closed port ends its stream,
+    so read_source reconnects either way.
+    """
+    def post(callback, *args):
+        try:
+            loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            pass  # イベントループが既に閉じている
+
+    try:
+        while ser.is_open:
+            data = ser.read(ser.in_waiting or 1)
+            if data:
+                post(reader.feed_data, data)
+    except (OSError, serial.SerialException) as e:
+        post(reader.set_exception, e)
+    else:
+        post(reader.feed_eof)
+
+
+def parse_source(spec):
+    """"name=spec" or "spec"; spec is a serial port (COM5, /dev/ttyACM0) or tcp://host:port."""
+    name, _, target = spec.rpartition("=")
+    return name or target, target
+
+
+class Gateway:
+    """Many fall-prevention sensors in one asyncio process, fanned into one event queue.
+
+    Events are (time, device name, kind, distance) with kind in near / clear /
+    offline / online. Sources reconnect on their own after errors.
+    """
+
+    def __init__(self, sources, baud_rate=notification.baud_rate, stale_s=5.0, reconnect_s=2.0, log_dir=None,
+                 **device_kw):
+        self.sources = dict(parse_source(s) for s in sources)
+        self.baud_rate = baud_rate
+        self.stale_s = stale_s
+        self.reconnect_s = reconnect_s
+        self.devices = {name: Device(name, **device_kw) for name in self.sources}
+        # 全センサーの読み取り値は追記専用ログへ（後から分析する用）
+        self.log = ReadingLog(log_dir) if log_dir else None
+        self.events = asyncio.Queue()
+
+    async def open_serial(self, port):
+        loop = asyncio.get_running_loop()
+        # ポートを開くのは遅いことがあるので、他のセンサーの読み取りを止めないようスレッドで
+        ser = await loop.run_in_executor(None, functools.partial(serial.Serial, port, self.baud_rate, timeout=1))
+        reader = asyncio.StreamReader()
+        if os.name == "posix":
+            # tty は文字デバイスなのでイベントループに直接つなげる（transport を閉じるとポートも閉じる）
+            try:
+                transport, _ = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), ser)
+            except BaseException:
+                ser.close()
+                raise
+            return reader, transport
+        else:
+            # Windows の COM ポートは読み取り用スレッドから流し込む
+            threading.Thread(target=pump_serial, args=(ser, reader, loop), daemon=True).start()
+            return reader, ser
+
+    async def read_source(self, name, target):
+        device = self.devices[name]
+        while True:
+            closer = None
+            try:
+                if target.startswith("tcp://"):
+                    host, port = target[len("tcp://"):].rsplit(":", 1)
+                    reader, closer = await asyncio.open_connection(host, int(port))
+                else:
+                    reader, closer = await self.open_serial(target)
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break  # 接続が切れた
+                    distance = parse_frame(line)
+                    if distance is None:
+                        continue
+                    now = time.monotonic()
+                    if self.log is not None:
+                        self.log.append(name, time.time(), distance)
+                    kind = device.feed(now, distance)
+                    if kind:
+                        self.events.put_nowait((now, name, kind, distance))
+            except (OSError, serial.SerialException) as e:
+                print(f"⚠️ {name}: {e}")
+            finally:
+                if closer is not None:
+                    closer.close()
+            await asyncio.sleep(self.reconnect_s)
+
+    async def watchdog(self):
+        while True:
+            await asyncio.sleep(self.stale_s / 2)
+            now = time.monotonic()
+            for name, device in self.devices.items():
+                if device.check_stale(now, self.stale_s):
+                    self.events.put_nowait((now, name, "offline", None))
+
+    async def run(self, sink):
+        """Read every source and hand the merged event stream to `sink(events)` until cancelled."""
+        tasks = [asyncio.create_task(self.read_source(name, target)) for name, target in self.sources.items()]
+        tasks.append(asyncio.create_task(self.watchdog()))
+        try:
+            await sink(self.events)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self.log is not None:
+                self.log.close()
+
+
+def log_event(event):
+    _, name, kind, distance = event
+    print(f"📡 {name}: {kind}" + (f" ({distance} cm)" if distance is not None else ""))
+
+
+def alert_message(events):
+    message = MIMEText("\n".join(
+        f"{name}: {'窓に注意！' if kind == 'near' else 'センサーから応答がありません'}"
+        + (f"（{distance} cm）" if distance is not None else "")
+        for _, name, kind, distance in events
+    ), "plain")
+    message["From"] = notification.sender_email
+    message["To"] = notification.receiver_email
+    message["Subject"] = f"6cm以内の通知（{len(events)}件）"
+    return message
+
+
+async def mail_alerts(events, mailer=None, batch_s=5.0, per_hour=notification.max_per_hour):
+    """Collect near / offline events for `batch_s` and send them as one email, at most `per_hour` emails."""
+    mailer = mailer or notification.Mailer()
+    sent = []
+    try:
+        while True:
+            event = await events.get()
+            log_event(event)
+            if event[2] not in ("near", "offline"):
+                continue
+            batch = [event]
+            deadline = time.monotonic() + batch_s
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    event = await asyncio.wait_for(events.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                log_event(event)
+                if event[2] in ("near", "offline"):
+                    batch.append(event)
+            now = time.monotonic()
+            sent = [t for t in sent if now - t < 3600]
+            if len(sent) >= per_hour:
+                print(f"⏸️ 送信上限のため {len(batch)} 件を通知せず")
+                continue
+            try:
+                await asyncio.to_thread(mailer.send, alert_message(batch))
+                sent.append(now)
+                print(f"メールが送信されました（{len(batch)}件）")
+            except Exception as e:
+                print(f"エラーが発生しました: {e}")
+    finally:
+        mailer.close()
+
+
+# === ベンチマーク：擬似端末上の模擬センサー ===
+def benchmark(n_devices=50, hz=20.0, seconds=5.0):
+    """Throughput and near-alert latency with `n_devices` pty sensors writing at `hz` each.
+
+    Latency runs from the write of the frame that completes a sustained-proximity window to its event.
+    """
+    ptys = [os.openpty() for _ in range(n_devices)]
+    sources = [f"dev{i}={os.ttyname(slave)}" for i, (_, slave) in enumerate(ptys)]
+    sent_at = {}
+    stop = threading.Event()
+
+    def writer():
+        # 全センサーを1スレッドで順に書き込む。20フレームごとに5フレーム続く接近を送り、その時刻を記録
+        period = 1.0 / hz
+        tick = 0
+        while not stop.is_set():
+            start = time.monotonic()
+            for i, (master, _) in enumerate(ptys):
+                near = tick % 20 >= 15
+                if near:
+                    sent_at.setdefault(f"dev{i}", []).append(time.monotonic())
+                os.write(master, b"Distance: 3 cm\r\n" if near else b"Distance: 120 cm\r\n")
+            tick += 1
+            time.sleep(max(0.0, period - (time.monotonic() - start)))
+
+    async def main():
+        # 窓は4フレーム分：接近が3フレーム続いた時点で near になる
+        gateway = Gateway(sources, window_s=3.5 / hz, min_samples=3)
+        latencies = []
+
+        async def sink(events):
+            while True:
+                now, name, kind, _ = await events.get()
+                if kind == "near" and sent_at.get(name):
+                    latencies.append(now - sent_at[name][-1])
+
+        task = asyncio.create_task(gateway.run(sink))
+        await asyncio.sleep(0.5)
+        threading.Thread(target=writer, daemon=True).start()
+        frames0, cpu0, t0 = sum(d.frames for d in gateway.devices.values()), time.process_time(), time.monotonic()
+        await asyncio.sleep(seconds)
+        frames = sum(d.frames for d in gateway.devices.values()) - frames0
+        elapsed, cpu = time.monotonic() - t0, time.process_time() - cpu0
+        stop.set()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return frames / elapsed, cpu / elapsed, sorted(latencies)
+
+    rate, cpu, latencies = asyncio.run(main())
+    for master, slave in ptys:
+        os.close(master)
+        os.close(slave)
+    p = lambda q: latencies[int(q * (len(latencies) - 1))] * 1000 if latencies else float("nan")
+    return {"devices": n_devices, "frames_per_s": rate, "cpu": cpu, "alerts": len(latencies),
+            "latency_p50_ms": p(0.5), "latency_p95_ms": p(0.95)}
+
+
+def benchmark_parser(n=200000):
+    """Per-frame parse time: the byte-level parser vs decode + re.search as in notification.py."""
+    frames = [f"Distance: {i % 400} cm\r\n".encode() for i in range(1000)] * (n // 1000)
+    start = time.perf_counter()
+    for line in frames:
+        parse_frame(line)
+    fast = time.perf_counter() - start
+    pattern = r'(\d+)\s*cm'
+    start = time.perf_counter()
+    for line in frames:
+        match = re.search(pattern, line.decode('utf-8').rstrip())
+        if match:
+            int(match.group(1))
+    slow = time.perf_counter() - start
+    return fast / len(frames) * 1e9, slow / len(frames) * 1e9
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fan-in gateway for fall-prevention distance sensors")
+    parser.add_argument("sources", nargs="*",
+                        help="COM5, /dev/ttyACM0, tcp://host:port（name=... で名前を付けられる。省略時は notification.py のポート）")
+    parser.add_argument("--stale", type=float, default=5.0, help="この秒数フレームが来なければ offline")
+    parser.add_argument("--batch", type=float, default=5.0, help="この秒数内のアラートを1通にまとめる")
+    parser.add_argument("--window", type=float, default=notification.window_s, help="接近の判定に使う直近の秒数")
+    parser.add_argument("--log-dir", default="readings", help="全読み取り値の追記専用ログ")
+    parser.add_argument("--bench", type=int, metavar="DEVICES", help="擬似端末の模擬センサーでベンチマーク")
+    parser.add_argument("--hz", type=float, default=20.0)
+    args = parser.parse_args()
+
+    if args.bench:
+        fast, slow = benchmark_parser()
+        print(f"parser: {fast:.0f} ns/frame (bytes) vs {slow:.0f} ns/frame (decode + re.search)")
+        print(benchmark(args.bench, args.hz))
+    else:
+        gateway = Gateway(args.sources or [notification.serial_port], stale_s=args.stale, log_dir=args.log_dir,
+                          window_s=args.window)
+        try:
+            asyncio.run(gateway.run(lambda events: mail_alerts(events, batch_s=args.batch)))
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,54 @@
+"""Just enough of an SMTP server for notification.Mailer, on a local port."""
+import socketserver
+import threading
+
+
+class SMTPStub:
+    """Records delivered messages; `refuse` holds the commands ("AUTH", "RCPT") to answer with a 5xx."""
+
+    def __init__(self):
+        self.messages = []
+        self.connections = 0
+        self.refuse = set()
+        stub = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(line.encode("ascii") + b"\r\n")
+
+            def handle(self):
+                stub.connections += 1
+                self.reply("220 stub ESMTP")
+                while True:
+                    line = self.rfile.readline().decode("ascii", "replace").strip()
+                    if not line:
+                        return
+                    command = line.split(" ", 1)[0].upper()
+                    if command == "EHLO":
+                        self.reply("250-stub")
+                        self.reply("250 AUTH PLAIN LOGIN")
+                    elif command in stub.refuse:
+                        self.reply("535 refused" if command == "AUTH" else "550 refused")
+                    elif command == "DATA":
+                        self.reply("354 go ahead")
+                        lines = []
+                        while (data := self.rfile.readline()) not in (b".\r\n", b""):
+                            lines.append(data)
+                        stub.messages.append(b"".join(lines).decode("utf-8", "replace"))
+                        self.reply("250 queued")
+                    elif command == "QUIT":
+                        self.reply("221 bye")
+                        return
+                    elif command == "AUTH":
+                        self.reply("235 ok")
+                    else:
+                        self.reply("250 ok")
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
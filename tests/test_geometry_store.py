@@ -0,0 +1,99 @@
+import json
+import os
+
+import numpy as np
+import pytest
+import shapely
+from shapely.geometry import Polygon, shape
+
+import geometry_store
+
+# 3 x 1 の格子：隣り合う県は同じ（ギザギザの）境界線を共有する
+CELLS = {"Tokyo": (0, 0), "Kanagawa": (1, 0), "Saitama": (2, 0)}
+
+
+def edge(a, b, steps=200):
+    """Points from a up to (not including) b with a 0.001 deg wiggle; both neighbours get the same vertices."""
+    lo, hi = min(a, b), max(a, b)
+    t = np.linspace(0.0, 1.0, steps + 1)
+    x, y = lo[0] + (hi[0] - lo[0]) * t, lo[1] + (hi[1] - lo[1]) * t
+    wiggle = 0.001 * np.sin(40 * (x + y)) * (t > 0) * (t < 1)
+    points = list(zip(x + wiggle * (a[0] == b[0]), y + wiggle * (a[1] == b[1])))
+    return (points if a == lo else points[::-1])[:-1]
+
+
+def cell(x, y):
+    corners = [(x, y), (x + 1, y), (x + 1, y + 1), (x, y + 1)]
+    return Polygon([p for a, b in zip(corners, corners[1:] + corners[:1]) for p in edge(a, b)])
+
+
+def write_source(path, cells=CELLS, shift=0.0):
+    features = [{"type": "Feature", "properties": {"NAME_1": name, "GID_1": f"JPN.{i}_1"},
+                 "geometry": shapely.geometry.mapping(shapely.affinity.translate(cell(*xy), shift))}
+                for i, (name, xy) in enumerate(cells.items())]
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}), encoding="utf-8")
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "gadm.json"
+    write_source(path)
+    yield str(path)
+    geometry_store._index_cache.clear()
+
+
+def test_default_paths_sit_next_to_the_module():
+    here = os.path.dirname(os.path.abspath(geometry_store.__file__))
+    assert os.path.dirname(geometry_store.STORE_DIR) == here
+    assert os.path.dirname(geometry_store.SOURCE) == here
+
+
+def test_load_reads_only_the_requested_names(source, tmp_path):
+    store_dir = str(tmp_path / "store")
+    geoms = geometry_store.load(["Saitama", "Tokyo"], 0.0, source, store_dir)
+    assert list(geoms) == ["Saitama", "Tokyo"]
+    assert geoms["Tokyo"].equals(cell(0, 0))
+
+    feats = geometry_store.features(["Kanagawa"], 0.0, source, store_dir)
+    assert [f["properties"] for f in feats] == [{"NAME_1": "Kanagawa", "GID_1": "JPN.1_1"}]
+    assert shape(feats[0]["geometry"]).equals(cell(1, 0))
+
+
+def test_records_are_read_by_offset(source, tmp_path):
+    store_dir = str(tmp_path / "store")
+    index = geometry_store.load_index(source, store_dir)
+    for tolerance in geometry_store.TOLERANCES:
+        key = f"{tolerance:g}"
+        with open(os.path.join(store_dir, f"geoms_{key}.wkb"), "rb") as f:
+            blob = f.read()
+        spans = [index["features"][name]["offsets"][key] for name in CELLS]
+        # 連続して書かれ、ファイル全体を覆う
+        assert [o for o, _ in spans] == list(np.cumsum([0] + [n for _, n in spans[:-1]]))
+        assert sum(n for _, n in spans) == len(blob)
+        geoms = geometry_store.load(CELLS, tolerance, source, store_dir)
+        for name, (offset, length) in zip(CELLS, spans):
+            assert shapely.from_wkb(blob[offset:offset + length]).equals(geoms[name])
+
+
+def test_each_tolerance_simplifies_within_its_bound(source, tmp_path):
+    store_dir = str(tmp_path / "store")
+    counts = []
+    for tolerance in geometry_store.TOLERANCES:
+        geoms = geometry_store.load(CELLS, tolerance, source, store_dir)
+        for name, xy in CELLS.items():
+            assert shapely.hausdorff_distance(geoms[name], cell(*xy)) <= tolerance + 1e-9
+        # 隣同士は境界を共有したまま（重なりも隙間もない）
+        assert geoms["Tokyo"].intersection(geoms["Kanagawa"]).area == pytest.approx(0.0, abs=1e-12)
+        counts.append(sum(shapely.get_num_coordinates(g) for g in geoms.values()))
+    assert counts == sorted(counts, reverse=True) and counts[-1] < counts[0] / 10
+
+
+def test_store_is_rebuilt_when_the_source_changes(source, tmp_path):
+    store_dir = str(tmp_path / "store")
+    before = geometry_store.load(["Tokyo"], 0.0, source, store_dir)["Tokyo"]
+    write_source(tmp_path / "gadm.json", shift=5.0)
+    stat = os.stat(source)
+    os.utime(source, (stat.st_atime, stat.st_mtime + 10))
+
+    after = geometry_store.load(["Tokyo"], 0.0, source, store_dir)["Tokyo"]
+    assert after.equals(shapely.affinity.translate(before, 5.0))
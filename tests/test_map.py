@@ -0,0 +1,77 @@
+import json
+
+import matplotlib
+import numpy as np
+import pandas as pd
+import pytest
+from matplotlib.colors import Normalize
+from shapely.geometry import box
+
+import map as kanto_map
+
+PREFECTURES = ["Tokyo", "Kanagawa", "Saitama"]
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    # 県ごとの CSV（analyze.py の出力と同じ列）。Saitama は毎日同じ値
+    dates = pd.date_range("2024-03-01", periods=4)
+    for i, pref in enumerate(PREFECTURES):
+        ndvi = [4000.0] * 4 if pref == "Saitama" else 3000.0 + 500 * i + 250 * np.arange(4)
+        pd.DataFrame({"date": dates.strftime("%Y-%m-%d"), "T2M": 10.0, "NDVI": ndvi}).to_csv(
+            tmp_path / f"{pref}_2024_ndvi_temp.csv", index=False)
+    return str(tmp_path)
+
+
+@pytest.fixture
+def gdf():
+    import geopandas as gpd
+
+    return gpd.GeoDataFrame(geometry=[box(i, 0, i + 1, 1) for i in range(len(PREFECTURES))],
+                            index=PREFECTURES, crs="EPSG:4326")
+
+
+def test_load_values_pivots_dates_by_prefecture(data_dir):
+    values = kanto_map.load_values(["Saitama", "Tokyo"], 2024, data_dir)
+    assert list(values.columns) == ["Saitama", "Tokyo"]
+    assert list(values.index) == list(pd.date_range("2024-03-01", periods=4))
+    assert values["Tokyo"].tolist() == [3000.0, 3250.0, 3500.0, 3750.0]
+
+
+def test_serial_render_uses_one_colour_scale(data_dir, gdf, tmp_path, monkeypatch):
+    values = kanto_map.load_values(PREFECTURES, 2024, data_dir)
+    colours = []
+    render = kanto_map._render
+
+    def spy(task):
+        path = render(task)
+        colours.append(kanto_map._worker['collection'].get_facecolor().copy())
+        return path
+
+    monkeypatch.setattr(kanto_map, "_render", spy)
+    out_dir = tmp_path / "png"
+    paths = kanto_map.render_pngs(gdf, values, str(out_dir), dpi=20, workers=1)
+
+    assert [p.rsplit("NDVI_", 1)[1] for p in paths] == [f"2024-03-0{d}.png" for d in range(1, 5)]
+    assert all(open(p, "rb").read(8) == b"\x89PNG\r\n\x1a\n" for p in paths)
+    # 色の範囲は全日付の最小〜最大で固定：毎日同じ値の Saitama は毎日同じ色
+    norm = Normalize(3000.0, 4250.0)
+    for row, colour in zip(values.to_numpy(), colours):
+        np.testing.assert_allclose(colour, matplotlib.colormaps["YlGn"](norm(row)))
+    assert kanto_map._worker == {}
+
+
+def test_vector_output(data_dir, gdf, tmp_path):
+    values = kanto_map.load_values(PREFECTURES, 2024, data_dir).iloc[1:3]
+    shapes_path, values_path = kanto_map.write_vector(gdf, values, str(tmp_path / "vector"))
+
+    with open(values_path, encoding="utf-8") as f:
+        days = json.load(f)
+    assert days["regions"] == PREFECTURES
+    assert days["dates"] == ["2024-03-02", "2024-03-03"]
+    assert np.shape(days["NDVI"]) == (2, 3)
+    assert days["NDVI"] == values.round(1).to_numpy().tolist()
+
+    with open(shapes_path, encoding="utf-8") as f:
+        shapes = json.load(f)
+    assert [feat["properties"]["NAME_1"] for feat in shapes["features"]] == PREFECTURES
@@ -0,0 +1,120 @@
+import os
+import queue
+import smtplib
+import socket
+import threading
+import time
+
+import pytest
+import serial
+
+import notification
+from serial_buffer import ReadingLog, read_log
+from smtp_stub import SMTPStub
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    monkeypatch.setattr(notification, "sender_email", "sender@example.com")
+    monkeypatch.setattr(notification, "receiver_email", "receiver@example.com")
+    stub = SMTPStub()
+    yield stub
+    stub.close()
+
+
+def mailer(stub, password=""):
+    return notification.Mailer("127.0.0.1", stub.port, use_ssl=False, user="sender@example.com", password=password)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def approach(dispatcher, start, seconds=2.0, distance=4):
+    for i in range(int(seconds * 10)):
+        dispatcher.handle(start + i / 10, distance)
+
+
+def test_sustained_approach_over_a_pty_sends_one_alert(smtp, tmp_path):
+    master, slave = os.openpty()
+    ser = serial.Serial(os.ttyname(slave), 9600, timeout=0.1)
+    readings, stop = queue.Queue(), threading.Event()
+    dispatcher = notification.AlertDispatcher(readings, mailer(smtp), debounce=10, window=1.0,
+                                              log=ReadingLog(str(tmp_path / "readings")))
+    dispatcher.start()
+    reader = threading.Thread(target=notification.read_serial, args=(ser, readings, stop), daemon=True)
+    reader.start()
+    try:
+        # Far readings with a one-sample noisy echo, then a sustained approach
+        for i in range(20):
+            os.write(master, f"Distance: {2 if i % 10 == 0 else 80} cm\r\n".encode())
+            time.sleep(0.05)
+        assert smtp.messages == []
+        for _ in range(10):
+            os.write(master, b"Distance: 4 cm\r\n")
+            time.sleep(0.05)
+        time.sleep(0.3)
+    finally:
+        stop.set()
+        reader.join(1)
+        readings.put(None)
+        dispatcher.join(5)
+        ser.close()
+        os.close(master)
+
+    assert len(smtp.messages) == 1
+    assert "To: receiver@example.com" in smtp.messages[0]
+    assert len(read_log(str(tmp_path / "readings"))) == 30
+
+
+def test_refused_recipient_is_raised_without_reconnecting(smtp):
+    smtp.refuse.add("RCPT")
+    m = mailer(smtp)
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        m.send(notification.build_message(4))
+    assert smtp.connections == 1
+    m.close()
+
+
+def test_failed_login_is_raised_without_reconnecting(smtp):
+    smtp.refuse.add("AUTH")
+    m = mailer(smtp, password="secret")
+    with pytest.raises(smtplib.SMTPAuthenticationError):
+        m.send(notification.build_message(4))
+    assert smtp.connections == 1 and m.server is None
+
+
+def test_dropped_connection_is_reopened_once(smtp):
+    m = mailer(smtp)
+    m.send(notification.build_message(4))
+    m.server.sock.shutdown(socket.SHUT_RDWR)  # the connection dropped while idle
+    m.send(notification.build_message(5))
+
+    assert len(smtp.messages) == 2 and smtp.connections == 2
+    m.close()
+
+
+def test_failed_send_does_not_start_the_debounce(smtp, capsys):
+    clock = Clock()
+    dispatcher = notification.AlertDispatcher(queue.Queue(), mailer(smtp), debounce=60, clock=clock, window=1.0)
+    smtp.refuse.add("RCPT")
+    approach(dispatcher, 0.0)
+    assert (dispatcher.last_alert, len(dispatcher.sent), smtp.messages) == (None, 0, [])
+
+    smtp.refuse.clear()
+    approach(dispatcher, 2.0)
+    assert len(smtp.messages) == 1 and dispatcher.last_alert is not None
+    assert "エラーが発生しました" in capsys.readouterr().out
+
+
+def test_no_personal_address_defaults(monkeypatch):
+    import importlib
+
+    for name in ("NOTIFY_SENDER", "NOTIFY_RECEIVER"):
+        monkeypatch.delenv(name, raising=False)
+    module = importlib.reload(notification)
+    assert (module.sender_email, module.receiver_email) == ("", "")
@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from serial_buffer import RECORD, TICK, ReadingLog, RingBuffer, read_log
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def filled(capacity, n, hz=2.0):
+    buf = RingBuffer(capacity)
+    for i in range(n):
+        buf.append(100.0 + i / hz, i)
+    return buf
+
+
+@pytest.mark.parametrize("n", [3, 5, 8, 13])
+def test_ordered_is_oldest_first_across_the_wrap(n):
+    buf = filled(5, n)
+    assert buf.ordered()["distance"].tolist() == list(range(max(0, n - 5), n))
+    assert buf.count == min(n, 5)
+
+
+@pytest.mark.parametrize("n", [4, 7, 8, 11])
+@pytest.mark.parametrize("seconds", [0.0, 0.4, 1.0, 1.6, 2.5, 10.0])
+def test_recent_matches_a_scan_of_the_ordered_samples(n, seconds):
+    # 一周した後は窓が古い側（data[head:]）から始まる場合と新しい側だけの場合がある
+    buf = filled(6, n)
+    now = 100.0 + (n - 1) / 2.0
+    ordered = buf.ordered()
+    expected = ordered["distance"][ordered["time"] >= round((now - seconds - buf.t0) / TICK)]
+    assert buf.recent(seconds, now).tolist() == expected.tolist()
+
+
+def test_recent_of_an_empty_buffer():
+    assert len(RingBuffer(4).recent(3.0, 10.0)) == 0
+
+
+def test_log_round_trip(tmp_path):
+    log_dir = str(tmp_path / "readings")
+    log = ReadingLog(log_dir, flush_every=3)
+    day = 86400 * 20000
+    rows = [("COM5", day - 1.5, 12), ("tcp://door", day - 1.0, 70000), ("COM5", day + 0.25, 4)]
+    for row in rows:
+        log.append(*row)
+    log.close()
+    # 再度開いても同じセンサー番号を使う
+    again = ReadingLog(log_dir)
+    again.append("tcp://door", day + 1.0, 9)
+    again.close()
+
+    df = read_log(log_dir)
+    assert df["device"].tolist() == ["COM5", "tcp://door", "COM5", "tcp://door"]
+    assert df["distance"].tolist() == [12, 0xFFFF, 4, 9]
+    np.testing.assert_allclose(df["time"].astype("int64") / 1e9, [day - 1.5, day - 1.0, day + 0.25, day + 1.0],
+                               rtol=0, atol=1e-6)
+    # UTC の日ごとに1ファイル、1レコード12バイト
+    files = sorted(p.name for p in (tmp_path / "readings").glob("readings-*.bin"))
+    assert files == ["readings-20241003.bin", "readings-20241004.bin"]
+    assert RECORD.itemsize == 12 and (tmp_path / "readings" / files[0]).stat().st_size == 24
+
+
+def test_log_flushes_after_flush_s(tmp_path):
+    clock = [0.0]
+    log = ReadingLog(str(tmp_path), flush_every=512, flush_s=5.0, clock=lambda: clock[0])
+    log.append("COM5", 1000.0, 10)
+    clock[0] = 4.9
+    log.append("COM5", 1004.9, 11)
+    assert len(read_log(str(tmp_path))) == 0
+    clock[0] = 5.0
+    log.append("COM5", 1005.0, 12)
+    assert read_log(str(tmp_path))["distance"].tolist() == [10, 11, 12]
+    log.close()
+
+
+def test_pending_records_are_written_at_exit(tmp_path):
+    script = f"from serial_buffer import ReadingLog; ReadingLog({str(tmp_path)!r}).append('COM5', 1000.0, 7)"
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=ROOT)
+    assert read_log(str(tmp_path))["distance"].tolist() == [7]
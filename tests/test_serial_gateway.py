@@ -0,0 +1,160 @@
+import asyncio
+import os
+import threading
+
+import pytest
+import serial
+
+from serial_buffer import read_log
+from serial_gateway import Device, Gateway, parse_frame, parse_source, pump_serial
+
+
+@pytest.mark.parametrize("line, distance", [
+    (b"Distance: 42 cm\r\n", 42),
+    (b"Distance: 0 cm", 0),
+    (b"Distance: 4x cm\r\n", None),    # garbled digits
+    (b"Distnce: 42 cm\r\n", None),     # garbled prefix
+    (b"Distance: -3 cm\r\n", None),
+    (b"Distance:  cm\r\n", None),
+    (b"Distance: 42", None),           # partial frame (cut before the unit)
+    (b"ance: 42 cm\r\n", None),        # partial frame (cut after a reconnect)
+    (b"", None),
+])
+def test_parse_frame(line, distance):
+    assert parse_frame(line) == distance
+
+
+@pytest.mark.parametrize("spec, source", [
+    ("COM5", ("COM5", "COM5")),
+    ("window=COM5", ("window", "COM5")),
+    ("/dev/ttyACM0", ("/dev/ttyACM0", "/dev/ttyACM0")),
+    ("tcp://10.0.0.5:7000", ("tcp://10.0.0.5:7000", "tcp://10.0.0.5:7000")),
+    ("hall=tcp://10.0.0.5:7000", ("hall", "tcp://10.0.0.5:7000")),
+])
+def test_parse_source(spec, source):
+    assert parse_source(spec) == source
+
+
+def device():
+    return Device("dev", threshold=6, window_s=3.0, min_samples=3, hysteresis=2)
+
+
+def test_one_noisy_echo_does_not_alert():
+    d = device()
+    events = [d.feed(t, cm) for t, cm in [(0.0, 80), (0.5, 80), (1.0, 3), (1.5, 80), (2.0, 3)]]
+    assert events == [None] * 5 and d.state == "clear"
+
+
+def test_near_needs_min_samples_then_clears_past_the_hysteresis():
+    d = device()
+    assert [d.feed(t, 4) for t in (0.0, 0.5, 1.0)] == [None, None, "near"]
+    assert d.feed(1.5, 4) is None
+    # 閾値 + ヒステリシス (8 cm) 以内の値が窓に残っている間は near のまま
+    assert [d.feed(t, 7) for t in (2.0, 2.5)] == [None, None]
+    assert [d.feed(t, 50) for t in (3.0, 4.0, 5.0)] == [None, None, None]
+    assert d.feed(5.6, 50) == "clear"   # 2.5 s の 7 cm が窓から出た
+    assert d.state == "clear"
+
+
+def test_silent_device_goes_offline_once_and_comes_back():
+    d = device()
+    assert d.check_stale(100.0, 5.0) is None   # まだ一度も読んでいない
+    d.feed(10.0, 80)
+    assert d.check_stale(14.0, 5.0) is None
+    assert d.check_stale(16.0, 5.0) == "offline"
+    assert d.check_stale(20.0, 5.0) is None
+    assert d.feed(21.0, 80) == "online"
+    assert d.state == "clear"
+
+
+class FlakySerial:
+    """Serial stand-in that hands out `chunks`, then fails (or closes) like an unplugged COM port."""
+
+    def __init__(self, chunks, error=None):
+        self.chunks, self.error, self.is_open = list(chunks), error, True
+        self.in_waiting = 0
+
+    def read(self, n):
+        if self.chunks:
+            return self.chunks.pop(0)
+        if self.error:
+            raise self.error
+        self.is_open = False
+        return b""
+
+
+@pytest.mark.parametrize("error", [serial.SerialException("device disconnected"), OSError(22, "gone"), None])
+def test_pump_thread_ends_the_stream_when_the_port_drops(error):
+    async def main():
+        reader = asyncio.StreamReader()
+        ser = FlakySerial([b"Distance: 1", b"2 cm\r\n"], error)
+        threading.Thread(target=pump_serial, args=(ser, reader, asyncio.get_running_loop()), daemon=True).start()
+        line = await asyncio.wait_for(reader.readline(), 2)
+        try:
+            rest = await asyncio.wait_for(reader.readline(), 2)
+        except (OSError, serial.SerialException) as e:
+            rest = e
+        return line, rest
+
+    line, rest = asyncio.run(main())
+    assert parse_frame(line) == 12
+    assert rest is error if error else rest == b""
+
+
+def test_read_source_reconnects_after_the_connection_closes():
+    connections = []
+
+    async def serve(reader, writer):
+        # 接続ごとに接近を3フレーム送って切断する
+        connections.append(writer)
+        writer.write(b"Distance: 3 cm\r\n" * 3 + b"Distance: 3")
+        await writer.drain()
+        writer.close()
+
+    async def main():
+        server = await asyncio.start_server(serve, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        gateway = Gateway([f"door=tcp://127.0.0.1:{port}"], reconnect_s=0.01, window_s=60.0, min_samples=3)
+        events = []
+
+        async def sink(queue):
+            while len(connections) < 3:
+                await asyncio.sleep(0.01)
+            while not queue.empty():
+                events.append(queue.get_nowait())
+
+        await asyncio.wait_for(gateway.run(sink), 5)
+        server.close()
+        await server.wait_closed()
+        return gateway, events
+
+    gateway, events = asyncio.run(main())
+    assert [(name, kind, cm) for _, name, kind, cm in events] == [("door", "near", 3)]
+    assert len(connections) >= 3
+    # 切断で途切れた最後のフレームは読まない
+    assert gateway.devices["door"].frames >= 6 and gateway.devices["door"].frames % 3 == 0
+
+
+def test_serial_source_over_a_pty(tmp_path):
+    master, slave = os.openpty()
+
+    async def main():
+        gateway = Gateway([f"bed={os.ttyname(slave)}"], window_s=60.0, min_samples=3, log_dir=str(tmp_path))
+        events = []
+
+        async def sink(queue):
+            await asyncio.sleep(0.3)  # ポートを開くときに入力バッファが捨てられるので、開いてから書く
+            for _ in range(3):
+                os.write(master, b"Distance: 4 cm\r\n")
+            events.append(await asyncio.wait_for(queue.get(), 2))
+
+        await asyncio.wait_for(gateway.run(sink), 5)
+        return events
+
+    try:
+        (_, name, kind, cm), = asyncio.run(main())
+    finally:
+        os.close(master)
+        os.close(slave)
+    assert (name, kind, cm) == ("bed", "near", 4)
+    assert len(read_log(str(tmp_path))) == 3